@@ -0,0 +1,155 @@
+"""Validators that await other services, run concurrently per page.
+
+Pydantic validates synchronously, so a `Predicate` that looks something up in another
+service makes one round trip after the other. An `AsyncPredicate` takes a coroutine
+function instead:
+
+    async def customer_exists(customer_id: str) -> bool:
+        return (await client.get(f"/customers/{customer_id}")).status_code == 200
+
+    customer_id: Annotated[str, AsyncPredicate(customer_exists)]
+
+While a form post validates a page, every `AsyncPredicate` only notes its check. When the
+page is done, the checks that were noted run together, on the event loop of the app, and
+the page is validated again if any of them failed, to report the errors where they
+belong. Checks are deduplicated per request by function and value, so the same ID in
+every item of a list is looked up once. Outside a form post, e.g. when validating a
+single field, a check runs on its own right away.
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator
+
+from anyio import from_thread
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import (
+    CoreSchema,
+    PydanticCustomError,
+    core_schema,
+    to_jsonable_python,
+)
+
+AsyncCheck = Callable[[Any], Awaitable[bool]]
+
+# The result of a check: whether it passed, or the `ValueError` it raised
+Result = bool | ValueError
+
+
+def canonical_value(value: Any) -> str:
+    """A string that is the same for equal values, also for dicts in another order."""
+    return json.dumps(to_jsonable_python(value), sort_keys=True, separators=(",", ":"))
+
+
+async def _check(func: AsyncCheck, value: Any) -> Result:
+    try:
+        return bool(await func(value))
+    except ValueError as e:
+        return e
+
+
+async def _check_all(checks: list[tuple[AsyncCheck, Any]]) -> list[Result]:
+    return await asyncio.gather(*(_check(func, value) for func, value in checks))
+
+
+def run_checks(checks: list[tuple[AsyncCheck, Any]]) -> list[Result]:
+    """Run `checks` concurrently and wait for their results, from synchronous code.
+
+    In a worker thread of the app, like a form post or the validation of a single field,
+    they run on the app's event loop. Called on the event loop itself they run on a loop
+    of their own, blocking the app's loop until they are done, which is why endpoints
+    validate in a worker thread.
+    """
+    try:
+        return from_thread.run(_check_all, checks)
+    except RuntimeError:
+        pass  # Not in a worker thread of an event loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_check_all(checks))
+    # Called on the event loop itself, which can't be waited for here
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, _check_all(checks)).result()
+
+
+class Lookups:
+    """The checks of one request: those that still have to run, and the results."""
+
+    def __init__(self) -> None:
+        self.pending: dict[tuple[AsyncCheck, str], Any] = {}
+        self.results: dict[tuple[AsyncCheck, str], Result] = {}
+
+    def result(self, func: AsyncCheck, value: Any) -> Result:
+        """The result of a check that has run, or `True` after noting it as pending."""
+        key = (func, canonical_value(value))
+        if (result := self.results.get(key)) is None:
+            self.pending.setdefault(key, value)
+            return True
+        return result
+
+    def run_pending(self) -> bool:
+        """Run the pending checks; return whether any of them failed."""
+        if not self.pending:
+            return False
+        pending, self.pending = self.pending, {}
+        checks = [(func, value) for (func, _), value in pending.items()]
+        results = run_checks(checks)
+        self.results.update(zip(pending, results))
+        return not all(result is True for result in results)
+
+
+_lookups: ContextVar[Lookups | None] = ContextVar("lookups", default=None)
+
+
+@contextmanager
+def request_lookups() -> Iterator[Lookups]:
+    """Note the checks of `AsyncPredicate` validators within this block, for later."""
+    lookups = Lookups()
+    token = _lookups.set(lookups)
+    try:
+        yield lookups
+    finally:
+        _lookups.reset(token)
+
+
+def run_pending_lookups() -> bool:
+    """Run the checks noted within `request_lookups`; return whether any of them failed."""
+    lookups = _lookups.get()
+    return lookups is not None and lookups.run_pending()
+
+
+class AsyncPredicate:
+    """Like `annotated_types.Predicate`, for a coroutine function; usable as `Annotated` metadata."""
+
+    def __init__(self, func: AsyncCheck):
+        self.func = func
+
+    def __repr__(self) -> str:
+        return f"AsyncPredicate({getattr(self.func, '__name__', self.func)})"
+
+    def validate(self, value: Any) -> Any:
+        if (lookups := _lookups.get()) is not None:
+            result = lookups.result(self.func, value)
+        else:
+            (result,) = run_checks([(self.func, value)])
+        if isinstance(result, ValueError):
+            raise result
+        if not result:
+            # The message of a failed `Predicate`, for the same errors either way
+            name = getattr(self.func, "__qualname__", None)
+            raise PydanticCustomError(
+                "predicate_failed",
+                f"Predicate {name!r} failed" if name else "Predicate failed",
+            )
+        return value
+
+    def __get_pydantic_core_schema__(
+        self, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            self.validate, handler(source_type)
+        )
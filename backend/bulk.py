@@ -0,0 +1,140 @@
+"""Validate many independent submissions of a form at once, spread over a process pool.
+
+Used by batch imports: each item is the `form_data` list of one complete submission. Items
+are sent to the worker processes in chunks and the results come back in input order.
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+from pydantic_forms.exceptions import (
+    FormException,
+    FormNotCompleteError,
+    FormValidationError,
+)
+from pydantic_forms.types import State
+from pydantic_forms.utils.json import json_dumps, json_loads
+
+from form_engine import post_form
+from form_executor import run_in_executor
+from form_registry import registry
+from warmup import FORM_WARMUP, warm_up
+
+# Every server worker has a pool of its own, so by default they split the cores
+_SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+BULK_WORKERS = int(
+    os.getenv("BULK_WORKERS", str(max(1, (os.cpu_count() or 1) // _SERVER_WORKERS)))
+)
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "32"))
+# Module that registers the forms, imported by every worker process
+BULK_APP_MODULE = os.getenv("BULK_APP_MODULE", "main")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = Lock()
+
+
+def _init_worker(app_module: str) -> None:
+    importlib.import_module(app_module)
+    if FORM_WARMUP:
+        warm_up(registry)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a threaded server is unsafe, so workers start from a clean process
+            method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            _pool = ProcessPoolExecutor(
+                BULK_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_worker,
+                initargs=(BULK_APP_MODULE,),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # Unless another request has already replaced it
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def post_item(form_key: str, user_inputs: list[State]) -> dict[str, Any]:
+    """Post one submission and describe the outcome like the HTTP response would."""
+    try:
+        result = post_form(registry.get_form(form_key), {}, user_inputs)
+    except FormValidationError as exc:
+        return {
+            "status": 400,
+            "detail": str(exc),
+            "validation_errors": json_loads(json_dumps(exc.errors)),
+        }
+    except FormNotCompleteError as exc:
+        return {"status": 510, "detail": "Form not complete", "meta": exc.meta}
+    except FormException as exc:
+        return {"status": 500, "detail": str(exc)}
+    return {"status": 200, "data": to_jsonable_python(result)}
+
+
+def post_chunk(form_key: str, chunk: list[list[State]]) -> list[dict[str, Any]]:
+    return [post_item(form_key, user_inputs) for user_inputs in chunk]
+
+
+async def post_bulk(
+    form_key: str, items: list[list[State]], chunk_size: int | None = None
+) -> list[dict[str, Any]]:
+    """Post every item of `items` and return the results in the same order."""
+    registry.get_form(form_key)  # fail fast on unknown forms
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    if len(items) <= chunk_size:
+        # Not worth the round trip to another process
+        return await run_in_executor(post_chunk, form_key, items)
+
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    try:
+        results = await _post_chunks(form_key, chunks)
+    except BrokenProcessPool:
+        # A worker died, e.g. killed for its memory, which breaks the whole pool: the
+        # chunks are posted once more to a new one
+        results = await _post_chunks(form_key, chunks)
+    return [result for chunk_results in results for result in chunk_results]
+
+
+async def _post_chunks(
+    form_key: str, chunks: list[list[list[State]]]
+) -> list[list[dict[str, Any]]]:
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, post_chunk, form_key, chunk)
+                for chunk in chunks
+            )
+        )
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
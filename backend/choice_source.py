@@ -0,0 +1,141 @@
+"""Choices that are served by the backend instead of being embedded in the page schema.
+
+A `Choice` enum puts every option in the schema of its page, which does not scale to
+tens of thousands of customers or subscriptions. A field annotated with a `ChoiceSource`
+only carries a reference to the source in its schema:
+
+    customer: Annotated[str, customers] = Field(title="Customer")
+
+    {"type": "string", "choiceSource": {"name": "customers", "url": "/choices/customers"}}
+
+The frontend searches the options at that url, page by page. Options are loaded once,
+on first use; validation checks membership in a set of the values, and searching by
+prefix of the label or value uses sorted indexes.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Callable, Iterable
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import CoreSchema, PydanticCustomError, core_schema
+from pydantic_forms.validators import Choice
+
+Options = Iterable[tuple[str, str]]
+
+
+class ChoiceSource:
+    """Named set of `(value, label)` options, usable as `Annotated` metadata on a `str` field."""
+
+    def __init__(self, name: str, loader: Callable[[], Options]):
+        self.name = name
+        self.loader = loader
+        self._lock = Lock()
+        self._options: list[tuple[str, str]] | None = None
+        self._values: frozenset[str] = frozenset()
+        # (casefolded label or value, option index), sorted for prefix searches
+        self._index: list[tuple[str, int]] = []
+
+    @classmethod
+    def from_choice(
+        cls, choice: type[Choice], name: str | None = None
+    ) -> "ChoiceSource":
+        return cls(
+            name or choice.__name__,
+            lambda: [(member.value, member.label) for member in choice],
+        )
+
+    @property
+    def options(self) -> list[tuple[str, str]]:
+        if (options := self._options) is None:
+            with self._lock:
+                if (options := self._options) is None:
+                    options = self._build(list(self.loader()))
+        return options
+
+    def _build(self, options: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        index = {(label.casefold(), i) for i, (_, label) in enumerate(options)}
+        index |= {(value.casefold(), i) for i, (value, _) in enumerate(options)}
+        self._values = frozenset(value for value, _ in options)
+        self._index = sorted(index)
+        # Set last, the values and index are complete once the options are visible
+        self._options = options
+        return options
+
+    def refresh(self) -> None:
+        """Load the options again on next use."""
+        with self._lock:
+            self._options = None
+
+    def __contains__(self, value: str) -> bool:
+        # `options` loads the values on first use
+        return bool(self.options) and value in self._values
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def search(
+        self, prefix: str = "", offset: int = 0, limit: int = 50
+    ) -> tuple[int, list[tuple[str, str]]]:
+        """Return the number of options whose label or value starts with `prefix`, and a page of them."""
+        options = self.options
+        if not prefix:
+            return len(options), options[offset : offset + limit]
+
+        prefix = prefix.casefold()
+        matches: set[int] = set()
+        for key, i in self._index[bisect_left(self._index, (prefix, -1)) :]:
+            if not key.startswith(prefix):
+                break
+            matches.add(i)
+        page = sorted(matches)[offset : offset + limit]
+        return len(matches), [options[i] for i in page]
+
+    def validate(self, value: str) -> str:
+        if value not in self:
+            raise PydanticCustomError(
+                "choice_source",
+                "Value is not one of the {source} options",
+                {"source": self.name},
+            )
+        return value
+
+    def __get_pydantic_core_schema__(
+        self, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            self.validate, handler(source_type)
+        )
+
+    def __get_pydantic_json_schema__(
+        self, schema: CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict[str, Any]:
+        json_schema = handler(schema)
+        return json_schema | {
+            "choiceSource": {"name": self.name, "url": f"/choices/{self.name}"}
+        }
+
+
+class ChoiceSourceRegistry:
+    def __init__(self) -> None:
+        self.sources: dict[str, ChoiceSource] = {}
+
+    def register(self, source: ChoiceSource) -> ChoiceSource:
+        if self.sources.get(source.name, source) is not source:
+            raise ValueError(f"Choice source {source.name} is already registered")
+        self.sources[source.name] = source
+        return source
+
+    def source(self, name: str) -> Callable[[Callable[[], Options]], ChoiceSource]:
+        """Register the decorated function as the loader of the options of `name`."""
+
+        def decorator(loader: Callable[[], Options]) -> ChoiceSource:
+            return self.register(ChoiceSource(name, loader))
+
+        return decorator
+
+    def get(self, name: str) -> ChoiceSource:
+        return self.sources[name]
+
+
+choice_sources = ChoiceSourceRegistry()
@@ -0,0 +1,70 @@
+"""Content negotiation and compression of response bodies.
+
+Cached page schemas are compressed once, with the highest settings, and the compressed
+bodies are stored next to the plain one. Other responses are compressed on the fly by
+`GZipMiddleware` when they are at least `COMPRESSION_MIN_SIZE` bytes; smaller bodies, like
+most validation errors, are not worth the CPU.
+
+Brotli is used when the `brotli` package is installed.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1000"))
+
+# In order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    if encoding == "gzip":
+        # mtime=0 keeps the output, and so the ETag, the same for the same body
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def compress_all(body: bytes) -> dict[str, bytes]:
+    """Return the body compressed with each supported encoding, if it is worth it."""
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return {}
+    return {
+        encoding: compressed
+        for encoding in ENCODINGS
+        if len(compressed := compress(body, encoding)) < len(body)
+    }
+
+
+def negotiate(
+    accept_encoding: str, available: tuple[str, ...] | list[str]
+) -> str | None:
+    """Pick the encoding from `available` the client accepts most, preferring the first one.
+
+    Returns `None` when the body should be sent as is.
+    """
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding := coding.strip().lower():
+            accepted[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
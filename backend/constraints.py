@@ -0,0 +1,217 @@
+"""Constraint tables of form pages, for checking input in the frontend before posting.
+
+Bounds, lengths, patterns and the like are cheap to check in the browser, but the
+frontend has to dig them out of the JSON schema again on every render, and the schema
+does not tell which checks only the backend can do. The constraint table of a page is
+compiled once from its fields' annotations:
+
+    {"fields": {"number": {"type": "integer", "required": true, "minimum": 18,
+     "maximum": 99, "multipleOf": 3, "serverOnly": ["example_backend_validation"]}}}
+
+Keys follow JSON schema where there is one. `serverOnly` names the validators that run
+code, like a `Predicate`; a value that passes the other constraints still needs them.
+Nested models have their own `fields`, list items their own table under `items`.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from threading import Lock
+from types import NoneType, UnionType
+from typing import Annotated, Any, Iterator, Literal, Union, get_args, get_origin
+from weakref import WeakKeyDictionary
+
+import annotated_types as at
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    PlainValidator,
+    WrapValidator,
+)
+from pydantic.fields import FieldInfo
+from pydantic_forms.types import JSON
+
+from async_validation import AsyncPredicate
+from choice_source import ChoiceSource
+from compression import compress_all
+from json_response import dumps
+from schema_cache import make_etag
+from unique_list import validate_unique_list
+
+Constraints = dict[str, Any]
+
+_TYPES = {
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    # Given as a number or a string, like "1234.56", as in the JSON schema
+    Decimal: ["number", "string"],
+    str: "string",
+}
+
+_BOUNDS = {
+    at.Gt: ("gt", "exclusiveMinimum"),
+    at.Ge: ("ge", "minimum"),
+    at.Lt: ("lt", "exclusiveMaximum"),
+    at.Le: ("le", "maximum"),
+    at.MultipleOf: ("multiple_of", "multipleOf"),
+}
+
+# Constraints of `Field(...)` that pydantic keeps in a metadata object of its own
+_GENERAL = {
+    "pattern": "pattern",
+    "decimal_places": "decimalPlaces",
+    "max_digits": "maxDigits",
+}
+
+_VALIDATORS = (AfterValidator, BeforeValidator, PlainValidator, WrapValidator)
+
+
+def _name(func: Any) -> str:
+    return getattr(func, "__name__", repr(func))
+
+
+def _flatten(metadata: list[Any]) -> Iterator[Any]:
+    for item in metadata:
+        if isinstance(item, FieldInfo):
+            yield from _flatten(item.metadata)
+            yield item
+        elif isinstance(item, at.GroupedMetadata):
+            yield from _flatten(list(item))
+        else:
+            yield item
+
+
+def _add_metadata(table: Constraints, metadata: list[Any]) -> None:
+    is_array = table.get("type") == "array"
+    for item in _flatten(metadata):
+        if bounds := _BOUNDS.get(type(item)):
+            attribute, key = bounds
+            table[key] = getattr(item, attribute)
+        elif isinstance(item, at.MinLen):
+            table["minItems" if is_array else "minLength"] = item.min_length
+        elif isinstance(item, at.MaxLen):
+            table["maxItems" if is_array else "maxLength"] = item.max_length
+        elif isinstance(item, (at.Predicate, AsyncPredicate)):
+            table.setdefault("serverOnly", []).append(_name(item.func))
+        elif isinstance(item, _VALIDATORS):
+            if item.func is validate_unique_list:
+                table["uniqueItems"] = True
+            else:
+                table.setdefault("serverOnly", []).append(_name(item.func))
+        elif isinstance(item, ChoiceSource):
+            table.setdefault("serverOnly", []).append(item.name)
+        elif isinstance(item, FieldInfo):
+            extra = item.json_schema_extra
+            if isinstance(extra, dict) and extra.get("uniqueItems"):
+                table["uniqueItems"] = True
+        else:
+            for attribute, key in _GENERAL.items():
+                if (value := getattr(item, attribute, None)) is not None:
+                    table[key] = value
+
+
+def compile_annotation(
+    annotation: Any, metadata: list[Any] | tuple = (), seen: tuple[type, ...] = ()
+) -> Constraints:
+    """Return the constraints of a value of type `annotation` with extra `metadata`."""
+    metadata = list(metadata)
+    while get_origin(annotation) is Annotated:
+        annotation, *extra = get_args(annotation)
+        metadata = extra + metadata
+
+    table: Constraints = {}
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) < len(get_args(annotation)):
+            table["nullable"] = True
+        if len(args) == 1:
+            table |= compile_annotation(args[0], [], seen)
+    elif origin in (list, set, frozenset, tuple):
+        table["type"] = "array"
+        args = get_args(annotation)
+        if len(args) == 1 or (len(args) == 2 and args[1] is Ellipsis):
+            if items := compile_annotation(args[0], [], seen):
+                table["items"] = items
+    elif origin is Literal:
+        table["enum"] = list(get_args(annotation))
+    elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        table["type"] = "object"
+        if annotation not in seen:
+            table |= compile_page(annotation, (*seen, annotation))
+    elif isinstance(annotation, type) and issubclass(annotation, Enum):
+        table["enum"] = [member.value for member in annotation]
+    elif annotation in _TYPES:
+        table["type"] = _TYPES[annotation]
+
+    _add_metadata(table, metadata)
+    return table
+
+
+def compile_page(page: type[BaseModel], seen: tuple[type, ...] = ()) -> Constraints:
+    """Return the constraint table of a page or nested model."""
+    fields: dict[str, Constraints] = {}
+    for name, info in page.model_fields.items():
+        table = compile_annotation(info.annotation, info.metadata, (*seen, page))
+        if info.is_required():
+            table = {"required": True} | table
+        fields[name] = table
+
+    decorators = page.__pydantic_decorators__
+    for decorator in decorators.field_validators.values():
+        names = decorator.info.fields
+        for name in fields if "*" in names else names:
+            fields[name].setdefault("serverOnly", []).append(_name(decorator.func))
+
+    table: Constraints = {"fields": fields}
+    if model_validators := [
+        _name(decorator.func) for decorator in decorators.model_validators.values()
+    ]:
+        table["serverOnly"] = model_validators
+    return table
+
+
+@dataclass(frozen=True)
+class CachedConstraints:
+    table: JSON
+    body: bytes
+    etag: str
+    # Compressed copies of `body` by content encoding
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+def build_cached_constraints(page: type[BaseModel]) -> CachedConstraints:
+    table = compile_page(page)
+    body = dumps(table)
+    return CachedConstraints(
+        table=table, body=body, etag=make_etag(body), encoded=compress_all(body)
+    )
+
+
+class ConstraintCache:
+    """Cache of `CachedConstraints` per page class, weakly keyed like the schema cache."""
+
+    def __init__(self) -> None:
+        self._entries: WeakKeyDictionary[type[BaseModel], CachedConstraints] = (
+            WeakKeyDictionary()
+        )
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, page: type[BaseModel]) -> CachedConstraints:
+        if (cached := self._entries.get(page)) is None:
+            cached = build_cached_constraints(page)
+            with self._lock:
+                cached = self._entries.setdefault(page, cached)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+constraint_cache = ConstraintCache()
@@ -0,0 +1,98 @@
+"""Validate a single field of a form page, for as-you-type feedback in the frontend.
+
+Each field gets a model of its own, with the field's annotation and constraints, the
+page's config and the page's `@field_validator`s of the field, cached per page class, so
+validating one value costs about as much as the field validators themselves. Validators
+that read other fields from `info.data` find none of them, as when those fields failed.
+"""
+
+from functools import partial
+from threading import Lock
+from typing import Any
+
+from pydantic import BaseModel, ValidationError, create_model, field_validator
+from pydantic_core import (
+    ErrorDetails,
+    InitErrorDetails,
+    PydanticCustomError,
+    PydanticKnownError,
+)
+from pydantic_forms.exceptions import FormValidationError
+
+from form_engine import tr
+
+# The models of a page's fields are kept on the page class itself: they hold on to the
+# page through its validators, so a weak mapping keyed by the page would never let go
+_MODELS = "__field_models__"
+_lock = Lock()
+
+
+def _field_validators(page: type[BaseModel], field_name: str) -> dict[str, Any]:
+    # Bound to the page, so `cls` is the page as in a post; in a `partial`, so it stays bound
+    validators = {}
+    for name, decorator in page.__pydantic_decorators__.field_validators.items():
+        if field_name in decorator.info.fields or "*" in decorator.info.fields:
+            validators[name] = field_validator(
+                field_name, mode=decorator.info.mode, check_fields=False
+            )(partial(getattr(page, decorator.cls_var_name)))
+    return validators
+
+
+def field_model(page: type[BaseModel], field_name: str) -> type[BaseModel]:
+    """Return the cached model of just `field_name`; raises `KeyError` for unknown fields."""
+    if (model := page.__dict__.get(_MODELS, {}).get(field_name)) is None:
+        field = page.model_fields[field_name]
+        model = create_model(  # type: ignore[call-overload]
+            page.__name__,
+            __config__=page.model_config,
+            __validators__=_field_validators(page, field_name),
+            **{field_name: (field.annotation, field)},
+        )
+        with _lock:
+            if _MODELS not in page.__dict__:
+                # Not inherited: a subclass of a page has models of its own
+                setattr(page, _MODELS, {})
+            model = page.__dict__[_MODELS].setdefault(field_name, model)
+    return model
+
+
+def _prefix_loc(prefix: tuple[str | int, ...], error: ErrorDetails) -> InitErrorDetails:
+    ctx = error.get("ctx")
+    try:
+        PydanticKnownError(error["type"], ctx)  # type: ignore[arg-type]
+        error_type: str | PydanticCustomError = error["type"]
+    except KeyError:
+        # e.g. the "unique_list" error of `unique_conlist`
+        error_type = PydanticCustomError(error["type"], error["msg"], ctx)
+    line_error: InitErrorDetails = {
+        "type": error_type,
+        "loc": (*prefix, *error["loc"]),
+        "input": error["input"],
+    }
+    if ctx is not None:
+        line_error["ctx"] = ctx
+    return line_error
+
+
+def convert_errors_at(
+    page: type[BaseModel],
+    error: ValidationError,
+    prefix: tuple[str | int, ...],
+    locale: str = "en_US",
+) -> list[ErrorDetails]:
+    """Convert the errors of validating part of a page, located at `prefix` within the page."""
+    line_errors = [_prefix_loc(prefix, details) for details in error.errors()]
+    page_error = ValidationError.from_exception_data(page.__name__, line_errors)
+    return FormValidationError(page.__name__, page_error, tr, locale).errors
+
+
+def validate_field(
+    page: type[BaseModel], field_name: str, value: Any, locale: str = "en_US"
+) -> list[ErrorDetails]:
+    """Return the errors of `value` for a field, the same as a post of the whole page would."""
+    model = field_model(page, field_name)
+    try:
+        model.model_validate({field_name: value}, by_name=True)
+    except ValidationError as e:
+        return convert_errors_at(page, e, (), locale)
+    return []
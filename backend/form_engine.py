@@ -0,0 +1,178 @@
+"""Form engine used by the endpoints, a drop-in replacement for `pydantic_forms.core.post_form`.
+
+It behaves the same, but takes the schema of the next page from the schema cache instead
+of generating it on every request. Given a `Checkpoint` it replays the pages validated in
+earlier requests without validating them again. A page may also be given as the raw
+bytes of its JSON object, which is then validated in JSON mode without building a dict.
+The lookups of `AsyncPredicate` validators run concurrently once per page.
+"""
+
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Any, Union
+
+import structlog
+from pydantic import BaseModel, ValidationError
+from pydantic_forms.core.translations import translations
+from pydantic_forms.exceptions import (
+    FormException,
+    FormNotCompleteError,
+    FormOverflowError,
+    FormValidationError,
+)
+from pydantic_forms.types import InputForm, State, StateInputFormGenerator
+from pydantic_i18n import PydanticI18n
+
+from async_validation import request_lookups, run_pending_lookups
+from form_registry import registry
+from metrics import FORM_ERRORS, PAGE_VALIDATION_DURATION, REPLAYED_PAGES, current_form
+from schema_cache import CachedSchema, schema_cache
+
+logger = structlog.get_logger(__name__)
+
+tr = PydanticI18n(translations)
+
+
+class PageNotCompleteError(FormNotCompleteError):
+    """`FormNotCompleteError` that also carries the page class and its cached schema."""
+
+    page: type[BaseModel]
+    cached: CachedSchema
+
+    def __init__(self, page: type[BaseModel], cached: CachedSchema):
+        super().__init__(cached.form, meta=cached.meta)
+        self.page = page
+        self.cached = cached
+
+
+class FormSessionError(FormException):
+    """Raised when a form session checkpoint is unknown, expired or does not fit the form."""
+
+
+@dataclass
+class Checkpoint:
+    """The pages of a form that have been validated so far, in order.
+
+    Pages are stored as their validated field values, so they can be restored with
+    `model_construct` instead of being validated again.
+    """
+
+    form_key: str
+    pages: list[tuple[str, dict[str, Any], set[str]]] = field(default_factory=list)
+
+    def record(self, page: BaseModel) -> None:
+        self.pages.append(
+            (type(page).__name__, dict(page.__dict__), set(page.model_fields_set))
+        )
+
+    def restore(self, page: InputForm, index: int) -> BaseModel:
+        name, values, fields_set = self.pages[index]
+        if name != page.__name__:
+            raise FormSessionError(
+                f"Form session expected page {name} but the form yielded {page.__name__}"
+            )
+        return page.model_construct(fields_set, **values)
+
+
+UserInput = Union[State, bytes]
+
+
+def _validate(page: InputForm, user_input: UserInput) -> BaseModel:
+    if isinstance(user_input, bytes):
+        return page.model_validate_json(user_input)
+    return page(**user_input)
+
+
+def validate_page(page: InputForm, user_input: UserInput, locale: str) -> BaseModel:
+    with PAGE_VALIDATION_DURATION.time(form=current_form.get(), page=page.__name__):
+        try:
+            try:
+                validated = _validate(page, user_input)
+            except ValidationError:
+                # Failed lookups are reported along with the other errors
+                if not run_pending_lookups():
+                    raise
+            else:
+                if not run_pending_lookups():
+                    return validated
+            # Again, now with the results of the lookups to raise their errors
+            return _validate(page, user_input)
+        except ValidationError as e:
+            raise FormValidationError(page.__name__, e, tr, locale) from e
+
+
+def post_form(
+    form_generator: Union[StateInputFormGenerator, None],
+    state: State,
+    user_inputs: list[UserInput],
+    locale: str = "en_US",
+    extra_translations: Union[dict[str, str], None] = None,
+    checkpoint: Union[Checkpoint, None] = None,
+) -> State:
+    """Validate `user_inputs` page by page; raise the next page if the form is not complete."""
+    if not form_generator:
+        return {}
+
+    form = registry.form_key(form_generator) or form_generator.__name__
+    token = current_form.set(form)
+    try:
+        with request_lookups():
+            return _post_form(form_generator, state, user_inputs, locale, checkpoint)
+    except FormNotCompleteError:
+        raise
+    except FormException as exc:
+        # Validation errors name the page, other errors are about the form as a whole
+        page = getattr(exc, "validator_name", "")
+        FORM_ERRORS.inc(form=form, page=page, error=type(exc).__name__)
+        raise
+    finally:
+        current_form.reset(token)
+
+
+def _post_form(
+    form_generator: StateInputFormGenerator,
+    state: State,
+    user_inputs: list[UserInput],
+    locale: str,
+    checkpoint: Union[Checkpoint, None],
+) -> State:
+    current_state = deepcopy(state)
+
+    # Only the size: rendering every submitted page costs more than validating it
+    logger.debug("Post form", state_keys=list(state), user_inputs=len(user_inputs))
+
+    generator = form_generator(current_state)
+    remaining = len(user_inputs)
+    try:
+        generated_form: InputForm = generator.send(None)
+
+        if checkpoint is None:
+            # Without a session, the pages of earlier posts are all validated again
+            replayed = max(len(user_inputs) - 1, 0)
+            REPLAYED_PAGES.observe(replayed, form=current_form.get())
+        else:
+            # Pages validated in an earlier request are restored instead of validated again
+            REPLAYED_PAGES.observe(len(checkpoint.pages), form=current_form.get())
+            for index in range(len(checkpoint.pages)):
+                form_validated_data = checkpoint.restore(generated_form, index)
+                current_state.update(form_validated_data.model_dump())
+                generated_form = generator.send(form_validated_data)
+
+        for user_input in user_inputs:
+            form_validated_data = validate_page(generated_form, user_input, locale)
+            remaining -= 1
+            if checkpoint is not None:
+                checkpoint.record(form_validated_data)
+
+            current_state.update(form_validated_data.model_dump())
+
+            generated_form = generator.send(form_validated_data)
+
+        raise PageNotCompleteError(generated_form, schema_cache.get(generated_form))
+    except StopIteration as e:
+        if remaining:
+            raise FormOverflowError(
+                f"Did not process all user_inputs ({remaining} remaining)"
+            )
+
+        return e.value
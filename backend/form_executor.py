@@ -0,0 +1,33 @@
+"""Run the synchronous, CPU-bound form processing off the event loop.
+
+Form posts run in worker threads, at most `FORM_MAX_CONCURRENCY` at a time, so a large
+submission no longer stalls every other request handled by the same worker. Posts over
+the limit wait for a free thread without blocking the event loop.
+"""
+
+import os
+from functools import partial
+from typing import Callable, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+T = TypeVar("T")
+
+FORM_MAX_CONCURRENCY = int(os.getenv("FORM_MAX_CONCURRENCY", "4"))
+
+_limiter: CapacityLimiter | None = None
+
+
+def get_limiter() -> CapacityLimiter:
+    # Created lazily, a limiter is bound to the event loop that first uses it
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(FORM_MAX_CONCURRENCY)
+    return _limiter
+
+
+async def run_in_executor(func: Callable[..., T], *args, **kwargs) -> T:
+    """Call `func` in a worker thread and wait for its result without blocking the event loop."""
+    return await to_thread.run_sync(
+        partial(func, *args, **kwargs), limiter=get_limiter()
+    )
@@ -0,0 +1,182 @@
+"""All page schemas of a static form in one response.
+
+Most wizards yield the same pages in the same order whatever the user answers, but the
+frontend still needs a round trip per page to learn the schema of the next one. For
+those forms `GET /forms/{form_key}/manifest` returns every page schema at once, so the
+frontend can prefetch the next page while the user fills in the current one.
+
+A form is static when its generator decides on the next page without looking at the
+form state or at the answers so far. `probe_pages` finds out by running the generator
+with a state and answers that record any use; using the answers to build the result
+after the last page is fine.
+"""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_forms.types import StateInputFormGenerator
+
+from compression import compress_all
+from json_response import dumps
+from metrics import current_form
+from schema_cache import make_etag, schema_cache
+
+MAX_PAGES = 100
+
+
+class _Probe:
+    """Stands in for the state and answers; records being looked at and plays along."""
+
+    def __init__(self) -> None:
+        self.used = False
+
+    def _use(self) -> "_Probe":
+        self.used = True
+        return self
+
+    def __getattr__(self, name: str) -> "_Probe":
+        return self._use()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> "_Probe":
+        return self._use()
+
+    def __getitem__(self, key: Any) -> "_Probe":
+        return self._use()
+
+    def get(self, key: Any, default: Any = None) -> "_Probe":
+        return self._use()
+
+    def __contains__(self, key: Any) -> bool:
+        self._use()
+        return False
+
+    def __iter__(self) -> Any:
+        self._use()
+        return iter(())
+
+    def keys(self) -> list:
+        self._use()
+        return []
+
+    def __bool__(self) -> bool:
+        self._use()
+        return True
+
+    def __or__(self, other: Any) -> "_Probe":
+        return self._use()
+
+    __ror__ = __or__
+
+    def __eq__(self, other: Any) -> bool:
+        self._use()
+        return False
+
+    def __ne__(self, other: Any) -> bool:
+        self._use()
+        return True
+
+    def __lt__(self, other: Any) -> bool:
+        self._use()
+        return False
+
+    __le__ = __gt__ = __ge__ = __lt__
+
+    def __hash__(self) -> int:
+        self._use()
+        return id(self)
+
+
+def probe_pages(generator: StateInputFormGenerator) -> list[type[BaseModel]] | None:
+    """Return the pages `generator` always yields, or `None` if they depend on its input."""
+    probe = _Probe()
+    form = generator(probe)  # type: ignore[arg-type]
+    pages: list[type[BaseModel]] = []
+    try:
+        page = next(form)
+        while not probe.used and len(pages) < MAX_PAGES:
+            if not (isinstance(page, type) and issubclass(page, BaseModel)):
+                return None
+            pages.append(page)
+            page = form.send(probe)
+        return None
+    except StopIteration:
+        return pages
+    except Exception:
+        # Whatever the generator did with the probe, its pages can't be known up front
+        return None
+    finally:
+        form.close()
+
+
+@dataclass(frozen=True)
+class FormManifest:
+    pages: list[type[BaseModel]]
+    body: bytes
+    etag: str
+    # Compressed copies of `body` by content encoding
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+def build_manifest(
+    form_key: str, pages: list[type[BaseModel]], bundled: bool = False
+) -> FormManifest:
+    token = current_form.set(form_key)
+    try:
+        schemas = [schema_cache.get(page) for page in pages]
+    finally:
+        current_form.reset(token)
+    content = {
+        "form_key": form_key,
+        "pages": [
+            {
+                "name": page.__name__,
+                "form": ((bundled and cached.bundled) or cached).form,
+                "meta": cached.meta,
+            }
+            for page, cached in zip(pages, schemas)
+        ],
+    }
+    body = dumps(content)
+    return FormManifest(
+        pages=pages, body=body, etag=make_etag(body), encoded=compress_all(body)
+    )
+
+
+class ManifestCache:
+    """Manifest per static form, built on first use; forms that aren't static are remembered too."""
+
+    def __init__(self) -> None:
+        self._static: dict[StateInputFormGenerator, list[type[BaseModel]] | None] = {}
+        self._manifests: dict[tuple[StateInputFormGenerator, bool], FormManifest] = {}
+        self._lock = Lock()
+
+    def static_pages(
+        self, generator: StateInputFormGenerator
+    ) -> list[type[BaseModel]] | None:
+        """Return the pages of a static form, `None` if it isn't static."""
+        if generator not in self._static:
+            pages = probe_pages(generator)
+            with self._lock:
+                self._static.setdefault(generator, pages)
+        return self._static[generator]
+
+    def get(
+        self, form_key: str, generator: StateInputFormGenerator, bundled: bool = False
+    ) -> FormManifest | None:
+        if (pages := self.static_pages(generator)) is None:
+            return None
+        if (manifest := self._manifests.get((generator, bundled))) is None:
+            manifest = build_manifest(form_key, pages, bundled)
+            with self._lock:
+                manifest = self._manifests.setdefault((generator, bundled), manifest)
+        return manifest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._static.clear()
+            self._manifests.clear()
+
+
+manifest_cache = ManifestCache()
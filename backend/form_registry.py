@@ -0,0 +1,136 @@
+"""Registry of form generators and their page classes.
+
+Page classes are built once, at import or on first use, and shared by every request.
+Pages that depend on the form `state` are built by a factory and cached on the state
+values they close over.
+"""
+
+from functools import wraps
+from typing import Any, Callable, Hashable, TypeVar
+
+from pydantic import BaseModel
+from pydantic_forms.types import State, StateInputFormGenerator
+
+from cache import LRUCache
+
+P = TypeVar("P", bound=type[BaseModel])
+
+
+def freeze(value: Any) -> Hashable:
+    """Turn a JSON-like value into something hashable, so it can be used as a cache key.
+
+    Containers are tagged with their kind, so a dict and a list of pairs, or a list and
+    a tuple, don't get the same key.
+    """
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((k, freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return ("list", tuple(freeze(v) for v in value))
+    if isinstance(value, tuple):
+        return ("tuple", tuple(freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, BaseModel):
+        return (type(value), freeze(value.model_dump()))
+    return value
+
+
+class PageFactory:
+    """Build a page class from a subset of the form state, caching one class per distinct state.
+
+    The factory is called with the values of `state_keys` as keyword arguments.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., type[BaseModel]],
+        state_keys: tuple[str, ...],
+        maxsize: int,
+    ):
+        self.factory = factory
+        self.state_keys = state_keys
+        self.pages: LRUCache[Hashable, type[BaseModel]] = LRUCache(maxsize)
+        wraps(factory)(self)
+
+    def __call__(self, state: State | None = None) -> type[BaseModel]:
+        values = {key: (state or {}).get(key) for key in self.state_keys}
+        key = freeze(tuple(values.values()))
+        return self.pages.get_or_set(key, lambda: self.factory(**values))
+
+    @property
+    def is_static(self) -> bool:
+        return not self.state_keys
+
+
+class FormRegistry:
+    def __init__(self) -> None:
+        self.forms: dict[str, StateInputFormGenerator] = {}
+        self.pages: dict[str, list[type[BaseModel]]] = {}
+        self.factories: dict[str, list[PageFactory]] = {}
+
+    def form(self, form_key: str) -> Callable[[Callable], Callable]:
+        """Register a form generator under `form_key`."""
+
+        def decorator(generator: StateInputFormGenerator) -> StateInputFormGenerator:
+            if form_key in self.forms and self.forms[form_key] is not generator:
+                raise ValueError(f"Form {form_key} is already registered")
+            self.forms[form_key] = generator
+            return generator
+
+        return decorator
+
+    def page(self, form_key: str) -> Callable[[P], P]:
+        """Register a page class of `form_key`; the class itself is built at import."""
+
+        def decorator(page: P) -> P:
+            self.pages.setdefault(form_key, []).append(page)
+            return page
+
+        return decorator
+
+    def page_factory(
+        self, form_key: str, *state_keys: str, maxsize: int = 128
+    ) -> Callable[[Callable[..., type[BaseModel]]], PageFactory]:
+        """Register a factory for a page class that depends on the form state.
+
+        Classes are cached on the values of `state_keys`; without keys the class is built
+        once, on first use.
+        """
+
+        def decorator(factory: Callable[..., type[BaseModel]]) -> PageFactory:
+            page_factory = PageFactory(factory, state_keys, maxsize)
+            self.factories.setdefault(form_key, []).append(page_factory)
+            return page_factory
+
+        return decorator
+
+    def get_form(self, form_key: str) -> StateInputFormGenerator:
+        return self.forms[form_key]
+
+    def form_key(self, generator: StateInputFormGenerator) -> str | None:
+        return next(
+            (key for key, form in self.forms.items() if form is generator), None
+        )
+
+    def get_page(self, form_key: str, page_name: str) -> type[BaseModel]:
+        """Return the page class named `page_name` of `form_key`; raises `KeyError` if unknown."""
+        pages = self.pages.get(form_key, []) + [
+            page
+            for factory in self.factories.get(form_key, [])
+            for page in factory.pages.values()
+        ]
+        for page in pages:
+            if page.__name__ == page_name:
+                return page
+        raise KeyError(page_name)
+
+    def all_pages(self) -> list[type[BaseModel]]:
+        """Return every page class that has been built so far."""
+        pages = [page for pages in self.pages.values() for page in pages]
+        for factories in self.factories.values():
+            for factory in factories:
+                pages.extend(factory.pages.values())
+        return pages
+
+
+registry = FormRegistry()
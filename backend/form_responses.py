@@ -0,0 +1,120 @@
+"""HTTP responses for form exceptions, serving next-page schemas from the schema cache."""
+
+import os
+from http import HTTPStatus
+
+from fastapi.requests import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic_forms.exception_handlers.fastapi import form_error_handler
+from pydantic_forms.exceptions import FormException, FormValidationError
+
+from compression import negotiate
+from form_engine import FormSessionError, PageNotCompleteError
+from form_sessions import SESSION_HEADER
+from json_response import FastJSONResponse
+from schema_cache import CachedSchema
+from schema_defs import DEFS_HEADER
+
+
+def _debug_enabled() -> bool:
+    return os.getenv("LOG_LEVEL_PYDANTIC_FORMS", "INFO").upper() == "DEBUG"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if not (if_none_match := request.headers.get("if-none-match")):
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    encoded: dict[str, bytes],
+    status_code: int,
+    vary: str = "Accept-Encoding",
+) -> Response:
+    """Return a cached JSON body, or a bodiless 304 when the client already has it.
+
+    The body is sent in the best of the precompressed `encoded` copies the client accepts.
+    Each encoding is a different representation, so it gets its own ETag.
+    """
+    headers = {"Vary": vary}
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if encoding := negotiate(accept_encoding, list(encoded)):
+        body = encoded[encoding]
+        etag = f'{etag[:-1]}-{encoding}"'
+        headers["Content-Encoding"] = encoding
+    headers["ETag"] = etag
+
+    if etag_matches(request, etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(
+        body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def wants_bundled_defs(request: Request) -> bool:
+    return request.headers.get(DEFS_HEADER, "").lower() == "bundle"
+
+
+def schema_response(request: Request, cached: CachedSchema) -> Response:
+    """Return the cached 510 body of a page, see `cached_response`.
+
+    Clients that send `X-Schema-Defs: bundle` get the variant that refers to the shared
+    definitions, if the page has one.
+    """
+    if wants_bundled_defs(request) and cached.bundled:
+        cached = cached.bundled
+    return cached_response(
+        request,
+        cached.body,
+        cached.etag,
+        cached.encoded,
+        HTTPStatus.NOT_EXTENDED,
+        vary=f"Accept-Encoding, {DEFS_HEADER}",
+    )
+
+
+async def form_exception_handler(
+    request: Request, exc: FormException
+) -> JSONResponse | Response:
+    """Like `form_error_handler`, but answers the next page from the schema cache with an ETag.
+
+    Validation errors are rendered with the fast serializer. Responses within a form
+    session carry the token of the session's latest checkpoint.
+    """
+    response: JSONResponse | Response
+    if isinstance(exc, FormSessionError):
+        status = HTTPStatus.GONE
+        content = {
+            "type": type(exc).__name__,
+            "detail": str(exc),
+            "title": "Form session expired",
+            "status": status,
+        }
+        response = FastJSONResponse(content, status_code=status)
+    # In debug mode the body carries a traceback, that is left to `form_error_handler`
+    elif isinstance(exc, PageNotCompleteError) and not _debug_enabled():
+        response = schema_response(request, exc.cached)
+    elif isinstance(exc, FormValidationError) and not _debug_enabled():
+        status = HTTPStatus.BAD_REQUEST
+        content = {
+            "type": type(exc).__name__,
+            "detail": str(exc),
+            "title": "Form not valid",
+            "status": status,
+            "validation_errors": exc.errors,
+        }
+        response = FastJSONResponse(content, status_code=status)
+    else:
+        response = await form_error_handler(request, exc)
+
+    if session_token := getattr(exc, "session_token", None):
+        response.headers[SESSION_HEADER] = session_token
+    return response
@@ -0,0 +1,111 @@
+"""Opt-in form sessions, so a wizard does not validate all earlier pages on every step.
+
+A client opts in by sending the `X-Form-Session: new` header. Every response that asks for
+the next page then carries a `X-Form-Session` token, which identifies a checkpoint holding
+the pages validated so far. Sending that token back with only the data of the new page(s)
+continues the form from the checkpoint. Checkpoints are immutable, so a client that goes
+back a page can simply reuse the token it received for that page.
+
+Checkpoints are pickled, and signed with an HMAC of `FORM_SESSION_SECRET` so that only
+checkpoints this app stored are ever unpickled, also from a shared store like Redis.
+Without the setting a random secret is made at import, shared by the workers of a
+preloaded gunicorn app but not across restarts or hosts.
+"""
+
+import hashlib
+import hmac
+import os
+import pickle
+import secrets
+
+import structlog
+from pydantic_forms.exceptions import FormException, FormNotCompleteError
+from pydantic_forms.types import State
+
+from form_engine import Checkpoint, FormSessionError, UserInput, post_form
+from form_registry import registry
+from session_store import InMemorySessionStore, SessionStore
+
+logger = structlog.get_logger(__name__)
+
+SESSION_HEADER = "X-Form-Session"
+NEW_SESSION = "new"
+
+FORM_SESSION_TTL = int(os.getenv("FORM_SESSION_TTL", "1800"))
+FORM_SESSION_MAXSIZE = int(os.getenv("FORM_SESSION_MAXSIZE", "10000"))
+_secret = os.getenv("FORM_SESSION_SECRET")
+FORM_SESSION_SECRET = _secret.encode() if _secret else secrets.token_bytes(32)
+
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class FormSessions:
+    def __init__(
+        self,
+        store: SessionStore,
+        ttl: int = 1800,
+        prefix: str = "form-session:",
+        secret: bytes | None = None,
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.prefix = prefix
+        self.secret = FORM_SESSION_SECRET if secret is None else secret
+
+    def _sign(self, data: bytes) -> bytes:
+        return hmac.new(self.secret, data, hashlib.sha256).digest()
+
+    def load(self, form_key: str, token: str) -> Checkpoint:
+        if token == NEW_SESSION:
+            return Checkpoint(form_key)
+        if (data := self.store.get(self.prefix + token)) is None:
+            raise FormSessionError("Form session is unknown or expired")
+        signature, data = data[:_DIGEST_SIZE], data[_DIGEST_SIZE:]
+        if not hmac.compare_digest(signature, self._sign(data)):
+            logger.warning("Form session checkpoint has an invalid signature")
+            raise FormSessionError("Form session is unknown or expired")
+        checkpoint: Checkpoint = pickle.loads(data)
+        if checkpoint.form_key != form_key:
+            raise FormSessionError(f"Form session does not belong to form {form_key}")
+        return checkpoint
+
+    def save(self, checkpoint: Checkpoint) -> str | None:
+        try:
+            data = pickle.dumps(checkpoint)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # E.g. a page built on the fly with a nested model class that cannot be imported
+            logger.warning(
+                "Form session checkpoint cannot be stored", form=checkpoint.form_key
+            )
+            return None
+        token = secrets.token_urlsafe(16)
+        self.store.set(self.prefix + token, self._sign(data) + data, ex=self.ttl)
+        return token
+
+    def post_form(
+        self, form_key: str, user_inputs: list[UserInput], token: str | None
+    ) -> State:
+        """Post the form registered as `form_key`, continuing the session `token` if given."""
+        form_generator = registry.get_form(form_key)
+        if token is None:
+            return post_form(form_generator, {}, user_inputs)
+
+        checkpoint = self.load(form_key, token)
+        try:
+            result = post_form(form_generator, {}, user_inputs, checkpoint=checkpoint)
+        except FormNotCompleteError as exc:
+            exc.session_token = self.save(checkpoint)  # type: ignore[attr-defined]
+            raise
+        except FormException as exc:
+            # Nothing of this request is kept; the client retries with the same checkpoint
+            exc.session_token = None if token == NEW_SESSION else token  # type: ignore[attr-defined]
+            raise
+
+        if token != NEW_SESSION:
+            self.store.delete(self.prefix + token)
+        return result
+
+
+form_sessions = FormSessions(
+    InMemorySessionStore(FORM_SESSION_MAXSIZE, FORM_SESSION_TTL), FORM_SESSION_TTL
+)
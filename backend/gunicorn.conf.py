@@ -0,0 +1,41 @@
+"""Gunicorn settings for running the backend with several uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is imported and warmed up once in the master process (`preload_app`), then
+frozen out of garbage collection before the workers are forked. The workers share the
+form pages, validators and cached schemas copy-on-write instead of each building their
+own copy.
+
+Metrics are kept per worker. With `METRICS_PORT` set, every worker serves its metrics
+on a port of its own, from `METRICS_PORT` up to one port per worker, for Prometheus to
+scrape each of them.
+"""
+
+import gc
+import os
+
+# Keep the collector from compacting the app's objects before they are frozen
+gc.disable()
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# Each worker starts a bulk pool of `BULK_WORKERS` processes, `workers` times as many
+# processes in all; by default the pools split the cores between the workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from warmup import preload
+
+    preload()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    if metrics_port := os.getenv("METRICS_PORT"):
+        from metrics import serve_metrics
+
+        serve_metrics(int(metrics_port), workers)
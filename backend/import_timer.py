@@ -0,0 +1,56 @@
+"""Measure how long the imports of the app take, per imported module.
+
+Installed at the very top of `main.py`, before anything else is imported, so this module
+only depends on the standard library.
+"""
+
+import builtins
+import sys
+from time import perf_counter
+
+
+class ImportTimer:
+    """Record the import time of each module imported by one module while installed.
+
+    A module's time includes the dependencies it imports first, so the times add up to the
+    total import time of the importing module.
+    """
+
+    def __init__(self) -> None:
+        self.times: dict[str, float] = {}
+        self.importer = ""
+        self._original = builtins.__import__
+
+    def install(self, importer: str) -> None:
+        self.importer = importer
+        if builtins.__import__ is not self._import:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if builtins.__import__ is self._import:
+            builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if (
+            level
+            or name in sys.modules
+            or (globals or {}).get("__name__") != self.importer
+        ):
+            return self._original(name, globals, locals, fromlist, level)
+
+        start = perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + perf_counter() - start
+
+    def report(self) -> dict[str, float]:
+        """Return the import time in milliseconds per module, slowest first."""
+        return {
+            name: round(seconds * 1000, 1)
+            for name, seconds in sorted(self.times.items(), key=lambda item: -item[1])
+        }
+
+
+import_timer = ImportTimer()
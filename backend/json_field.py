@@ -0,0 +1,107 @@
+"""`Json` fields that parse their JSON once, within a size and a depth limit.
+
+A pydantic `Json` field takes a string of JSON, so its value is decoded twice: once as
+part of the request body and once more by the field. `BoundedJson` takes the string as
+well, but also an object or list itself, e.g. `{"json_config": {"key": "value"}}`, which
+is then used as is. Either way the schema stays that of `Json`, a string of JSON, and
+other values fail with `json_type` as before.
+
+Strings larger than `JSON_FIELD_MAX_SIZE` bytes (default 64 KiB) or nested deeper than
+`JSON_FIELD_MAX_DEPTH` levels (default 16) are rejected before they are parsed. The same
+limits apply to an object or list, to the size of its JSON and its depth. Use
+`Annotated[Any, JsonLimits(max_size=..., max_depth=...)]` for limits of a field's own.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Annotated, Any
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import (
+    CoreSchema,
+    PydanticCustomError,
+    PydanticKnownError,
+    core_schema,
+    from_json,
+    to_json,
+)
+
+from raw_body import exceeds_depth, too_deep
+
+JSON_FIELD_MAX_SIZE = int(os.getenv("JSON_FIELD_MAX_SIZE", str(64 * 1024)))
+JSON_FIELD_MAX_DEPTH = int(os.getenv("JSON_FIELD_MAX_DEPTH", "16"))
+
+
+def _too_large(max_size: int) -> PydanticCustomError:
+    return PydanticCustomError(
+        "json_too_large",
+        "JSON should be at most {max_size} bytes",
+        {"max_size": max_size},
+    )
+
+
+def _depth_error(max_depth: int) -> PydanticCustomError:
+    return PydanticCustomError(
+        "json_too_deep",
+        "JSON should be nested at most {max_depth} levels",
+        {"max_depth": max_depth},
+    )
+
+
+def parse_json(value: str | bytes, max_size: int, max_depth: int) -> Any:
+    """Parse a string of JSON; raise `PydanticCustomError` when it is too large, too deep or invalid."""
+    # No string encodes to fewer bytes than it has characters, so skip encoding huge ones
+    if len(value) > max_size:
+        raise _too_large(max_size)
+    data = value.encode() if isinstance(value, str) else value
+    if len(data) > max_size:
+        raise _too_large(max_size)
+    if exceeds_depth(data, max_depth):
+        raise _depth_error(max_depth)
+    try:
+        return from_json(data)
+    except ValueError as e:
+        raise PydanticCustomError(
+            "json_invalid", "Invalid JSON: {error}", {"error": str(e)}
+        )
+
+
+def check_value(value: dict | list, max_size: int, max_depth: int) -> Any:
+    """Check the limits for a value given as is: the size of its JSON and its depth."""
+    if len(to_json(value)) > max_size:
+        raise _too_large(max_size)
+    if too_deep(value, max_depth):
+        raise _depth_error(max_depth)
+    return value
+
+
+@dataclass(frozen=True)
+class JsonLimits:
+    """Field metadata: parse a string of JSON within these limits, or check an object or list as is."""
+
+    max_size: int | None = None
+    max_depth: int | None = None
+
+    def validate(self, value: Any) -> Any:
+        max_size = JSON_FIELD_MAX_SIZE if self.max_size is None else self.max_size
+        max_depth = JSON_FIELD_MAX_DEPTH if self.max_depth is None else self.max_depth
+        if isinstance(value, (dict, list)):
+            return check_value(value, max_size, max_depth)
+        if not isinstance(value, (str, bytes, bytearray)):
+            raise PydanticKnownError("json_type")
+        return parse_json(
+            bytes(value) if isinstance(value, bytearray) else value, max_size, max_depth
+        )
+
+    def __get_pydantic_core_schema__(
+        self, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        return core_schema.no_info_plain_validator_function(self.validate)
+
+    def __get_pydantic_json_schema__(
+        self, schema: CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict[str, Any]:
+        return handler(core_schema.json_schema())
+
+
+BoundedJson = Annotated[Any, JsonLimits()]
@@ -0,0 +1,77 @@
+"""Serialization of the JSON response bodies, with a pluggable serializer.
+
+orjson is used when it is installed: it writes bytes directly and is several times faster
+than the standard library on the large page schemas. Both serializers produce the same
+output as starlette's `JSONResponse`: compact, UTF-8 and without escaping non-ASCII.
+
+`JSON_SERIALIZER` selects the serializer ("orjson" or "json"); `set_serializer` swaps it
+at runtime, e.g. to compare them in the benchmarks.
+"""
+
+import json
+import os
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+from pydantic_forms.utils.json import to_serializable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+Serializer = Callable[[Any], bytes]
+
+
+def _default(o: Any) -> Any:
+    try:
+        return to_serializable(o)
+    except TypeError:
+        # e.g. the Decimal in the context of a `multiple_of` error
+        return to_jsonable_python(o)
+
+
+def dumps_json(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def dumps_orjson(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+SERIALIZERS: dict[str, Serializer] = {"json": dumps_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = dumps_orjson
+
+_serializer: Serializer = SERIALIZERS[
+    os.getenv("JSON_SERIALIZER", "orjson" if orjson is not None else "json")
+]
+
+
+def get_serializer() -> Serializer:
+    return _serializer
+
+
+def set_serializer(serializer: str | Serializer) -> None:
+    global _serializer
+    _serializer = SERIALIZERS[serializer] if isinstance(serializer, str) else serializer
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a response body with the configured serializer."""
+    return _serializer(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` that renders with the configured serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
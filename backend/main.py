@@ -1,9 +1,19 @@
+# Installed first, to measure the imports below for the startup report
+from import_timer import import_timer
+
+import_timer.install(__name__)
+
+import gc
+import os
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 from enum import Enum
+from itertools import product
 from pathlib import Path
-from typing import Annotated, ClassVar, Iterator, Literal
+from typing import Annotated, AsyncIterator, ClassVar, Iterator, Literal
 from uuid import UUID
 
 from annotated_types import (
@@ -17,16 +27,18 @@ from annotated_types import (
     doc,
 )
 
-from fastapi import FastAPI
+from fastapi import Body, Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, Response
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, IPvAnyAddress, Json
-from pydantic_forms.core import FormPage, post_form
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, IPvAnyAddress
 from pydantic_forms.types import State
-from pydantic_forms.exception_handlers.fastapi import form_error_handler
 from pydantic_forms.exceptions import FormException
 from pydantic_forms.core import FormPage as PydanticFormsFormPage
 from pydantic_forms.types import JSON
+from pydantic_forms.utils.json import json_dumps, json_loads
 from pydantic_forms.validators import (
     LongText,
     Label,
@@ -34,9 +46,44 @@ from pydantic_forms.validators import (
     Hidden,
     Choice,
     choice_list,
-    unique_conlist,
 )
 
+from async_validation import AsyncPredicate
+from bulk import post_bulk, shutdown_pool
+from choice_source import choice_sources
+from compression import COMPRESSION_MIN_SIZE
+from constraints import constraint_cache
+from field_validation import validate_field
+from form_engine import UserInput
+from form_executor import run_in_executor
+from form_registry import registry
+from form_sessions import SESSION_HEADER, form_sessions
+from json_field import BoundedJson
+from json_response import FastJSONResponse, dumps
+from raw_body import FORM_DATA_OPENAPI, raw_form_data
+from unique_list import unique_conlist
+from uploads import UploadBytes, receive_upload
+from validator_cache import cached_validator, validator_caches
+from stream_validation import (
+    NDJSONStreamingResponse,
+    list_field_plan,
+    validate_ndjson,
+)
+from form_manifest import manifest_cache
+from form_responses import (
+    cached_response,
+    etag_matches,
+    form_exception_handler,
+    wants_bundled_defs,
+)
+from metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+from memory import live_subclasses
+from schema_cache import make_etag, schema_cache
+from schema_defs import DEFS_HEADER, schema_defs
+from warmup import lifespan
+
+import_timer.uninstall()
+
 # Choice,
 # CustomerId,
 # DisplaySubscription,
@@ -46,6 +93,9 @@ from pydantic_forms.validators import (
 
 
 class FormPage(PydanticFormsFormPage):
+    # Built by the warm-up at startup, or on first use when it is disabled
+    model_config = ConfigDict(defer_build=True)
+
     meta__: ClassVar[JSON] = {"hasNext": True}
 
 
@@ -53,7 +103,17 @@ class SubmitFormPage(FormPage):
     meta__: ClassVar[JSON] = {"hasNext": False}
 
 
-app = FastAPI()
+@asynccontextmanager
+async def app_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up at startup; stop the bulk worker processes at shutdown."""
+    try:
+        async with lifespan(app):
+            yield
+    finally:
+        shutdown_pool()
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=app_lifespan)
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -61,8 +121,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["ETag", SESSION_HEADER],
 )
-app.add_exception_handler(FormException, form_error_handler)  # type: ignore[arg-type]
+# Compresses the other responses; cached page schemas come precompressed
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    compresslevel=6,
+    # Streamed validation results should reach the client line by line
+    exclude_content_types=(*DEFAULT_EXCLUDED_CONTENT_TYPES, "application/x-ndjson"),
+)
+app.add_middleware(MetricsMiddleware)
+app.add_exception_handler(FormException, form_exception_handler)  # type: ignore[arg-type]
 
 
 @app.get("/")
@@ -78,7 +148,10 @@ class ExtraData(GroupedMetadata):
         yield Field(json_schema_extra=self.props)
 
 
-def example_backend_validation(val: int) -> bool:
+@cached_validator
+async def example_backend_validation(val: int) -> bool:
+    # Stands in for a lookup in another service; lookups of a page run concurrently,
+    # and their results are cached for the later steps of the form
     if val == 9:
         raise ValueError("Value cannot be 9")
     return True
@@ -89,7 +162,7 @@ NumberExample = Annotated[
     Ge(18),
     Le(99),
     MultipleOf(multiple_of=3),
-    Predicate(example_backend_validation),
+    AsyncPredicate(example_backend_validation),
 ]
 
 
@@ -165,69 +238,80 @@ TestPersonList = Annotated[
 ]
 
 
-@app.post("/form")
-async def form(form_data: list[dict] = []):
-    def form_generator(state: State):
-        class TestForm0(FormPage):
-            model_config = ConfigDict(title="Form Title Page 1")
-
-            number: NumberExample = 18
-            # list: TestExampleNumberList
-            # list_list: unique_conlist(TestExampleNumberList, min_items=1, max_items=5)
-            # list_list_list: unique_conlist(
-            # unique_conlist(Person2, min_items=1, max_items=5),
-            # min_items=1,
-            # max_items=2,
-            # ) = [1, 2]
-            test: TestString = "aa"
-            # textList: unique_conlist(TestString, min_items=1, max_items=5)
-            # numberList: TestExampleNumberList = [1, 2]
-            # person: Person2
-            # personList: unique_conlist(Person2, min_items=2, max_items=5)
-            # ingleNumber: NumberExample
-            # number0: Annotated[int, Ge(18), Le(99)] = 17
+@registry.page("form")
+class TestForm0(FormPage):
+    model_config = ConfigDict(title="Form Title Page 1")
+
+    number: NumberExample = 18
+    # list: TestExampleNumberList
+    # list_list: unique_conlist(TestExampleNumberList, min_items=1, max_items=5)
+    # list_list_list: unique_conlist(
+    # unique_conlist(Person2, min_items=1, max_items=5),
+    # min_items=1,
+    # max_items=2,
+    # ) = [1, 2]
+    test: TestString = "aa"
+    # textList: unique_conlist(TestString, min_items=1, max_items=5)
+    # numberList: TestExampleNumberList = [1, 2]
+    # person: Person2
+    # personList: unique_conlist(Person2, min_items=2, max_items=5)
+    # ingleNumber: NumberExample
+    # number0: Annotated[int, Ge(18), Le(99)] = 17
+
+
+@registry.page("form")
+class TestForm1(FormPage):
+    model_config = ConfigDict(title="Form Title Page 1")
+
+    contact_name2: Person
+    options: ListChoices
 
-        form_data_0 = yield TestForm0
 
-        class TestForm1(FormPage):
-            model_config = ConfigDict(title="Form Title Page 1")
+@registry.page("form")
+class TestForm2(FormPage):
+    model_config = ConfigDict(title="Form Title Page 2")
 
-            contact_name2: Person
-            options: ListChoices
+    contact_name3: Person2
+    age: NumberExample
 
-        form_data_1 = yield TestForm1
 
-        class TestForm2(FormPage):
-            model_config = ConfigDict(title="Form Title Page 2")
+@registry.page("form")
+class TestForm3(FormPage):
+    model_config = ConfigDict(title="Form Title Page 3")
 
-            contact_name3: Person2
-            age: NumberExample
+    contact_person: Person
 
-        form_data_2 = yield TestForm2
 
-        class TestForm3(FormPage):
-            model_config = ConfigDict(title="Form Title Page 3")
+@registry.page("form")
+class TestForm5(FormPage):
+    model_config = ConfigDict(title="Form Title Page 4")
 
-            contact_person: Person
+    contact_person_list: TestPersonList
 
-        form_data_3 = yield TestForm3
 
-        class TestForm5(FormPage):
-            model_config = ConfigDict(title="Form Title Page 4")
+@registry.form("form")
+def example_form_generator(state: State):
+    form_data_0 = yield TestForm0
+    form_data_1 = yield TestForm1
+    form_data_2 = yield TestForm2
+    form_data_3 = yield TestForm3
+    form_data_5 = yield TestForm5
 
-            contact_person_list: TestPersonList
+    return (
+        form_data_0.model_dump()
+        | form_data_1.model_dump()
+        | form_data_2.model_dump()
+        | form_data_3.model_dump()
+        | form_data_5.model_dump()
+    )
 
-        form_data_5 = yield TestForm5
 
-        return (
-            form_data_0.model_dump()
-            | form_data_1.model_dump()
-            | form_data_2.model_dump()
-            | form_data_3.model_dump()
-            | form_data_5.model_dump()
-        )
-
-    post_form(form_generator, state={}, user_inputs=form_data)
+@app.post("/form", openapi_extra=FORM_DATA_OPENAPI)
+async def form(
+    form_data: list[UserInput] = Depends(raw_form_data),
+    form_session: str | None = Header(default=None, alias=SESSION_HEADER),
+):
+    await run_in_executor(form_sessions.post_form, "form", form_data, form_session)
     return "OK!"
 
 
@@ -248,278 +332,293 @@ class Colors(Choice):
     VIOLET = ("#7C3AED", "Violet")
     YELLOW_DARK = ("#A16207", "Yellow Dark")
 
-@app.post("/form-full")
-async def form_full(form_data: list[dict] = []):
-    def form_generator(state: State):
-
-        # Page 1: Basic string and numeric types
-        class FullFormBasicTypes(FormPage):
-            model_config = ConfigDict(title="Basic Types - Strings and Numbers")
-
-            # String types
-            full_name: str = Field(
-                title="Full name",
-                description="Provide your full name.",
-            )
-            bio: str = Field(
-                title="Bio",
-                description="Short biography",
-                min_length=10,
-                max_length=500,
-            )
-
-            # Numeric types
-            age: int = Field(
-                title="Age",
-                description="Provide your age.",
-                ge=0,
-                le=150,
-            )
-            height: float = Field(
-                title="Height (meters)",
-                description="Your height in meters",
-                ge=0.0,
-                le=3.0,
-            )
-            balance: Decimal = Field(
-                title="Account Balance",
-                description="Your current balance",
-                decimal_places=2,
-            )
-
-        basic_types_data = yield FullFormBasicTypes
-
-        # Page 2: Boolean, Enum, and Literal types
-        class FullFormChoices(FormPage):
-            model_config = ConfigDict(title="Choices - Boolean, Enum, and Literal")
-
-            # Boolean
-            accept_terms: bool = Field(
-                title="Accept terms and conditions",
-                description="I agree to the terms and conditions",
-            )
-            newsletter: bool = Field(
-                title="Subscribe to newsletter",
-                description="Receive updates via email",
-                default=False,
-            )
-
-            # Enum
-            favorite_color: Colors = Field(
-                title="Favorite color",
-                description="Choose your favorite color from the palette",
-            )
-
-            # Literal
-            experience_level: Literal["beginner", "intermediate", "advanced", "expert"] = Field(
-                title="Experience level",
-                description="Select your skill level",
-                default="beginner",
-            )
-
-        choices_data = yield FullFormChoices
-
-        # Page 3: Date and time types
-        class FullFormDateTime(FormPage):
-            model_config = ConfigDict(title="Date and Time Types")
-
-            birth_date: date = Field(
-                title="Birth date",
-                description="Your date of birth",
-            )
-            appointment_time: datetime = Field(
-                title="Appointment",
-                description="Preferred appointment date and time",
-            )
-            preferred_time: time = Field(
-                title="Preferred meeting time",
-                description="What time do you prefer for meetings?",
-            )
-            session_duration: timedelta = Field(
-                title="Session duration",
-                description="How long should the session last?",
-            )
-
-        datetime_data = yield FullFormDateTime
-
-        # Page 4: Special validation types
-        class FullFormSpecialTypes(FormPage):
-            model_config = ConfigDict(title="Special Validation Types")
-
-            email: EmailStr = Field(
-                title="Email address",
-                description="Your valid email address",
-            )
-            website: HttpUrl = Field(
-                title="Website",
-                description="Your website URL",
-            )
-            ip_address: IPvAnyAddress = Field(
-                title="IP Address",
-                description="Your IP address (IPv4 or IPv6)",
-            )
-            user_id: UUID = Field(
-                title="User ID",
-                description="Your unique user identifier",
-            )
-            file_path: Path = Field(
-                title="File path",
-                description="Path to your configuration file",
-            )
-
-        special_types_data = yield FullFormSpecialTypes
-
-        # Page 5: Collection types
-        class FullFormCollections(FormPage):
-            model_config = ConfigDict(title="Collection Types - Lists, Dicts, Sets")
-
-            # List
-            tags: list[str] = Field(
-                title="Tags",
-                description="Add relevant tags",
-                min_length=1,
-                max_length=10,
-            )
-            scores: list[int] = Field(
-                title="Test scores",
-                description="Enter your test scores",
-                min_length=1,
-            )
-
-            # Dict
-            metadata: dict[str, str] = Field(
-                title="Metadata",
-                description="Key-value pairs for additional information",
-            )
-
-            # Set (unique values)
-            unique_skills: set[str] = Field(
-                title="Unique skills",
-                description="List your skills (duplicates will be removed)",
-            )
-
-            # Tuple
-            coordinates: tuple[float, float] = Field(
-                title="Coordinates",
-                description="Latitude and longitude",
-            )
-
-        collections_data = yield FullFormCollections
-
-        # Page 6: Optional and Union types
-        class FullFormOptional(FormPage):
-            model_config = ConfigDict(title="Optional and Union Types")
-
-            # Optional types
-            middle_name: str | None = Field(
-                title="Middle name",
-                description="Optional middle name",
-                default=None,
-            )
-            phone: str | None = Field(
-                title="Phone number",
-                description="Optional phone number",
-                default=None,
-            )
-
-            # Union types
-            reference_id: int | str = Field(
-                title="Reference ID",
-                description="Can be either a number or a string",
-            )
-
-        optional_data = yield FullFormOptional
-
-        # Page 7: Nested objects and complex types
-        class FullFormNested(FormPage):
-            model_config = ConfigDict(title="Nested Objects and Complex Types")
-
-            class Address(BaseModel):
-                street: str = Field(title="Street", description="Street name and number")
-                city: str = Field(title="City")
-                postal_code: str = Field(title="Postal code")
-                country: str = Field(title="Country")
-
-            class Education(BaseModel):
-                degree: str = Field(title="Degree", description="Type of degree")
-                institution: str = Field(title="Institution")
-                year: int = Field(title="Graduation year", ge=1900, le=2100)
-
-            # Nested object
-            address: Address = Field(
-                title="Address",
-                description="Your residential address",
-            )
-
-            # List of nested objects
-            education_history: unique_conlist(Education, min_items=1, max_items=5) = Field(
-                title="Education history",
-                description="Your educational background",
-            )
-
-        nested_data = yield FullFormNested
-
-        # Page 8: Constrained types with validation
-        class FullFormValidation(FormPage):
-            model_config = ConfigDict(title="Constrained Types with Validation")
-
-            # Constrained string
-            username: Annotated[str, Field(min_length=3, max_length=20, pattern=r"^[a-zA-Z0-9_]+$")] = Field(
-                title="Username",
-                description="Alphanumeric username (3-20 characters)",
-            )
-
-            # Constrained integer
-            rating: Annotated[int, Ge(1), Le(5)] = Field(
-                title="Rating",
-                description="Rate from 1 to 5",
-            )
-
-            # Constrained float
-            percentage: Annotated[float, Ge(0.0), Le(100.0)] = Field(
-                title="Completion percentage",
-                description="Enter percentage (0-100)",
-            )
-
-            # Constrained list
-            priority_list: Annotated[list[int], Field(min_length=3, max_length=5)] = Field(
-                title="Priority list",
-                description="Rank your top 3-5 priorities",
-            )
-
-        validation_data = yield FullFormValidation
-
-        # Page 9: JSON and bytes
-        class FullFormAdvanced(FormPage):
-            model_config = ConfigDict(title="Advanced Types - JSON and Bytes")
-
-            # JSON type
-            json_config: Json = Field(
-                title="JSON Configuration",
-                description="Provide configuration in JSON format",
-            )
-
-            # Bytes type
-            file_content: bytes = Field(
-                title="File content",
-                description="Binary file content",
-            )
-
-        advanced_data = yield FullFormAdvanced
-
-        return (
-            basic_types_data.model_dump()
-            | choices_data.model_dump()
-            | datetime_data.model_dump()
-            | special_types_data.model_dump()
-            | collections_data.model_dump()
-            | optional_data.model_dump()
-            | nested_data.model_dump()
-            | validation_data.model_dump()
-            | advanced_data.model_dump()
-        )
 
-    post_form(form_generator, state={}, user_inputs=form_data)
+# Page 1: Basic string and numeric types
+@registry.page("form-full")
+class FullFormBasicTypes(FormPage):
+    model_config = ConfigDict(title="Basic Types - Strings and Numbers")
+
+    # String types
+    full_name: str = Field(
+        title="Full name",
+        description="Provide your full name.",
+    )
+    bio: str = Field(
+        title="Bio",
+        description="Short biography",
+        min_length=10,
+        max_length=500,
+    )
+
+    # Numeric types
+    age: int = Field(
+        title="Age",
+        description="Provide your age.",
+        ge=0,
+        le=150,
+    )
+    height: float = Field(
+        title="Height (meters)",
+        description="Your height in meters",
+        ge=0.0,
+        le=3.0,
+    )
+    balance: Decimal = Field(
+        title="Account Balance",
+        description="Your current balance",
+        decimal_places=2,
+    )
+
+
+# Page 2: Boolean, Enum, and Literal types
+@registry.page("form-full")
+class FullFormChoices(FormPage):
+    model_config = ConfigDict(title="Choices - Boolean, Enum, and Literal")
+
+    # Boolean
+    accept_terms: bool = Field(
+        title="Accept terms and conditions",
+        description="I agree to the terms and conditions",
+    )
+    newsletter: bool = Field(
+        title="Subscribe to newsletter",
+        description="Receive updates via email",
+        default=False,
+    )
+
+    # Enum
+    favorite_color: Colors = Field(
+        title="Favorite color",
+        description="Choose your favorite color from the palette",
+    )
+
+    # Literal
+    experience_level: Literal["beginner", "intermediate", "advanced", "expert"] = Field(
+        title="Experience level",
+        description="Select your skill level",
+        default="beginner",
+    )
+
+
+# Page 3: Date and time types
+@registry.page("form-full")
+class FullFormDateTime(FormPage):
+    model_config = ConfigDict(title="Date and Time Types")
+
+    birth_date: date = Field(
+        title="Birth date",
+        description="Your date of birth",
+    )
+    appointment_time: datetime = Field(
+        title="Appointment",
+        description="Preferred appointment date and time",
+    )
+    preferred_time: time = Field(
+        title="Preferred meeting time",
+        description="What time do you prefer for meetings?",
+    )
+    session_duration: timedelta = Field(
+        title="Session duration",
+        description="How long should the session last?",
+    )
+
+
+# Page 4: Special validation types
+@registry.page("form-full")
+class FullFormSpecialTypes(FormPage):
+    model_config = ConfigDict(title="Special Validation Types")
+
+    email: EmailStr = Field(
+        title="Email address",
+        description="Your valid email address",
+    )
+    website: HttpUrl = Field(
+        title="Website",
+        description="Your website URL",
+    )
+    ip_address: IPvAnyAddress = Field(
+        title="IP Address",
+        description="Your IP address (IPv4 or IPv6)",
+    )
+    user_id: UUID = Field(
+        title="User ID",
+        description="Your unique user identifier",
+    )
+    file_path: Path = Field(
+        title="File path",
+        description="Path to your configuration file",
+    )
+
+
+# Page 5: Collection types
+@registry.page("form-full")
+class FullFormCollections(FormPage):
+    model_config = ConfigDict(title="Collection Types - Lists, Dicts, Sets")
+
+    # List
+    tags: list[str] = Field(
+        title="Tags",
+        description="Add relevant tags",
+        min_length=1,
+        max_length=10,
+    )
+    scores: list[int] = Field(
+        title="Test scores",
+        description="Enter your test scores",
+        min_length=1,
+    )
+
+    # Dict
+    metadata: dict[str, str] = Field(
+        title="Metadata",
+        description="Key-value pairs for additional information",
+    )
+
+    # Set (unique values)
+    unique_skills: set[str] = Field(
+        title="Unique skills",
+        description="List your skills (duplicates will be removed)",
+    )
+
+    # Tuple
+    coordinates: tuple[float, float] = Field(
+        title="Coordinates",
+        description="Latitude and longitude",
+    )
+
+
+# Page 6: Optional and Union types
+@registry.page("form-full")
+class FullFormOptional(FormPage):
+    model_config = ConfigDict(title="Optional and Union Types")
+
+    # Optional types
+    middle_name: str | None = Field(
+        title="Middle name",
+        description="Optional middle name",
+        default=None,
+    )
+    phone: str | None = Field(
+        title="Phone number",
+        description="Optional phone number",
+        default=None,
+    )
+
+    # Union types
+    reference_id: int | str = Field(
+        title="Reference ID",
+        description="Can be either a number or a string",
+    )
+
+
+# Page 7: Nested objects and complex types
+@registry.page("form-full")
+class FullFormNested(FormPage):
+    model_config = ConfigDict(title="Nested Objects and Complex Types")
+
+    class Address(BaseModel):
+        street: str = Field(title="Street", description="Street name and number")
+        city: str = Field(title="City")
+        postal_code: str = Field(title="Postal code")
+        country: str = Field(title="Country")
+
+    class Education(BaseModel):
+        degree: str = Field(title="Degree", description="Type of degree")
+        institution: str = Field(title="Institution")
+        year: int = Field(title="Graduation year", ge=1900, le=2100)
+
+    # Nested object
+    address: Address = Field(
+        title="Address",
+        description="Your residential address",
+    )
+
+    # List of nested objects
+    education_history: unique_conlist(Education, min_items=1, max_items=5) = Field(
+        title="Education history",
+        description="Your educational background",
+    )
+
+
+# Page 8: Constrained types with validation
+@registry.page("form-full")
+class FullFormValidation(FormPage):
+    model_config = ConfigDict(title="Constrained Types with Validation")
+
+    # Constrained string
+    username: Annotated[str, Field(min_length=3, max_length=20, pattern=r"^[a-zA-Z0-9_]+$")] = Field(
+        title="Username",
+        description="Alphanumeric username (3-20 characters)",
+    )
+
+    # Constrained integer
+    rating: Annotated[int, Ge(1), Le(5)] = Field(
+        title="Rating",
+        description="Rate from 1 to 5",
+    )
+
+    # Constrained float
+    percentage: Annotated[float, Ge(0.0), Le(100.0)] = Field(
+        title="Completion percentage",
+        description="Enter percentage (0-100)",
+    )
+
+    # Constrained list
+    priority_list: Annotated[list[int], Field(min_length=3, max_length=5)] = Field(
+        title="Priority list",
+        description="Rank your top 3-5 priorities",
+    )
+
+
+# Page 9: JSON and bytes
+@registry.page("form-full")
+class FullFormAdvanced(FormPage):
+    model_config = ConfigDict(title="Advanced Types - JSON and Bytes")
+
+    # JSON type, as a string of JSON or the value itself
+    json_config: BoundedJson = Field(
+        title="JSON Configuration",
+        description="Provide configuration in JSON format",
+    )
+
+    # Bytes type, or a file of a multipart post to /upload/form-full
+    file_content: UploadBytes = Field(
+        title="File content",
+        description="Binary file content",
+    )
+
+
+@registry.form("form-full")
+def full_form_generator(state: State):
+    basic_types_data = yield FullFormBasicTypes
+    choices_data = yield FullFormChoices
+    datetime_data = yield FullFormDateTime
+    special_types_data = yield FullFormSpecialTypes
+    collections_data = yield FullFormCollections
+    optional_data = yield FullFormOptional
+    nested_data = yield FullFormNested
+    validation_data = yield FullFormValidation
+    advanced_data = yield FullFormAdvanced
+
+    return (
+        basic_types_data.model_dump()
+        | choices_data.model_dump()
+        | datetime_data.model_dump()
+        | special_types_data.model_dump()
+        | collections_data.model_dump()
+        | optional_data.model_dump()
+        | nested_data.model_dump()
+        | validation_data.model_dump()
+        | advanced_data.model_dump()
+    )
+
+
+@app.post("/form-full", openapi_extra=FORM_DATA_OPENAPI)
+async def form_full(
+    form_data: list[UserInput] = Depends(raw_form_data),
+    form_session: str | None = Header(default=None, alias=SESSION_HEADER),
+):
+    await run_in_executor(form_sessions.post_form, "form-full", form_data, form_session)
     return "OK!"
 
 
@@ -530,59 +629,287 @@ class SimpleChoices(Choice):
     OPTION_C = ("c", "Option C")
 
 
-@app.post("/form-simple")
-async def form_simple(form_data: list[dict] = []):
+@registry.page("form-simple")
+class SimpleForm(SubmitFormPage):
+    model_config = ConfigDict(title="Simple Form - Scalar Fields Only")
+
+    # String field
+    full_name: str = Field(
+        title="Full Name",
+        description="Enter your full name",
+        min_length=2,
+        max_length=100,
+    )
+
+    # LongText field
+    comments: LongText = Field(
+        title="Comments",
+        description="Please provide any additional comments or feedback",
+    )
+
+    # Integer field
+    age: int = Field(
+        title="Age",
+        description="Your age in years",
+        ge=0,
+        le=150,
+    )
+
+    # Date field
+    birth_date: date = Field(
+        title="Birth Date",
+        description="Select your date of birth",
+    )
+
+    # Boolean field
+    subscribe: bool = Field(
+        title="Subscribe to Newsletter",
+        description="Check this box to receive our newsletter",
+        default=False,
+    )
+
+    # Choice field
+    preference: SimpleChoices = Field(
+        title="Preference",
+        description="Select your preference",
+    )
+
+
+@registry.form("form-simple")
+def simple_form_generator(state: State):
+    simple_form_data = yield SimpleForm
+
+    return simple_form_data.model_dump()
+
+
+@app.post("/form-simple", openapi_extra=FORM_DATA_OPENAPI)
+async def form_simple(
+    form_data: list[UserInput] = Depends(raw_form_data),
+    form_session: str | None = Header(default=None, alias=SESSION_HEADER),
+):
     """Simple form with only scalar field types - no arrays or objects."""
-    def form_generator(state: State):
-
-        class SimpleForm(SubmitFormPage):
-            model_config = ConfigDict(title="Simple Form - Scalar Fields Only")
-
-            # String field
-            full_name: str = Field(
-                title="Full Name",
-                description="Enter your full name",
-                min_length=2,
-                max_length=100,
-            )
-
-            # LongText field
-            comments: LongText = Field(
-                title="Comments",
-                description="Please provide any additional comments or feedback",
-            )
-
-            # Integer field
-            age: int = Field(
-                title="Age",
-                description="Your age in years",
-                ge=0,
-                le=150,
-            )
-
-            # Date field
-            birth_date: date = Field(
-                title="Birth Date",
-                description="Select your date of birth",
-            )
-
-            # Boolean field
-            subscribe: bool = Field(
-                title="Subscribe to Newsletter",
-                description="Check this box to receive our newsletter",
-                default=False,
-            )
-
-            # Choice field
-            preference: SimpleChoices = Field(
-                title="Preference",
-                description="Select your preference",
-            )
-
-        simple_form_data = yield SimpleForm
-
-        return simple_form_data.model_dump()
-
-    post_form(form_generator, state={}, user_inputs=form_data)
+    await run_in_executor(
+        form_sessions.post_form, "form-simple", form_data, form_session
+    )
     return "OK!"
 
+
+@app.post("/upload/{form_key}")
+async def upload_form(form_key: str, request: Request):
+    """Post a form as multipart, with the files of its `bytes` fields as parts of their own."""
+    if form_key not in registry.forms:
+        raise HTTPException(status_code=404, detail="Unknown form")
+    form_data, uploads = await receive_upload(request)
+    try:
+        await run_in_executor(form_sessions.post_form, form_key, form_data, None)
+    finally:
+        for upload in uploads:
+            upload.close()
+    return "OK!"
+
+
+@app.post("/validate/{form_key}/{page_name}/{field_name}")
+async def validate_form_field(
+    form_key: str, page_name: str, field_name: str, value: JSON = Body(embed=True)
+):
+    """Validate one field of one page, without posting and replaying the whole form."""
+    try:
+        page = registry.get_page(form_key, page_name)
+        errors = await run_in_executor(validate_field, page, field_name, value)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown form, page or field")
+    return {"valid": not errors, "validation_errors": json_loads(json_dumps(errors))}
+
+
+@app.get("/constraints/{form_key}/{page_name}")
+def get_page_constraints(form_key: str, page_name: str, request: Request):
+    """Constraint table of one page, for checking input in the frontend before posting."""
+    try:
+        page = registry.get_page(form_key, page_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown form or page")
+    cached = constraint_cache.get(page)
+    response = cached_response(request, cached.body, cached.etag, cached.encoded, 200)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+class BulkSubmission(BaseModel):
+    items: list[list[dict]]
+    chunk_size: int | None = Field(default=None, ge=1)
+
+
+@app.post("/bulk/{form_key}")
+async def bulk(form_key: str, submission: BulkSubmission):
+    """Validate many complete submissions of a form, returning a result per item in order."""
+    try:
+        results = await post_bulk(form_key, submission.items, submission.chunk_size)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Form {form_key} does not exist")
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Bulk workers are unavailable")
+    return {"results": results}
+
+
+@app.post("/stream/{form_key}/{page_name}/{field_name}")
+async def stream_list_field(
+    form_key: str, page_name: str, field_name: str, request: Request
+):
+    """Validate a list field item by item from an NDJSON body, streaming errors back."""
+    try:
+        plan = list_field_plan(registry.get_page(form_key, page_name), field_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown form, page or field")
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return NDJSONStreamingResponse(validate_ndjson(request.stream(), plan))
+
+
+NAME_PARTS = [
+    (
+        "Acme Apex Blue Bright Cedar Delta Eagle Fjord Global Harbor "
+        "Iris Juniper Kite Lumen Maple Nova Orbit Pine Quartz River"
+    ).split(),
+    (
+        "Analytics Bakery Cloud Dynamics Energy "
+        "Foods Logistics Media Networks Systems"
+    ).split(),
+    (
+        "B.V. Group Holding International Labs "
+        "Partners Services Solutions Studio Works"
+    ).split(),
+]
+
+
+@choice_sources.source("customers")
+def load_customers():
+    """Stand-in for a customer lookup, with more options than fit in a page schema."""
+    for i, words in enumerate(product(*NAME_PARTS, range(1, 11))):
+        yield f"{i:05d}", " ".join(map(str, words))
+
+
+@registry.page("form-customer")
+class CustomerForm(SubmitFormPage):
+    model_config = ConfigDict(title="Customer")
+
+    customer: Annotated[str, choice_sources.get("customers")] = Field(
+        title="Customer",
+        description="Search for the customer by name or number",
+    )
+
+
+@registry.form("form-customer")
+def customer_form_generator(state: State):
+    customer_data = yield CustomerForm
+
+    return customer_data.model_dump()
+
+
+@app.post("/form-customer", openapi_extra=FORM_DATA_OPENAPI)
+async def form_customer(
+    form_data: list[UserInput] = Depends(raw_form_data),
+    form_session: str | None = Header(default=None, alias=SESSION_HEADER),
+):
+    await run_in_executor(
+        form_sessions.post_form, "form-customer", form_data, form_session
+    )
+    return "OK!"
+
+
+@app.get("/forms/{form_key}/manifest")
+def get_form_manifest(form_key: str, request: Request):
+    """Every page schema of a form whose pages don't depend on its state or answers."""
+    try:
+        generator = registry.get_form(form_key)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown form")
+    manifest = manifest_cache.get(form_key, generator, wants_bundled_defs(request))
+    if manifest is None:
+        raise HTTPException(
+            status_code=409, detail="The pages of this form depend on its input"
+        )
+    response = cached_response(
+        request,
+        manifest.body,
+        manifest.etag,
+        manifest.encoded,
+        200,
+        vary=f"Accept-Encoding, {DEFS_HEADER}",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.get("/choices/{name}")
+def search_choices(
+    name: str,
+    q: str = "",
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """Search the options of a choice source by prefix of their label or value."""
+    try:
+        source = choice_sources.get(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown choice source")
+    total, options = source.search(q, offset, limit)
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "items": [{"value": value, "label": label} for value, label in options],
+    }
+
+
+@app.get("/schema-defs")
+def get_schema_defs(request: Request):
+    """All shared schema definitions published so far, by hash.
+
+    New definitions are added as pages are built, so the bundle is revalidated by ETag.
+    """
+    body = dumps({"$defs": schema_defs.bundle()})
+    headers = {"ETag": make_etag(body), "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/schema-defs/{digest}")
+def get_schema_def(digest: str):
+    """One shared schema definition, which never changes for its hash."""
+    if digest not in schema_defs:
+        raise HTTPException(status_code=404, detail="Unknown schema definition")
+    return Response(
+        dumps(schema_defs.get(digest)),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+# Off by default: the debug endpoints have no authentication and can trigger a collection
+FORM_DEBUG_ENDPOINTS = os.getenv("FORM_DEBUG_ENDPOINTS", "false").lower() == "true"
+
+
+@app.get("/debug/form-pages", include_in_schema=FORM_DEBUG_ENDPOINTS)
+def get_form_pages(collect: bool = False):
+    """Live page classes of this worker process, to check that pages built per request are freed."""
+    if not FORM_DEBUG_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if collect:
+        gc.collect()
+    pages = live_subclasses(PydanticFormsFormPage)
+    return {
+        "total": sum(pages.values()),
+        "pages": pages,
+        "schema_cache": len(schema_cache),
+        "constraint_cache": len(constraint_cache),
+        "validator_caches": {
+            name: cache.info() for name, cache in validator_caches.items()
+        },
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics of this worker process."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,67 @@
+"""Memory use of a process, from `/proc/<pid>/smaps_rollup` (Linux only).
+
+`Rss` counts every resident page of a process, including the ones shared with other
+processes; `Private_*` is what only this process uses, so it is what each extra worker
+costs. `Pss` divides shared pages evenly over the processes sharing them.
+
+Counts of live objects and classes, to find what holds on to that memory, work on any
+platform.
+"""
+
+import gc
+from collections import Counter
+
+FIELDS = (
+    "Rss",
+    "Pss",
+    "Shared_Clean",
+    "Shared_Dirty",
+    "Private_Clean",
+    "Private_Dirty",
+)
+
+
+def smaps_rollup(pid: int | str = "self") -> dict[str, int]:
+    """Return the memory counters of a process in KiB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def memory_report(pid: int | str = "self") -> dict[str, int]:
+    """Summarize `smaps_rollup` as resident, shared, private and proportional KiB."""
+    values = smaps_rollup(pid)
+    return {
+        "rss_kib": values["Rss"],
+        "pss_kib": values["Pss"],
+        "shared_kib": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private_kib": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def live_subclasses(base: type) -> dict[str, int]:
+    """Count the subclasses of `base` that are alive, direct or not, by qualified name.
+
+    Classes built on the fly can share a name, so a count above one is either a page
+    built for several states or classes that are not freed.
+    """
+    counts: dict[str, int] = {}
+    seen = set()
+    stack = [base]
+    while stack:
+        for cls in type.__subclasses__(stack.pop()):
+            if cls not in seen:
+                seen.add(cls)
+                stack.append(cls)
+                name = f"{cls.__module__}.{cls.__qualname__}"
+                counts[name] = counts.get(name, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def object_counts() -> dict[str, int]:
+    """Count the objects tracked by the garbage collector per type."""
+    return dict(Counter(type(obj).__qualname__ for obj in gc.get_objects()))
@@ -0,0 +1,300 @@
+"""Counters and histograms of the form processing, exposed in the Prometheus text format.
+
+A small in-process implementation: every worker process keeps its own values. Behind
+gunicorn, a scrape of `/metrics` on the shared port gets the values of whichever worker
+takes the request, so with several workers each one should be scraped on its own:
+`serve_metrics` serves the metrics of a worker on a port of its own, from a range with a
+port per worker, and Prometheus scrapes them all and sums the workers up.
+
+Metrics are labelled with the form key and page class, so it shows which page dominates
+the latency of a form. The form being processed is kept in the `current_form` context
+variable, which is copied along into the worker threads.
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds, from half a millisecond for simple pages to seconds for huge submissions
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+current_form: ContextVar[str] = ContextVar("current_form", default="")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        return _format_labels(dict(zip(self.labelnames, key)) | extra)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """The sample lines of the metric, in the Prometheus text format."""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield f"{self.name}_total{self._labels(key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), float("inf"))
+        # Per label set: a count per bucket (not cumulative), then the sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * len(self.buckets), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the `with` block, also when it raises."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = {
+                key: (list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            }
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = self._labels(key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return "".join(metric.render() for metric in self.metrics.values())
+
+
+metrics = MetricsRegistry()
+
+REQUEST_DURATION = metrics.histogram(
+    "form_request_duration_seconds",
+    "Duration of HTTP requests",
+    ("endpoint", "method", "status"),
+)
+PAGE_VALIDATION_DURATION = metrics.histogram(
+    "form_page_validation_duration_seconds",
+    "Duration of validating the input of one form page",
+    ("form", "page"),
+)
+SCHEMA_GENERATION_DURATION = metrics.histogram(
+    "form_schema_generation_duration_seconds",
+    "Duration of generating and serializing the JSON schema of a page",
+    ("form", "page"),
+)
+REPLAYED_PAGES = metrics.histogram(
+    "form_replayed_pages",
+    "Number of pages of earlier posts replayed per post, restored or validated again",
+    ("form",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21),
+)
+FORM_ERRORS = metrics.counter(
+    "form_errors",
+    "Form posts that ended with an error other than needing the next page",
+    ("form", "page", "error"),
+)
+VALIDATOR_CACHE_HITS = metrics.counter(
+    "form_validator_cache_hits",
+    "Calls of a cached validator answered from its cache",
+    ("validator",),
+)
+VALIDATOR_CACHE_MISSES = metrics.counter(
+    "form_validator_cache_misses",
+    "Calls of a cached validator that ran the validator",
+    ("validator",),
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve_metrics(
+    first_port: int, count: int, host: str = "0.0.0.0"
+) -> ThreadingHTTPServer:
+    """Serve the metrics of this process in a thread, on the first free port of `count`.
+
+    With a port per worker, a worker that is restarted takes the port of the one it
+    replaces. Raises `OSError` when all of them are taken.
+    """
+    for port in range(first_port, first_port + count):
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            continue
+        Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+    raise OSError(f"No free port for metrics in {first_port}-{first_port + count - 1}")
+
+
+class MetricsMiddleware:
+    """Observe the duration of every HTTP request, labelled with its route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                perf_counter() - start,
+                endpoint=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
+            )
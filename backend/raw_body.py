@@ -0,0 +1,254 @@
+"""Read a form post from the raw request body, within a size and a depth limit.
+
+The body is read as a stream and refused with a 413 as soon as it is larger than
+`FORM_MAX_BODY_SIZE`. It is then parsed with a single `json.loads`, like FastAPI did,
+and refused with a 422 when it nests deeper than `FORM_MAX_DEPTH` levels.
+
+A `form_data: list[dict]` parameter makes FastAPI parse the whole body into dicts,
+after which every page validates them once more. Set `FORM_RAW_BODY=true` to instead
+scan the body for the boundaries of its top-level objects, without building any Python
+objects, and hand each page to `model_validate_json` as its own slice. This is not
+faster for most forms, so it is off by default. A body the scan can't split, because
+it is not a JSON array of objects, is parsed as a whole to give the same 422 errors.
+"""
+
+import email.message
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from pydantic_forms.types import State
+
+FORM_MAX_BODY_SIZE = int(os.getenv("FORM_MAX_BODY_SIZE", str(10 * 1024 * 1024)))
+FORM_MAX_DEPTH = int(os.getenv("FORM_MAX_DEPTH", "32"))
+FORM_RAW_BODY = os.getenv("FORM_RAW_BODY", "false").lower() == "true"
+
+# Keeps the request body documented now that it is no longer a parameter
+FORM_DATA_OPENAPI: dict[str, Any] = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"type": "object"}, "default": []}
+            }
+        }
+    }
+}
+
+_PAGES = TypeAdapter(list[dict])
+
+# Possessive quantifiers (`*+`, `++`) never backtrack, which keeps a failing match linear
+_STRING = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_NO_BRACKETS = rb'(?:[^"\[\]{}]++|' + _STRING + rb")*+"
+# Everything up to the next bracket outside a string, and that bracket
+_NEXT_BRACKET = re.compile(_NO_BRACKETS + rb"([\[\]{}])", re.DOTALL)
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_ARRAY_START = re.compile(rb"[ \t\r\n]*\[[ \t\r\n]*")
+_SEPARATOR = re.compile(rb"[ \t\r\n]*(,|\])[ \t\r\n]*")
+
+
+class BodyScanError(ValueError):
+    pass
+
+
+class BodyTooDeep(BodyScanError):
+    pass
+
+
+def _nested(max_depth: int) -> bytes:
+    # Python's `re` has no recursion, so the pattern spells out every level. Bracket
+    # types are not matched up; the JSON parser checks them anyway.
+    pattern = _NO_BRACKETS
+    for _ in range(max_depth):
+        pattern = rb'(?:[^"\[\]{}]++|' + _STRING + rb"|[\[{]" + pattern + rb"[\]}])*+"
+    return pattern
+
+
+@lru_cache
+def _object_pattern(max_depth: int) -> re.Pattern[bytes]:
+    """A JSON object with brackets nested at most `max_depth` levels, itself included."""
+    return re.compile(rb"\{" + _nested(max_depth - 1) + rb"\}", re.DOTALL)
+
+
+@lru_cache
+def _value_pattern(max_depth: int) -> re.Pattern[bytes]:
+    """Any JSON with brackets nested at most `max_depth` levels."""
+    return re.compile(_nested(max_depth), re.DOTALL)
+
+
+def _nested_too_deep(body: bytes, pos: int, max_depth: int) -> bool:
+    # Only called when a pattern did not match: follow the value bracket by bracket
+    depth = 0
+    while match := _NEXT_BRACKET.match(body, pos):
+        depth += 1 if match.group(1) in b"[{" else -1
+        if depth > max_depth:
+            return True
+        if depth <= 0:
+            return False
+        pos = match.end()
+    return False
+
+
+def exceeds_depth(data: bytes, max_depth: int) -> bool:
+    """Whether the brackets in JSON `data` nest deeper than `max_depth` levels."""
+    if _value_pattern(max_depth).fullmatch(data):
+        return False
+    return _nested_too_deep(data, 0, max_depth)
+
+
+def too_deep(value: Any, max_depth: int) -> bool:
+    """Whether dicts and lists nest deeper than `max_depth` levels, like their JSON."""
+    depth = 0
+    level = [value] if isinstance(value, (dict, list)) else []
+    while level:
+        depth += 1
+        if depth > max_depth:
+            return True
+        level = [
+            child
+            for container in level
+            for child in (
+                container.values() if isinstance(container, dict) else container
+            )
+            if isinstance(child, (dict, list))
+        ]
+    return False
+
+
+def split_pages(body: bytes, max_depth: int | None = None) -> list[bytes]:
+    """Split a JSON array of objects into the bytes of each object.
+
+    Only brackets, strings and the separators between the objects are looked at; the
+    objects themselves are left for the JSON parser. Raises `BodyTooDeep` when brackets
+    nest deeper than `max_depth`, the array included, and `BodyScanError` when the body
+    is not an array of objects.
+    """
+    max_depth = FORM_MAX_DEPTH if max_depth is None else max_depth
+    if not body:
+        return []
+    if not (start := _ARRAY_START.match(body)):
+        raise BodyScanError("Expected an array")
+    pages: list[bytes] = []
+    pos = start.end()
+    if body[pos : pos + 1] == b"]":
+        pos += 1
+    else:
+        page_pattern = _object_pattern(max_depth - 1)
+        while True:
+            if not (page := page_pattern.match(body, pos)):
+                if _nested_too_deep(body, pos, max_depth - 1):
+                    raise BodyTooDeep(f"Nested deeper than {max_depth} levels")
+                raise BodyScanError("Expected an object")
+            pages.append(body[pos : page.end()])
+            if not (separator := _SEPARATOR.match(body, page.end())):
+                raise BodyScanError("Expected a comma or the end of the array")
+            pos = separator.end()
+            if separator.group(1) == b"]":
+                break
+    if not _WHITESPACE.fullmatch(body, pos):
+        raise BodyScanError("Unexpected data after the array")
+    return pages
+
+
+async def read_body(request: Request, max_size: int | None = None) -> bytes:
+    """Read the request body; raise a 413 as soon as it is larger than `max_size`."""
+    max_size = FORM_MAX_BODY_SIZE if max_size is None else max_size
+    too_large = HTTPException(
+        status_code=413, detail=f"Body larger than {max_size} bytes"
+    )
+    if int(request.headers.get("content-length") or 0) > max_size:
+        raise too_large
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_size:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _invalid(message: str, body: bytes) -> RequestValidationError:
+    # The shape of FastAPI's own errors for an invalid body
+    error = {"type": "json_invalid", "loc": ("body",), "msg": message, "input": {}}
+    return RequestValidationError([error], body=body)
+
+
+def _decode_error(e: json.JSONDecodeError) -> RequestValidationError:
+    # The error of FastAPI for a body that is not JSON
+    error = {
+        "type": "json_invalid",
+        "loc": ("body", e.pos),
+        "msg": "JSON decode error",
+        "input": {},
+        "ctx": {"error": e.msg},
+    }
+    return RequestValidationError([error], body=e.doc)
+
+
+def parse_pages(body: bytes) -> list[State]:
+    """Parse and validate the whole body as a list of objects, with the errors of FastAPI."""
+    if not body:
+        return []
+    try:
+        pages = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise _decode_error(e)
+    except ValueError:
+        # Not UTF-8, which FastAPI answers the same way
+        raise HTTPException(
+            status_code=400, detail="There was an error parsing the body"
+        )
+    except RecursionError:
+        raise _invalid(f"Nested deeper than {FORM_MAX_DEPTH} levels", body)
+    # Values can't nest deeper than there are brackets, which is most forms
+    brackets = body.count(b"{") + body.count(b"[")
+    if brackets > FORM_MAX_DEPTH and too_deep(pages, FORM_MAX_DEPTH):
+        raise _invalid(f"Nested deeper than {FORM_MAX_DEPTH} levels", body)
+    if pages is None:
+        # A `null` body counts as no body, as it did for FastAPI
+        return []
+    return _validate(pages)
+
+
+def _validate(value: Any) -> list[State]:
+    try:
+        return _PAGES.validate_python(value)
+    except ValidationError as e:
+        errors = [
+            error | {"loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=value)
+
+
+def _is_json(content_type: str | None) -> bool:
+    """Whether FastAPI would parse a body of this Content-Type as JSON."""
+    if not content_type:
+        return False
+    message = email.message.Message()
+    message["content-type"] = content_type
+    subtype = message.get_content_subtype()
+    return message.get_content_maintype() == "application" and (
+        subtype == "json" or subtype.endswith("+json")
+    )
+
+
+async def raw_form_data(request: Request) -> list[State | bytes]:
+    """Dependency for the `form_data` of a form post: a dict for each page, or its JSON."""
+    body = await read_body(request)
+    if body and not _is_json(request.headers.get("content-type")):
+        # FastAPI validated such a body as its bytes, which are not a list
+        return _validate(body)
+    if not FORM_RAW_BODY:
+        return parse_pages(body)  # type: ignore[return-value]
+    try:
+        return split_pages(body)  # type: ignore[return-value]
+    except BodyTooDeep as e:
+        raise _invalid(str(e), body)
+    except BodyScanError:
+        return parse_pages(body)  # type: ignore[return-value]
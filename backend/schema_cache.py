@@ -0,0 +1,116 @@
+"""Per-page cache of the JSON schema that is sent when a form needs its next page.
+
+A page class never changes after it is built, so its schema, the serialized 510 body
+and a content hash of that body (used as ETag) are computed once and reused. The body is
+kept as bytes and sent as is, or compressed, from the compressed copies kept next to it.
+Pages with nested models also get a variant that refers to the shared definitions (see
+`schema_defs`) instead of embedding them.
+"""
+
+from dataclasses import dataclass, field, replace
+from hashlib import sha256
+from http import HTTPStatus
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+from pydantic_forms.core.shared import GenerateFormJsonSchema, get_form_meta
+from pydantic_forms.exceptions import FormNotCompleteError
+from pydantic_forms.types import JSON
+from pydantic_forms.utils.json import json_dumps, json_loads
+
+from compression import compress_all
+from json_response import dumps
+from metrics import SCHEMA_GENERATION_DURATION, current_form
+from schema_defs import schema_defs
+
+
+@dataclass(frozen=True)
+class CachedSchema:
+    form: JSON
+    meta: JSON
+    body: bytes
+    etag: str
+    # Compressed copies of `body` by content encoding
+    encoded: dict[str, bytes] = field(default_factory=dict)
+    # Same schema with its `$defs` replaced by references to the shared definitions
+    bundled: "CachedSchema | None" = None
+
+
+def generate_schema(page: type[BaseModel]) -> JSON:
+    return page.model_json_schema(schema_generator=GenerateFormJsonSchema)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{sha256(body).hexdigest()[:32]}"'
+
+
+def _cached_body(form: JSON, meta: JSON) -> CachedSchema:
+    # Same content as `form_error_handler` produces for a `FormNotCompleteError`
+    content = {
+        "type": FormNotCompleteError.__name__,
+        "detail": str(FormNotCompleteError(form)),
+        "title": "Form not complete",
+        "status": HTTPStatus.NOT_EXTENDED,
+        "form": form,
+        "meta": meta,
+    }
+    body = dumps(content)
+    return CachedSchema(
+        form=form,
+        meta=meta,
+        body=body,
+        etag=make_etag(body),
+        encoded=compress_all(body),
+    )
+
+
+def build_cached_schema(page: type[BaseModel]) -> CachedSchema:
+    form = json_loads(json_dumps(generate_schema(page)))
+    meta = get_form_meta(page)
+    cached = _cached_body(form, meta)
+    if "$defs" not in form:
+        return cached
+    try:
+        bundled = _cached_body(schema_defs.bundle_schema(form), meta)
+    except ValueError:
+        # Recursive definitions are only sent inline
+        return cached
+    return replace(cached, bundled=bundled)
+
+
+class SchemaCache:
+    """Cache of `CachedSchema` per page class.
+
+    Entries are weakly keyed on the class, so pages built on the fly for a specific state
+    are not kept alive by the cache.
+    """
+
+    def __init__(self) -> None:
+        self._entries: WeakKeyDictionary[type[BaseModel], CachedSchema] = (
+            WeakKeyDictionary()
+        )
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, page: type[BaseModel]) -> bool:
+        return page in self._entries
+
+    def get(self, page: type[BaseModel]) -> CachedSchema:
+        if (cached := self._entries.get(page)) is None:
+            with SCHEMA_GENERATION_DURATION.time(
+                form=current_form.get(), page=page.__name__
+            ):
+                cached = build_cached_schema(page)
+            with self._lock:
+                cached = self._entries.setdefault(page, cached)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+schema_cache = SchemaCache()
@@ -0,0 +1,118 @@
+"""Content-addressed JSON schema definitions shared by all pages.
+
+Nested models like `Person` and `Education` are used on several pages, and every page
+schema carries its own copy of their definitions under `$defs`. Clients that send the
+`X-Schema-Defs: bundle` header get page schemas without `$defs` instead: references
+point to `#/$defs/<hash>`, where the hash is taken over the definition itself, and the
+schema lists the hashes it needs under `defsBundle`. The definitions are served once,
+by `GET /schema-defs` (all of them) or `GET /schema-defs/{hash}`, and never change for a
+given hash, so the client can cache them for good and merge them into `$defs`.
+"""
+
+import json
+from hashlib import sha256
+from threading import Lock
+from typing import Any
+
+from pydantic_forms.types import JSON
+
+DEFS_HEADER = "X-Schema-Defs"
+DEFS_URL = "/schema-defs"
+
+_LOCAL_REF = "#/$defs/"
+
+
+def _hash(definition: JSON) -> str:
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _rewrite_refs(value: Any, hashes: dict[str, str]) -> Any:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_LOCAL_REF):
+            value = value | {"$ref": _LOCAL_REF + hashes[ref[len(_LOCAL_REF) :]]}
+        return {key: _rewrite_refs(item, hashes) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rewrite_refs(item, hashes) for item in value]
+    return value
+
+
+def _local_refs(value: Any) -> set[str]:
+    if isinstance(value, dict):
+        refs = set().union(*map(_local_refs, value.values()))
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_LOCAL_REF):
+            refs.add(ref[len(_LOCAL_REF) :])
+        return refs
+    if isinstance(value, list):
+        return set().union(*map(_local_refs, value))
+    return set()
+
+
+class DefinitionStore:
+    """All definitions published so far, by the hash of their content."""
+
+    def __init__(self) -> None:
+        self.definitions: dict[str, JSON] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.definitions
+
+    def get(self, digest: str) -> JSON:
+        return self.definitions[digest]
+
+    def bundle(self) -> dict[str, JSON]:
+        with self._lock:
+            return dict(self.definitions)
+
+    def _hash_definitions(self, defs: dict[str, JSON]) -> dict[str, str]:
+        """Hash each definition after the ones it refers to; raises `ValueError` on cycles."""
+        hashes: dict[str, str] = {}
+        visiting: set[str] = set()
+
+        def visit(name: str) -> str:
+            if name in hashes:
+                return hashes[name]
+            if name in visiting:
+                raise ValueError(f"Definition {name} refers to itself")
+            visiting.add(name)
+            for ref in _local_refs(defs[name]):
+                visit(ref)
+            definition = _rewrite_refs(defs[name], hashes)
+            hashes[name] = digest = _hash(definition)
+            with self._lock:
+                self.definitions.setdefault(digest, definition)
+            return digest
+
+        for name in defs:
+            visit(name)
+        return hashes
+
+    def bundle_schema(self, schema: JSON) -> JSON:
+        """Return `schema` without `$defs`, referring to the published definitions instead.
+
+        Raises `ValueError` for recursive definitions, which can't be content-addressed.
+        """
+        defs = schema.get("$defs")
+        if not defs:
+            return schema
+        hashes = self._hash_definitions(defs)
+        bundled = _rewrite_refs(
+            {key: value for key, value in schema.items() if key != "$defs"}, hashes
+        )
+        needed = sorted(set().union(*(self._closure(h) for h in hashes.values())))
+        return bundled | {"defsBundle": {"url": DEFS_URL, "hashes": needed}}
+
+    def _closure(self, digest: str) -> set[str]:
+        refs = {digest}
+        for ref in _local_refs(self.definitions[digest]):
+            refs |= self._closure(ref)
+        return refs
+
+
+schema_defs = DefinitionStore()
@@ -0,0 +1,37 @@
+"""Key/value stores for form session checkpoints.
+
+`SessionStore` is the subset of the Redis client API that form sessions use, so a
+`redis.Redis` instance can be used as store as is.
+"""
+
+from typing import Any, Protocol
+
+from cache import LRUCache
+
+
+class SessionStore(Protocol):
+    def get(self, name: str) -> bytes | None: ...
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> Any: ...
+
+    def delete(self, *names: str) -> Any: ...
+
+
+class InMemorySessionStore:
+    """In-process `SessionStore` that keeps the most recently used entries for `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: int = 1800):
+        self._cache: LRUCache[str, bytes] = LRUCache(maxsize, ttl)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, name: str) -> bytes | None:
+        return self._cache.get(name)
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> bool:
+        self._cache.set(name, value, ttl=ex)
+        return True
+
+    def delete(self, *names: str) -> int:
+        return sum(self._cache.pop(name) is not None for name in names)
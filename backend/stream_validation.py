@@ -0,0 +1,193 @@
+"""Validate a list field item by item from an NDJSON request body.
+
+Every line of the body is one item of the list. Items are validated as they arrive and
+their errors are streamed back right away, so neither side holds the whole list. Memory
+is bounded by the longest line, except for unique lists: those keep a 16 byte digest and
+the index of every distinct item, so they grow with the list. Reading stops as soon as a
+list has more items than its `max_length`, which bounds a unique list with one.
+
+Items are validated in a worker thread, like form posts, so validators that block or
+look something up in another service don't stall the event loop.
+
+List-level constraints that can be checked incrementally (length and uniqueness) are
+applied as well. Any other list-level validator, such as a `Predicate` on the whole list,
+needs all items at once; those are reported as skipped in the final summary line.
+"""
+
+import json
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Any, AsyncIterator, get_args, get_origin
+
+from annotated_types import Len, MaxLen, MinLen
+from pydantic import AfterValidator, BaseModel, TypeAdapter, ValidationError
+from pydantic_core import InitErrorDetails, PydanticCustomError, to_jsonable_python
+from pydantic_forms.utils.json import json_dumps
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from field_validation import convert_errors_at
+from form_executor import run_in_executor
+from unique_list import duplicates_error
+
+MAX_LINE_BYTES = 1024 * 1024
+
+
+@dataclass
+class ListFieldPlan:
+    page: type[BaseModel]
+    field_name: str
+    item_adapter: TypeAdapter
+    min_length: int = 0
+    max_length: int | None = None
+    unique: bool = False
+    skipped_validators: list[str] = field(default_factory=list)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Stream a response while the request body is still being read.
+
+    `StreamingResponse` listens for a client disconnect on `receive` next to the stream,
+    which would compete with `request.stream()` for the body. Here the body stream is the
+    only reader; it raises `ClientDisconnect` itself when the client goes away.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+def list_field_plan(page: type[BaseModel], field_name: str) -> ListFieldPlan:
+    """Work out how to validate `field_name` item by item; raises `TypeError` if it is no list."""
+    info = page.model_fields[field_name]
+    if get_origin(info.annotation) is not list:
+        raise TypeError(f"{page.__name__}.{field_name} is not a list field")
+
+    (item_type,) = get_args(info.annotation)
+    plan = ListFieldPlan(page, field_name, TypeAdapter(item_type))
+    plan.unique = isinstance(info.json_schema_extra, dict) and bool(
+        info.json_schema_extra.get("uniqueItems")
+    )
+    for metadata in info.metadata:
+        if isinstance(metadata, (Len, MinLen)):
+            plan.min_length = metadata.min_length
+        if isinstance(metadata, (Len, MaxLen)):
+            plan.max_length = metadata.max_length
+        if isinstance(metadata, (Len, MinLen, MaxLen)):
+            continue
+        if isinstance(metadata, AfterValidator) and plan.unique:
+            continue  # the uniqueness check of `unique_conlist`
+        plan.skipped_validators.append(repr(metadata))
+    return plan
+
+
+def _digest(item: Any) -> bytes:
+    canonical = json.dumps(
+        to_jsonable_python(item), sort_keys=True, separators=(",", ":")
+    )
+    return blake2b(canonical.encode(), digest_size=16).digest()
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes | None]:
+    """Yield the non-empty lines of a byte stream, or `None` for a line that is too long."""
+    buffer = b""
+    overflow = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if overflow:
+                overflow = False
+                yield None
+            elif line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            buffer, overflow = b"", True
+    if overflow:
+        yield None
+    elif buffer.strip():
+        yield buffer
+
+
+def _list_error(
+    plan: ListFieldPlan,
+    error_type: str | PydanticCustomError,
+    ctx: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    line_error: InitErrorDetails = {"type": error_type, "loc": (), "input": None}
+    if ctx is not None:
+        line_error["ctx"] = ctx
+    validation_error = ValidationError.from_exception_data(
+        plan.page.__name__, [line_error]
+    )
+    return convert_errors_at(plan.page, validation_error, (plan.field_name,))
+
+
+def _line(content: dict[str, Any]) -> bytes:
+    return json_dumps(content).encode() + b"\n"
+
+
+async def validate_ndjson(
+    chunks: AsyncIterator[bytes], plan: ListFieldPlan
+) -> AsyncIterator[bytes]:
+    """Validate the items in `chunks`, yielding an NDJSON line per invalid item and a summary."""
+    # Digest of each item seen so far, and the index it was first seen at
+    seen: dict[bytes, int] = {}
+    count = invalid = 0
+    too_long = False
+    list_errors: list[dict[str, Any]] = []
+
+    async with aclosing(iter_lines(chunks)) as lines:
+        async for line in lines:
+            if count == plan.max_length:
+                # The rest of the body is not read, as pydantic stops at the item too many
+                too_long = True
+                break
+            index = count
+            count += 1
+            if line is None:
+                invalid += 1
+                message = f"Item is larger than {MAX_LINE_BYTES} bytes"
+                yield _line({"index": index, "validation_errors": [{"msg": message}]})
+                continue
+            try:
+                item = await run_in_executor(plan.item_adapter.validate_json, line)
+            except ValidationError as e:
+                invalid += 1
+                errors = convert_errors_at(plan.page, e, (plan.field_name, index))
+                yield _line({"index": index, "validation_errors": errors})
+                continue
+            if plan.unique:
+                digest = _digest(item)
+                if (first := seen.setdefault(digest, index)) != index:
+                    invalid += 1
+                    error = duplicates_error([[first, index]])
+                    yield _line(
+                        {"index": index, "validation_errors": _list_error(plan, error)}
+                    )
+
+    length = {"field_type": "List", "actual_length": count}
+    if count < plan.min_length:
+        list_errors += _list_error(
+            plan, "too_short", length | {"min_length": plan.min_length}
+        )
+    if too_long:
+        # The actual length is unknown, as for an iterator in pydantic
+        length["actual_length"] = None
+        list_errors += _list_error(
+            plan, "too_long", length | {"max_length": plan.max_length}
+        )
+    yield _line(
+        {
+            "done": True,
+            "items": count,
+            "invalid_items": invalid,
+            "valid": not invalid and not list_errors,
+            "validation_errors": list_errors,
+            "skipped_validators": plan.skipped_validators,
+        }
+    )
@@ -0,0 +1,287 @@
+"""Micro-benchmarks for the form endpoints and their pages.
+
+Run from the backend directory:
+
+    python -m tests.benchmarks.bench_forms --output results.json
+    python -m tests.benchmarks.bench_forms --baseline results.json --threshold 0.25
+
+Results are written as JSON. With `--baseline` the run exits non-zero when a timing got
+slower than the baseline by more than the threshold (a fraction, 0.25 = 25%).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tracemalloc
+from time import perf_counter_ns
+from typing import Any, Callable
+
+import pydantic
+import structlog
+from fastapi.testclient import TestClient
+from pydantic_forms.validators.components import unique_constrained_list
+
+import bulk
+import json_response
+from form_registry import registry
+from main import Education, Person, app
+from schema_cache import generate_schema, schema_cache
+from tests.unit_tests.test_form_example import COMPLETE_FORM_DATA
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+from tests.unit_tests.test_form_simple import SIMPLE_FORM_DATA
+from tests.unit_tests.test_json_response import INVALID_FORM_DATA
+from unique_list import validate_unique_list
+
+PAYLOADS = {
+    "form": COMPLETE_FORM_DATA,
+    "form-full": FULL_FORM_DATA,
+    "form-simple": SIMPLE_FORM_DATA,
+}
+
+client = TestClient(app)
+
+
+def time_us(func: Callable[[], Any], iterations: int) -> dict[str, float]:
+    """Call `func` `iterations` times and return the median and p95 duration in microseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter_ns()
+        func()
+        samples.append((perf_counter_ns() - start) / 1000)
+    samples.sort()
+    return {
+        "median": round(statistics.median(samples), 2),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+    }
+
+
+def walk(form_key: str) -> None:
+    """Post the form step by step, like the frontend does: one more page per request."""
+    payload = PAYLOADS[form_key]
+    for step in range(len(payload) + 1):
+        response = client.post(f"/{form_key}", json=payload[:step])
+        assert response.status_code == (
+            200 if step == len(payload) else 510
+        ), response.text
+
+
+def allocations(func: Callable[[], Any]) -> dict[str, float]:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": round((peak - before) / 1024, 2)}
+
+
+def bench_endpoint(form_key: str, iterations: int) -> dict[str, Any]:
+    schema_cache.clear()
+    start = perf_counter_ns()
+    walk(form_key)
+    cold_ms = (perf_counter_ns() - start) / 1_000_000
+
+    payload = PAYLOADS[form_key]
+    complete = time_us(lambda: client.post(f"/{form_key}", json=payload), iterations)
+    return {
+        "pages": len(payload),
+        "cold_walk_ms": round(cold_ms, 3),
+        "warm_walk_us": time_us(lambda: walk(form_key), iterations),
+        "complete_request_us": complete,
+        "allocations_per_request": allocations(
+            lambda: client.post(f"/{form_key}", json=payload)
+        ),
+    }
+
+
+def bench_pages(form_key: str, iterations: int) -> dict[str, dict[str, Any]]:
+    results = {}
+    for page, page_data in zip(registry.pages[form_key], PAYLOADS[form_key]):
+        results[page.__name__] = {
+            "form": form_key,
+            "validation_us": time_us(lambda: page(**page_data), iterations),
+            "schema_us": time_us(lambda: generate_schema(page), iterations),
+        }
+    return results
+
+
+def bench_serializers(iterations: int) -> dict[str, dict[str, Any]]:
+    """Compare the JSON serializers on the /form-full 510 bodies and on a 400 response."""
+    pages = registry.pages["form-full"]
+    bodies = [json.loads(schema_cache.get(page).body) for page in pages]
+
+    def serialize() -> None:
+        for body in bodies:
+            json_response.dumps(body)
+
+    def post_invalid() -> None:
+        client.post("/form-full", json=INVALID_FORM_DATA)
+
+    default = json_response.get_serializer()
+    results = {}
+    for name in json_response.SERIALIZERS:
+        json_response.set_serializer(name)
+        results[name] = {
+            "schema_bodies_us": time_us(serialize, iterations),
+            "schema_bodies_allocations": allocations(serialize),
+            "error_response_us": time_us(post_invalid, iterations),
+            "error_response_allocations": allocations(post_invalid),
+        }
+    json_response.set_serializer(default)
+    return results
+
+
+def bench_unique(
+    sizes: tuple[int, ...] = (10, 100, 1000, 10_000, 100_000),
+    library_max_size: int = 1000,
+) -> dict[str, dict[str, float | None]]:
+    """Time the uniqueness check of `unique_conlist` on lists of distinct `Person` models.
+
+    The pairwise check of pydantic-forms is only timed up to `library_max_size` items.
+    """
+    education = Education(degree="BSc", years=4)
+    results = {}
+    for size in sizes:
+        people = [Person(name=str(i), age=36, education=education) for i in range(size)]
+        iterations = max(1, 1000 // size)
+        library = None
+        if size <= library_max_size:
+            library = time_us(
+                lambda: unique_constrained_list.validate_unique_list(people), iterations
+            )["median"]
+        results[str(size)] = {
+            "hashed_ms": round(
+                time_us(lambda: validate_unique_list(people), iterations)["median"]
+                / 1000,
+                3,
+            ),
+            "pairwise_ms": None if library is None else round(library / 1000, 3),
+        }
+    return results
+
+
+def bench_bulk(items: int = 2000, chunk_size: int = 50) -> dict[str, Any]:
+    """Measure bulk throughput of /form-full submissions for an increasing number of workers."""
+    submissions = [FULL_FORM_DATA] * items
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    results: dict[str, Any] = {}
+    for workers in worker_counts:
+        bulk.BULK_WORKERS = workers
+        bulk.shutdown_pool()
+        # Start the workers first, their startup is not part of the throughput
+        list(bulk.get_pool().map(bulk._init_worker, [bulk.BULK_APP_MODULE] * workers))
+        start = perf_counter_ns()
+        asyncio.run(bulk.post_bulk("form-full", submissions, chunk_size))
+        seconds = (perf_counter_ns() - start) / 1e9
+        results[str(workers)] = {"items_per_second": round(items / seconds, 1)}
+    bulk.shutdown_pool()
+    single = results["1"]["items_per_second"]
+    for result in results.values():
+        result["speedup"] = round(result["items_per_second"] / single, 2)
+    return results
+
+
+def run(iterations: int = 200, forms: list[str] | None = None) -> dict[str, Any]:
+    forms = forms or list(PAYLOADS)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "iterations": iterations,
+        },
+        "endpoints": {f"/{key}": bench_endpoint(key, iterations) for key in forms},
+        "pages": {
+            name: result
+            for key in forms
+            for name, result in bench_pages(key, iterations).items()
+        },
+        "serializers": bench_serializers(iterations),
+    }
+
+
+def _medians(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Flatten the results to {"pages.FullFormNested.validation_us": median, ...}."""
+    flat = {}
+    for key, value in results.items():
+        if key == "meta" or not isinstance(value, dict):
+            continue
+        if "median" in value:
+            flat[prefix + key] = value["median"]
+        else:
+            flat |= _medians(value, f"{prefix}{key}.")
+    return flat
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[dict[str, Any]]:
+    """Return the timings that regressed beyond `threshold` compared to `baseline`."""
+    current = _medians(results)
+    regressions = []
+    for name, before in _medians(baseline).items():
+        after = current.get(name)
+        if after is not None and before > 0 and after > before * (1 + threshold):
+            regressions.append(
+                {
+                    "name": name,
+                    "baseline": before,
+                    "current": after,
+                    "ratio": round(after / before, 2),
+                }
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--form", action="append", choices=list(PAYLOADS), dest="forms")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--baseline", help="JSON results of an earlier run to compare with"
+    )
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="also measure bulk throughput per worker count",
+    )
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="also measure unique list checks from 10 to 100k items",
+    )
+    args = parser.parse_args(argv)
+
+    # Per-request debug logging would dominate the timings and clutter the output
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO)
+    )
+
+    results = run(args.iterations, args.forms)
+    if args.bulk:
+        results["bulk"] = bench_bulk()
+    if args.unique:
+        results["unique_list"] = bench_unique()
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["regressions"] = compare(results, json.load(f), args.threshold)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Load test of the form endpoints on a local server with several workers.
+
+Run from the backend directory:
+
+    python -m tests.benchmarks.bench_load --workers 4 --concurrency 1,8,32 --output load.json
+
+Starts `main:app` under uvicorn (or gunicorn with `gunicorn.conf.py`) on localhost, then
+for each concurrency level runs that many simulated users for `--duration` seconds. A
+user walks through `/form`, `/form-full` and `/form-simple` in turn, posting one more page
+per request like the frontend does, with the payloads of the unit tests. The results
+have the throughput per level and the p50/p95/p99 latency of each step of each form.
+With `--form-sessions` the users continue through a form session instead, posting only
+the next page. The default session store is per process, so with more than one worker
+this needs a shared store (see `form_sessions.store`); otherwise the session is not
+found when the next page lands on another worker, and the step fails with a 410.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+from contextlib import contextmanager
+from itertools import cycle
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Iterator
+
+import httpx
+
+from form_sessions import SESSION_HEADER
+from tests.unit_tests.test_form_example import COMPLETE_FORM_DATA
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+from tests.unit_tests.test_form_simple import SIMPLE_FORM_DATA
+
+PAYLOADS = {
+    "form": COMPLETE_FORM_DATA,
+    "form-full": FULL_FORM_DATA,
+    "form-simple": SIMPLE_FORM_DATA,
+}
+
+SERVERS = ("uvicorn", "gunicorn")
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(workers: int, server: str = "uvicorn", timeout: float = 60) -> Iterator[str]:
+    """Run the app on a free local port until the block exits; yield its base url."""
+    port = _free_port()
+    if server == "gunicorn":
+        command = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "main:app",
+        ]
+        command += ["--bind", f"127.0.0.1:{port}"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+    command += ["--workers", str(workers), "--log-level", "warning"]
+    env = os.environ | {"LOG_LEVEL": "WARNING", "WEB_CONCURRENCY": str(workers)}
+    process = subprocess.Popen(
+        command,
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = perf_counter() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"{server} exited with {process.returncode}")
+            try:
+                if httpx.get(url).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if perf_counter() > deadline:
+                raise TimeoutError(f"{server} did not start within {timeout}s")
+            sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `samples`."""
+    return samples[min(len(samples) - 1, max(0, round(q * len(samples)) - 1))]
+
+
+async def walk(
+    client: httpx.AsyncClient,
+    form_key: str,
+    latencies: dict[str, list[float]],
+    form_sessions: bool,
+) -> None:
+    """Post a form page by page and record the latency of each step."""
+    payload = PAYLOADS[form_key]
+    headers = {SESSION_HEADER: "new"} if form_sessions else {}
+    for step in range(len(payload) + 1):
+        data = payload[step - 1 : step] if form_sessions else payload[:step]
+        start = perf_counter()
+        response = await client.post(f"/{form_key}", json=data, headers=headers)
+        latencies.setdefault(f"{form_key}:{step}", []).append(perf_counter() - start)
+        expected = 200 if step == len(payload) else 510
+        if response.status_code != expected:
+            raise RuntimeError(f"/{form_key} step {step}: {response.status_code}")
+        if form_sessions and step < len(payload):
+            headers = {SESSION_HEADER: response.headers[SESSION_HEADER]}
+
+
+async def load(
+    url: str, concurrency: int, duration: float, form_sessions: bool = False
+) -> dict[str, Any]:
+    """Run `concurrency` users for `duration` seconds; return throughput and latencies."""
+    latencies: dict[str, list[float]] = {}
+    sessions = 0
+    errors: dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = perf_counter()
+        deadline = start + duration
+
+        async def user(offset: int) -> None:
+            nonlocal sessions
+            forms = cycle(list(PAYLOADS)[offset:] + list(PAYLOADS)[:offset])
+            while perf_counter() < deadline:
+                try:
+                    await walk(client, next(forms), latencies, form_sessions)
+                    sessions += 1
+                except (httpx.HTTPError, RuntimeError) as e:
+                    reason = f"{type(e).__name__}: {e}"
+                    errors[reason] = errors.get(reason, 0) + 1
+
+        await asyncio.gather(*(user(i % len(PAYLOADS)) for i in range(concurrency)))
+        seconds = perf_counter() - start
+
+    requests = sum(len(samples) for samples in latencies.values())
+    steps = {}
+    for name, samples in sorted(latencies.items()):
+        samples.sort()
+        steps[name] = {
+            "count": len(samples),
+            **{
+                f"p{q}_ms": round(percentile(samples, q / 100) * 1000, 2)
+                for q in (50, 95, 99)
+            },
+        }
+    return {
+        "concurrency": concurrency,
+        "seconds": round(seconds, 2),
+        "requests": requests,
+        "sessions": sessions,
+        "errors": errors,
+        "requests_per_second": round(requests / seconds, 1),
+        "sessions_per_second": round(sessions / seconds, 2),
+        "steps": steps,
+    }
+
+
+def run(
+    workers: int = 2,
+    concurrency: tuple[int, ...] = (1, 4, 16),
+    duration: float = 10,
+    server: str = "uvicorn",
+    form_sessions: bool = False,
+) -> dict[str, Any]:
+    with serve(workers, server) as url:
+        levels = [
+            asyncio.run(load(url, level, duration, form_sessions))
+            for level in concurrency
+        ]
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "server": server,
+            "workers": workers,
+            "duration": duration,
+            "form_sessions": form_sessions,
+            "cpus": os.cpu_count(),
+        },
+        "levels": levels,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="comma separated numbers of simultaneous users",
+    )
+    parser.add_argument("--duration", type=float, default=10, help="seconds per level")
+    parser.add_argument("--server", choices=SERVERS, default="uvicorn")
+    parser.add_argument(
+        "--form-sessions",
+        action="store_true",
+        help="post only the next page within a form session",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    concurrency = tuple(int(level) for level in args.concurrency.split(","))
+    results = run(
+        args.workers, concurrency, args.duration, args.server, args.form_sessions
+    )
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if any(level["errors"] for level in results["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
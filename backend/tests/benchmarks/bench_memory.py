@@ -0,0 +1,128 @@
+"""Per-worker memory with and without preloading the forms before forking the workers.
+
+Run from the backend directory (Linux only):
+
+    python -m tests.benchmarks.bench_memory --workers 4
+
+Workers are forked from a fresh master process, like gunicorn does. With preload the
+master imports the app, warms it up and freezes it first (see `warmup.preload`); without
+it every worker imports and warms up the app itself. Each worker then posts every form
+a number of times and reports its memory from `/proc/<pid>/smaps_rollup`. The private
+memory per worker is what each additional worker costs.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from memory import memory_report
+
+MODES = ("preload", "lazy")
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+
+def _load_app() -> None:
+    import main  # noqa: F401
+    from form_registry import registry
+    from warmup import warm_up
+
+    warm_up(registry)
+
+
+def _work(requests: int) -> None:
+    from form_engine import post_form
+    from form_registry import registry
+    from tests.benchmarks.bench_forms import PAYLOADS
+
+    for _ in range(requests):
+        for form_key, payload in PAYLOADS.items():
+            post_form(registry.get_form(form_key), {}, payload)
+
+
+def master(mode: str, workers: int, requests: int) -> list[dict[str, int]]:
+    """Fork `workers` workers and collect their memory reports."""
+    if mode == "preload":
+        gc.disable()
+        _load_app()
+        gc.freeze()
+
+    children = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            status = 1
+            try:
+                if mode == "lazy":
+                    _load_app()
+                gc.enable()
+                _work(requests)
+                with os.fdopen(write_fd, "w") as f:
+                    json.dump(memory_report(), f)
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    reports = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as f:
+            output = f.read()
+        os.waitpid(pid, 0)
+        reports.append(json.loads(output))
+    return reports
+
+
+def measure(mode: str, workers: int, requests: int) -> dict[str, float]:
+    """Run a master in a fresh interpreter and average the memory of its workers."""
+    command = [sys.executable, "-m", "tests.benchmarks.bench_memory", "--master", mode]
+    command += ["--workers", str(workers), "--requests", str(requests)]
+    env = os.environ | {"FORM_WARMUP": "false"}
+    output = subprocess.run(
+        command, capture_output=True, check=True, env=env, cwd=BACKEND_DIR
+    ).stdout
+    # The last line, anything before it is logging
+    reports = json.loads(output.decode().strip().splitlines()[-1])
+    return {
+        name: round(statistics.mean(report[name] for report in reports))
+        for name in reports[0]
+    }
+
+
+def run(workers: int = 4, requests: int = 20) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "workers": workers,
+        "requests": requests,
+        **{mode: measure(mode, workers, requests) for mode in MODES},
+    }
+    results["private_saving_kib_per_worker"] = (
+        results["lazy"]["private_kib"] - results["preload"]["private_kib"]
+    )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--master", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.master:
+        print(json.dumps(master(args.master, args.workers, args.requests)))
+    else:
+        print(json.dumps(run(args.workers, args.requests), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
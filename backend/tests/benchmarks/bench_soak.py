@@ -0,0 +1,205 @@
+"""Soak test: does the memory per submission settle over many form submissions?
+
+Run from the backend directory:
+
+    python -m tests.benchmarks.bench_soak --submissions 200000 --output soak.json
+
+Posts the forms over and over in process, like a long-running worker: complete and
+invalid submissions of `/form`, `/form-full` and `/form-simple`, form sessions, and a
+form whose page is built by a factory for an ever-changing state. Every `--interval`
+submissions it samples the traced memory (tracemalloc), the objects per type, the live
+page classes and the RSS. After the first `--warmup` submissions caches are full and the
+traced memory should stay flat; the run fails when the median growth per interval is
+more than `--threshold` bytes per submission, or when the number of page classes grows.
+The report lists the types and source lines that grew the most.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+import structlog
+from pydantic_forms.core import FormPage
+from pydantic_forms.exceptions import FormException
+
+from form_engine import post_form
+from form_registry import FormRegistry, registry
+from form_sessions import NEW_SESSION, form_sessions
+from memory import live_subclasses, memory_report, object_counts
+from tests.benchmarks.bench_forms import PAYLOADS
+from tests.unit_tests.test_json_response import INVALID_FORM_DATA
+
+soak_registry = FormRegistry()
+
+
+@soak_registry.page_factory("soak", "customer", maxsize=32)
+def customer_page(customer: str | None) -> type[FormPage]:
+    class CustomerPage(FormPage):
+        note: str = customer or ""
+
+    return CustomerPage
+
+
+def customer_form_generator(state: dict) -> Iterator[type[FormPage]]:
+    data = yield customer_page(state)
+    return data.model_dump()
+
+
+def submissions() -> Iterator[Callable[[], Any]]:
+    """Yield the submissions of one round through every kind of post, forever."""
+    rounds = 0
+    while True:
+        rounds += 1
+        for form_key, payload in PAYLOADS.items():
+            generator = registry.get_form(form_key)
+            yield lambda generator=generator, payload=payload: post_form(
+                generator, {}, payload
+            )
+        yield lambda: post_form(registry.get_form("form-full"), {}, INVALID_FORM_DATA)
+        yield lambda: _post_with_session("form-simple")
+        # A new state every round, so the factory builds a new class every time
+        state = {"customer": f"customer-{rounds}"}
+        yield lambda state=state: post_form(
+            customer_form_generator, state, [{"note": "x"}]
+        )
+
+
+def _post_with_session(form_key: str) -> None:
+    token = NEW_SESSION
+    for page in [[]] + [[data] for data in PAYLOADS[form_key]]:
+        try:
+            form_sessions.post_form(form_key, page, token)
+        except FormException as exc:
+            token = getattr(exc, "session_token", None) or token
+
+
+def _submit(post: Callable[[], Any]) -> None:
+    try:
+        post()
+    except FormException:
+        pass
+
+
+def sample(submitted: int) -> dict[str, Any]:
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    pages = live_subclasses(FormPage)
+    result = {
+        "submissions": submitted,
+        "traced_kib": round(current / 1024, 1),
+        "objects": len(gc.get_objects()),
+        "page_classes": sum(pages.values()),
+    }
+    if os.path.exists("/proc/self/smaps_rollup"):
+        result["rss_kib"] = memory_report()["rss_kib"]
+    return result
+
+
+def _growth(before: dict[str, int], after: dict[str, int], top: int) -> dict[str, int]:
+    growth = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    largest = sorted(growth.items(), key=lambda item: -item[1])[:top]
+    return {key: value for key, value in largest if value > 0}
+
+
+def run(
+    submissions_count: int = 200_000,
+    interval: int = 10_000,
+    warmup: int = 20_000,
+    threshold: float = 1.0,
+    top: int = 10,
+) -> dict[str, Any]:
+    posts = submissions()
+    tracemalloc.start(5)
+    try:
+        for _ in range(min(warmup, submissions_count)):
+            _submit(next(posts))
+
+        start = perf_counter()
+        samples = [sample(warmup)]
+        baseline_snapshot = tracemalloc.take_snapshot()
+        baseline_objects = object_counts()
+        submitted = warmup
+        while submitted < submissions_count:
+            count = min(interval, submissions_count - submitted)
+            for _ in range(count):
+                _submit(next(posts))
+            submitted += count
+            samples.append(sample(submitted))
+        seconds = perf_counter() - start
+
+        gc.collect()
+        objects = object_counts()
+        lines = tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")
+    finally:
+        tracemalloc.stop()
+
+    # The median of the growth per interval: a leak grows every interval, while one-off
+    # steps only show up in one. E.g. when the interpreter's table of interned strings
+    # is reallocated, the new table is traced but the old one, allocated before tracing
+    # started, is not
+    growth = [
+        (after["traced_kib"] - before["traced_kib"])
+        * 1024
+        / (after["submissions"] - before["submissions"])
+        for before, after in zip(samples, samples[1:])
+    ]
+    bytes_per_submission = statistics.median(growth) if growth else 0.0
+    page_class_growth = samples[-1]["page_classes"] - samples[0]["page_classes"]
+    return {
+        "submissions": submissions_count,
+        "warmup": warmup,
+        "submissions_per_second": round((submitted - warmup) / seconds, 1),
+        "bytes_per_submission": round(bytes_per_submission, 3),
+        "page_class_growth": page_class_growth,
+        "settled": bytes_per_submission <= threshold and page_class_growth <= 0,
+        "samples": samples,
+        "object_growth": _growth(baseline_objects, objects, top),
+        "allocation_growth": [
+            {
+                "line": str(stat.traceback[0]),
+                "size_kib": round(stat.size_diff / 1024, 1),
+            }
+            for stat in lines[:top]
+            if stat.size_diff > 0
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200_000)
+    parser.add_argument("--interval", type=int, default=10_000)
+    parser.add_argument("--warmup", type=int, default=20_000)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.0,
+        help="allowed growth of the traced memory in bytes per submission",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Per-request debug logging would dominate the run and clutter the output
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO)
+    )
+
+    results = run(args.submissions, args.interval, args.warmup, args.threshold)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if results["settled"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
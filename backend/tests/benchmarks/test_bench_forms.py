@@ -0,0 +1,65 @@
+import json
+
+from bench_forms import PAYLOADS, bench_unique, compare, main, run
+
+
+def test_benchmark_results_cover_every_endpoint_and_page():
+    """Test a short benchmark run and the shape of its results."""
+    results = run(iterations=2)
+    assert set(results["endpoints"]) == {f"/{key}" for key in PAYLOADS}
+    assert len(results["pages"]) == sum(len(payload) for payload in PAYLOADS.values())
+
+    nested = results["pages"]["FullFormNested"]
+    assert nested["form"] == "form-full"
+    assert nested["validation_us"]["median"] > 0
+    assert nested["schema_us"]["median"] > 0
+
+    endpoint = results["endpoints"]["/form-simple"]
+    assert endpoint["cold_walk_ms"] > 0
+    assert endpoint["allocations_per_request"]["peak_kib"] > 0
+
+    for serializer in ("json", "orjson"):
+        assert results["serializers"][serializer]["schema_bodies_us"]["median"] > 0
+    json.dumps(results)
+
+
+def test_compare_reports_regressions_beyond_threshold():
+    """Test that only timings slower than baseline * (1 + threshold) are reported."""
+    baseline = {
+        "pages": {
+            "A": {"validation_us": {"median": 10.0}},
+            "B": {"schema_us": {"median": 10.0}},
+        }
+    }
+    results = {
+        "pages": {
+            "A": {"validation_us": {"median": 12.0}},
+            "B": {"schema_us": {"median": 20.0}},
+        }
+    }
+    assert compare(results, baseline, threshold=0.25) == [
+        {"name": "pages.B.schema_us", "baseline": 10.0, "current": 20.0, "ratio": 2.0}
+    ]
+
+
+def test_main_fails_on_regression(tmp_path):
+    """Test that the command line exits non-zero when a page regressed."""
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(
+        json.dumps({"pages": {"SimpleForm": {"validation_us": {"median": 0.001}}}})
+    )
+    output = tmp_path / "results.json"
+
+    argv = ["--iterations", "2", "--form", "form-simple", "--output", str(output)]
+
+    assert main([*argv, "--baseline", str(baseline)]) == 1
+    regressions = json.loads(output.read_text())["regressions"]
+    assert regressions[0]["name"] == "pages.SimpleForm.validation_us"
+
+
+def test_unique_list_benchmark():
+    """Test that the pairwise check is only timed for small lists."""
+    results = bench_unique(sizes=(10, 200), library_max_size=100)
+    assert results["10"]["pairwise_ms"] is not None
+    assert results["200"]["pairwise_ms"] is None
+    assert results["200"]["hashed_ms"] > 0
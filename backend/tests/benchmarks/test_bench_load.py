@@ -0,0 +1,23 @@
+from bench_load import PAYLOADS, percentile, run
+
+
+def test_percentile():
+    """Test the nearest-rank percentiles of a sorted sample."""
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile([3.0], 0.95) == 3
+
+
+def test_load_results_cover_every_step():
+    """Test a short load run on a local server and the shape of its results."""
+    results = run(workers=1, concurrency=(1, 2), duration=0.5)
+    assert [level["concurrency"] for level in results["levels"]] == [1, 2]
+
+    for level in results["levels"]:
+        assert level["errors"] == {}
+        assert level["requests_per_second"] > 0
+        steps = level["steps"]
+        assert f"form-simple:{len(PAYLOADS['form-simple'])}" in steps
+        first = steps["form-simple:0"]
+        assert 0 < first["p50_ms"] <= first["p95_ms"] <= first["p99_ms"]
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from bench_memory import run
+from memory import memory_report
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc"
+)
+
+
+def test_memory_report():
+    """Test that the report splits the resident memory in shared and private."""
+    report = memory_report()
+    assert report["rss_kib"] == report["shared_kib"] + report["private_kib"]
+    assert 0 < report["pss_kib"] <= report["rss_kib"]
+
+
+def test_preloaded_workers_use_less_private_memory():
+    """Test that workers forked after the preload share the forms with the master."""
+    results = run(workers=2, requests=1)
+    assert results["preload"]["shared_kib"] > results["lazy"]["shared_kib"]
+    assert results["private_saving_kib_per_worker"] > 0
@@ -0,0 +1,17 @@
+from bench_soak import run
+
+
+def test_soak_results():
+    """Test a short soak run and the shape of its results."""
+    # Past the warm-up every page class of the factory's cache has been built
+    results = run(submissions_count=400, interval=50, warmup=250)
+    assert [sample["submissions"] for sample in results["samples"]] == [
+        250,
+        300,
+        350,
+        400,
+    ]
+    assert results["page_class_growth"] <= 0
+    assert results["submissions_per_second"] > 0
+    assert isinstance(results["bytes_per_submission"], float)
+    assert all(sample["page_classes"] > 0 for sample in results["samples"])
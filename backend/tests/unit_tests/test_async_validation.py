@@ -0,0 +1,153 @@
+import asyncio
+from typing import Annotated
+
+import anyio
+import pytest
+from pydantic import BaseModel, ValidationError
+from pydantic_forms.core import FormPage
+from pydantic_forms.exceptions import FormValidationError
+
+from async_validation import AsyncPredicate, canonical_value
+from form_engine import post_form
+from form_executor import run_in_executor
+
+
+class StubService:
+    """Stands in for a service with customers, recording the lookups."""
+
+    def __init__(self, known: set[str]):
+        self.known = known
+        self.calls: list[str] = []
+        self.loops: set[asyncio.AbstractEventLoop] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def customer_exists(self, customer_id: str) -> bool:
+        self.calls.append(customer_id)
+        self.loops.add(asyncio.get_running_loop())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if customer_id == "blocked":
+            raise ValueError("Customer is blocked")
+        return customer_id in self.known
+
+
+service = StubService({f"c{i}" for i in range(10)})
+CustomerId = Annotated[str, AsyncPredicate(service.customer_exists)]
+
+
+class Contact(BaseModel):
+    name: str
+    customer_id: CustomerId
+
+
+class CustomersPage(FormPage):
+    first: CustomerId
+    second: CustomerId
+    third: CustomerId
+    contacts: list[Contact]
+
+
+class ConfirmPage(FormPage):
+    customer_id: CustomerId
+    count: int
+
+
+def customers_generator(state: dict):
+    customers = yield CustomersPage
+    confirm = yield ConfirmPage
+    return customers.model_dump() | confirm.model_dump()
+
+
+def form_data(contacts: list[str]) -> list[dict]:
+    return [
+        {
+            "first": "c0",
+            "second": "c1",
+            "third": "c2",
+            "contacts": [{"name": "n", "customer_id": c} for c in contacts],
+        },
+        {"customer_id": "c0", "count": 1},
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset_service():
+    service.calls.clear()
+    service.loops.clear()
+    service.max_in_flight = 0
+
+
+def test_lookups_concurrent_and_deduplicated():
+    """Test that the lookups of a page run together, once per distinct value."""
+    result = post_form(customers_generator, {}, form_data(["c3", "c3", "c4", "c3"]))
+    assert result["contacts"][3]["customer_id"] == "c3"
+    # c0 of the second page was looked up for the first page already
+    assert sorted(service.calls) == ["c0", "c1", "c2", "c3", "c4"]
+    assert service.max_in_flight == 5
+
+
+def test_lookups_failed():
+    """Test that failed lookups are reported at every place the value is used."""
+    with pytest.raises(FormValidationError) as exc_info:
+        post_form(
+            customers_generator, {}, form_data(["c3", "unknown", "blocked", "unknown"])
+        )
+    errors = {error["loc"]: error for error in exc_info.value.errors}
+    assert set(errors) == {
+        ("contacts", 1, "customer_id"),
+        ("contacts", 2, "customer_id"),
+        ("contacts", 3, "customer_id"),
+    }
+    assert errors[("contacts", 1, "customer_id")]["type"] == "predicate_failed"
+    assert "Customer is blocked" in errors[("contacts", 2, "customer_id")]["msg"]
+    assert service.calls.count("unknown") == 1
+
+
+def test_lookups_failed_with_other_errors():
+    """Test that failed lookups are reported along with the other errors of the page."""
+    data = form_data(["unknown"])
+    del data[0]["third"]
+    with pytest.raises(FormValidationError) as exc_info:
+        post_form(customers_generator, {}, data)
+    assert {error["loc"] for error in exc_info.value.errors} == {
+        ("third",),
+        ("contacts", 0, "customer_id"),
+    }
+
+
+def test_lookups_on_the_event_loop():
+    """Test that lookups of a post in a worker thread run on the app's event loop."""
+
+    async def post():
+        result = await run_in_executor(
+            post_form, customers_generator, {}, form_data(["c3"])
+        )
+        return result, asyncio.get_running_loop()
+
+    result, loop = anyio.run(post)
+    assert result["first"] == "c0"
+    assert service.loops == {loop}
+
+
+def test_lookup_outside_a_form_post():
+    """Test that a check runs right away when a page is validated on its own."""
+    assert Contact(name="n", customer_id="c1").customer_id == "c1"
+    with pytest.raises(ValidationError):
+        Contact(name="n", customer_id="unknown")
+
+    async def validate_on_the_loop():
+        return Contact(name="n", customer_id="c2")
+
+    assert asyncio.run(validate_on_the_loop()).customer_id == "c2"
+    assert service.calls == ["c1", "unknown", "c2"]
+
+
+def test_canonical_value():
+    """Test that equal values get the same key, whatever the order of their keys."""
+    assert canonical_value({"a": 1, "b": [1, 2]}) == canonical_value(
+        {"b": [1, 2], "a": 1}
+    )
+    assert canonical_value(1) != canonical_value(True)
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+import bulk
+from main import app
+from test_form_example import COMPLETE_FORM_DATA
+from test_form_simple import SIMPLE_FORM_DATA
+
+client = TestClient(app)
+
+INVALID_SIMPLE_FORM_DATA = [SIMPLE_FORM_DATA[0] | {"age": -1}]
+
+
+def test_bulk_results_are_in_input_order():
+    """Test a small bulk request, which is processed without the process pool."""
+    items = [SIMPLE_FORM_DATA, INVALID_SIMPLE_FORM_DATA, [], SIMPLE_FORM_DATA]
+    response = client.post("/bulk/form-simple", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 400, 510, 200]
+    assert results[0]["data"]["full_name"] == "Jane Smith"
+    assert results[1]["validation_errors"][0]["loc"] == ["age"]
+
+
+def test_bulk_fans_out_over_the_process_pool(monkeypatch):
+    """Test that chunks are validated in worker processes and reassembled in order."""
+    monkeypatch.setattr(bulk, "BULK_WORKERS", 2)
+    items = [COMPLETE_FORM_DATA, COMPLETE_FORM_DATA[:2]] * 3
+    try:
+        response = client.post("/bulk/form", json={"items": items, "chunk_size": 2})
+    finally:
+        bulk.shutdown_pool()
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [200, 510] * 3
+
+
+def test_app_shutdown_stops_the_process_pool(monkeypatch):
+    """Test that the worker processes of the pool are stopped with the app."""
+    monkeypatch.setattr(bulk, "BULK_WORKERS", 1)
+    with TestClient(app):
+        pool = bulk.get_pool()
+        pool.submit(os.getpid).result()
+        processes = list(pool._processes.values())
+    assert bulk._pool is None
+    assert not any(process.is_alive() for process in processes)
+
+
+def test_bulk_recovers_from_a_broken_process_pool(monkeypatch):
+    """Test that a pool broken by a dead worker is replaced, and the chunks retried."""
+    monkeypatch.setattr(bulk, "BULK_WORKERS", 2)
+    items = [COMPLETE_FORM_DATA] * 4
+    try:
+        broken = bulk.get_pool()
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+        response = client.post("/bulk/form", json={"items": items, "chunk_size": 2})
+        assert bulk.get_pool() is not broken
+    finally:
+        bulk.shutdown_pool()
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [200] * 4
+
+
+def test_bulk_broken_process_pool_is_unavailable(monkeypatch):
+    """Test that a pool that breaks again on the retry is a 503."""
+
+    async def broken(form_key, chunks):
+        raise BrokenProcessPool
+
+    monkeypatch.setattr(bulk, "_post_chunks", broken)
+    items = [SIMPLE_FORM_DATA] * 3
+    response = client.post("/bulk/form-simple", json={"items": items, "chunk_size": 1})
+    assert response.status_code == 503
+
+
+def test_bulk_unknown_form_is_not_found():
+    response = client.post("/bulk/unknown", json={"items": [[]]})
+    assert response.status_code == 404
@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from choice_source import ChoiceSource, ChoiceSourceRegistry
+from main import Colors, app
+
+client = TestClient(app)
+
+
+def test_search_by_prefix_of_label_or_value():
+    """Test prefix search on labels and values, case insensitive and paginated."""
+    colors = ChoiceSource.from_choice(Colors)
+    total, options = colors.search("dark")
+    assert total == 3
+    assert [label for _, label in options] == ["Dark Blue", "Dark Emerald", "Dark Red"]
+
+    assert colors.search("#2563")[1] == [("#2563EB", "Blue")]
+    assert colors.search("dark", offset=1, limit=1) == (
+        3,
+        [("#059669", "Dark Emerald")],
+    )
+    assert colors.search("", limit=2) == (
+        15,
+        [("#9CA3AF", "Gray"), ("#2563EB", "Blue")],
+    )
+    assert colors.search("zzz") == (0, [])
+
+
+def test_options_are_loaded_once_until_refreshed():
+    """Test that the loader runs on first use only, and again after a refresh."""
+    registry = ChoiceSourceRegistry()
+    calls = []
+
+    @registry.source("numbers")
+    def load_numbers():
+        calls.append(1)
+        return [(str(i), f"Number {i}") for i in range(3)]
+
+    assert calls == []
+    assert "1" in load_numbers
+    assert "3" not in load_numbers
+    assert len(load_numbers) == 3
+    assert calls == [1]
+
+    load_numbers.refresh()
+    assert "2" in load_numbers
+    assert calls == [1, 1]
+    with pytest.raises(ValueError):
+        registry.register(ChoiceSource("numbers", list))
+
+
+def test_schema_refers_to_the_source():
+    """Test that the page schema has a reference to the options instead of the options."""
+    response = client.post("/form-customer", json=[])
+    assert response.status_code == 510
+    customer = response.json()["form"]["properties"]["customer"]
+    assert customer["choiceSource"] == {
+        "name": "customers",
+        "url": "/choices/customers",
+    }
+    assert "enum" not in customer
+    assert len(response.content) < 1000
+
+
+def test_post_validates_membership():
+    """Test that only values of the choice source are accepted."""
+    response = client.post("/form-customer", json=[{"customer": "00042"}])
+    assert response.status_code == 200
+
+    response = client.post("/form-customer", json=[{"customer": "99999"}])
+    assert response.status_code == 400
+    (error,) = response.json()["validation_errors"]
+    assert error["type"] == "choice_source"
+    assert error["ctx"] == {"source": "customers"}
+
+
+def test_search_endpoint():
+    """Test the paginated search of the options of a choice source."""
+    response = client.get("/choices/customers", params={"q": "river sys", "limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 100
+    assert body["limit"] == 2
+    assert body["items"][0]["label"].startswith("River Systems")
+
+    assert client.get("/choices/customers", params={"q": "00042"}).json()["items"] == [
+        {"value": "00042", "label": "Acme Analytics Labs 3"}
+    ]
+    assert client.get("/choices/unknown").status_code == 404
+    assert client.get("/choices/customers", params={"limit": 1000}).status_code == 422
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import compression
+from compression import negotiate
+from main import FullFormNested, app
+from schema_cache import build_cached_schema
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["br", "gzip"]) == expected
+
+
+@pytest.mark.parametrize("encoding", compression.ENCODINGS)
+def test_schema_is_sent_precompressed(encoding):
+    """Test that a page schema is sent compressed, with an ETag per encoding."""
+    plain = client.post("/form-full", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    response = client.post("/form-full", headers={"Accept-Encoding": encoding})
+    assert response.status_code == 510
+    assert response.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == plain.content
+    etag = response.headers["etag"]
+    assert etag != plain.headers["etag"]
+
+    headers = {"Accept-Encoding": encoding, "If-None-Match": etag}
+    assert client.post("/form-full", headers=headers).status_code == 304
+
+
+def test_schema_is_compressed_once(monkeypatch):
+    """Test that the compressed bodies are built with the cache entry, not per request."""
+    calls = []
+    compress = compression.compress
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+    cached = build_cached_schema(FullFormNested)
+    assert sorted(cached.encoded) == sorted(compression.ENCODINGS)
+    # Once for the inline schema and once for the variant with shared definitions
+    assert sorted(calls) == sorted(compression.ENCODINGS * 2)
+    assert sorted(cached.bundled.encoded) == sorted(compression.ENCODINGS)
+    assert all(len(body) < len(cached.body) for body in cached.encoded.values())
+
+
+def test_small_bodies_are_not_compressed():
+    """Test that bodies below the threshold are sent as is and larger ones are compressed."""
+    response = client.post(
+        "/validate/form-full/FullFormValidation/rating",
+        json={"value": 9},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert len(response.content) < compression.COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in response.headers
+
+    response = client.post(
+        "/bulk/form-full",
+        json={"items": [FULL_FORM_DATA] * 5},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
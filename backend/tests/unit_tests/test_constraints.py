@@ -0,0 +1,113 @@
+from decimal import Decimal
+from typing import Annotated, Literal
+
+from annotated_types import Gt, Interval, Predicate
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from constraints import compile_annotation, compile_page
+from main import app
+from unique_list import unique_conlist
+
+client = TestClient(app)
+
+
+def is_even(value: int) -> bool:
+    return value % 2 == 0
+
+
+class Address(BaseModel):
+    street: str = Field(min_length=1)
+    number: Annotated[int, Gt(0)]
+
+
+class Page(BaseModel):
+    code: str = Field(pattern=r"^[A-Z]{3}$")
+    amount: Decimal = Field(max_digits=6, decimal_places=2)
+    score: Annotated[int, Interval(ge=1, lt=11), Predicate(is_even)] = 2
+    size: Literal["S", "M", "L"] | None = None
+    addresses: unique_conlist(Address, min_items=1, max_items=3)
+
+    @field_validator("code")
+    @classmethod
+    def known_code(cls, value: str) -> str:
+        return value
+
+    @model_validator(mode="after")
+    def consistent(self) -> "Page":
+        return self
+
+
+def test_compile_page():
+    """Test that the constraints of each field end up in the table of the page."""
+    table = compile_page(Page)
+    fields = table["fields"]
+    assert table["serverOnly"] == ["consistent"]
+    assert fields["code"] == {
+        "required": True,
+        "type": "string",
+        "pattern": "^[A-Z]{3}$",
+        "serverOnly": ["known_code"],
+    }
+    assert fields["amount"] == {
+        "required": True,
+        "type": ["number", "string"],
+        "maxDigits": 6,
+        "decimalPlaces": 2,
+    }
+    schema = Page.model_json_schema()["properties"]["amount"]
+    assert fields["amount"]["type"] == [option["type"] for option in schema["anyOf"]]
+    assert fields["score"] == {
+        "type": "integer",
+        "minimum": 1,
+        "exclusiveMaximum": 11,
+        "serverOnly": ["is_even"],
+    }
+    assert fields["size"] == {"nullable": True, "enum": ["S", "M", "L"]}
+    assert fields["addresses"] == {
+        "required": True,
+        "type": "array",
+        "items": {
+            "type": "object",
+            "fields": {
+                "street": {"required": True, "type": "string", "minLength": 1},
+                "number": {"required": True, "type": "integer", "exclusiveMinimum": 0},
+            },
+        },
+        "uniqueItems": True,
+        "minItems": 1,
+        "maxItems": 3,
+    }
+
+
+def test_compile_annotation_without_constraints():
+    """Test that types the frontend can't check get an empty table."""
+    assert compile_annotation(bytes) == {}
+
+
+def test_get_page_constraints():
+    """Test that the constraint table of a page is served with an ETag."""
+    response = client.get(
+        "/constraints/form/TestForm0", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.json()["fields"]["number"] == {
+        "type": "integer",
+        "minimum": 18,
+        "maximum": 99,
+        "multipleOf": 3,
+        "serverOnly": ["example_backend_validation"],
+    }
+    not_modified = client.get(
+        "/constraints/form/TestForm0",
+        headers={
+            "Accept-Encoding": "identity",
+            "If-None-Match": response.headers["etag"],
+        },
+    )
+    assert not_modified.status_code == 304
+
+
+def test_get_page_constraints_of_unknown_page():
+    """Test that an unknown page has no constraint table."""
+    assert client.get("/constraints/form/Unknown").status_code == 404
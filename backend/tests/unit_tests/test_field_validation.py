@@ -0,0 +1,129 @@
+import asyncio
+import gc
+import weakref
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, ValidationInfo, field_validator
+
+import main
+from field_validation import field_model, validate_field
+from main import FullFormValidation, app
+
+client = TestClient(app)
+
+
+def test_validate_valid_field():
+    """Test that a valid value has no errors."""
+    response = client.post("/validate/form/TestForm0/number", json={"value": 21})
+    assert response.status_code == 200
+    assert response.json() == {"valid": True, "validation_errors": []}
+
+
+def test_validate_field_runs_the_whole_constraint_chain():
+    """Test that Ge, MultipleOf and the Predicate of NumberExample are all applied."""
+    response = client.post("/validate/form/TestForm0/number", json={"value": 19})
+    body = response.json()
+    assert body["valid"] is False
+    assert body["validation_errors"][0]["loc"] == ["number"]
+    assert "multiple of 3" in body["validation_errors"][0]["msg"]
+
+    response = client.post("/validate/form/TestForm0/number", json={"value": 9})
+    assert "greater than or equal to 18" in str(response.json()["validation_errors"])
+
+
+def test_validate_field_of_a_later_page():
+    """Test a field of a page that is only reached after earlier pages."""
+    response = client.post(
+        "/validate/form-full/FullFormValidation/username", json={"value": "no spaces!"}
+    )
+    errors = response.json()["validation_errors"]
+    assert errors[0]["type"] == "string_pattern_mismatch"
+
+
+def test_validate_unknown_field_is_not_found():
+    assert (
+        client.post("/validate/form/TestForm0/unknown", json={"value": 1}).status_code
+        == 404
+    )
+    assert (
+        client.post("/validate/form/Unknown/number", json={"value": 1}).status_code
+        == 404
+    )
+    assert (
+        client.post("/validate/unknown/TestForm0/number", json={"value": 1}).status_code
+        == 404
+    )
+
+
+def test_field_model_is_cached():
+    """Test that the model of a field is built once."""
+    assert field_model(FullFormValidation, "rating") is field_model(
+        FullFormValidation, "rating"
+    )
+
+
+def test_validate_field_reports_custom_errors():
+    """Test that errors without a built-in pydantic type, like unique_list, are kept."""
+    person = {"name": "Alice", "age": 36, "education": {"degree": "BSc", "years": 4}}
+    errors = validate_field(main.TestForm5, "contact_person_list", [person, person])
+    assert errors[0]["type"] == "unique_list"
+    assert errors[0]["loc"] == ("contact_person_list",)
+
+
+class CodePage(BaseModel):
+    code: str
+    count: int = 0
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def strip(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator("code")
+    @classmethod
+    def known_code(cls, value: str, info: ValidationInfo) -> str:
+        if value != "ok" or info.data.get("count"):
+            raise ValueError("Unknown code")
+        return value
+
+
+def test_validate_field_runs_field_validators():
+    """Test that the page's field validators of the field run as well, in order."""
+    assert validate_field(CodePage, "code", " ok ") == []
+    errors = validate_field(CodePage, "code", "no")
+    assert [(e["type"], e["loc"]) for e in errors] == [("value_error", ("code",))]
+    assert validate_field(CodePage, "count", " 3 ") == []
+
+
+def test_validated_page_is_freed():
+    """Test that the models of a page's fields don't keep a page built on the fly alive."""
+
+    def build() -> type[BaseModel]:
+        class Built(CodePage):
+            pass
+
+        return Built
+
+    page = build()
+    assert validate_field(page, "code", "ok") == []
+    ref = weakref.ref(page)
+    del page
+    gc.collect()
+    assert ref() is None
+
+
+def test_validate_field_off_the_event_loop(monkeypatch):
+    """Test that a field is validated in a worker thread, not on the event loop."""
+    on_loop = []
+
+    def record(*args):
+        try:
+            on_loop.append(asyncio.get_running_loop() is not None)
+        except RuntimeError:
+            on_loop.append(False)
+        return validate_field(*args)
+
+    monkeypatch.setattr(main, "validate_field", record)
+    response = client.post("/validate/form/TestForm0/number", json={"value": 21})
+    assert response.json()["valid"] is True
+    assert on_loop == [False]
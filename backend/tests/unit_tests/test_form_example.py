@@ -108,62 +108,64 @@ def test_form_two_pages_valid_data():
     response = client.post("/form", json=form_data)
     assert response.status_code == 510  # Should fail as we need more pages
 
-def test_form_complete_valid_data():
-    """Test form endpoint with valid data for all pages."""
-    form_data = [
-        # Page 1
-        {
-            "number": 21,
-            "test": "valid",
+COMPLETE_FORM_DATA = [
+    # Page 1
+    {
+        "number": 21,
+        "test": "valid",
+    },
+    # Page 2
+    {
+        "contact_name2": {
+            "name": "John Doe",
+            "age": 30,
+            "education": {"degree": "BSc", "years": 4},
         },
-        # Page 2
-        {
-            "contact_name2": {
-                "name": "John Doe",
-                "age": 30,
-                "education": {"degree": "BSc", "years": 4},
+        "options": "1",
+    },
+    # Page 3
+    {
+        "contact_name3": {
+            "name": "Jane Smith",
+            "age": 27,
+            "education": {
+                "degree": "MSc",
+                "years": 2,
+                "options": "2",
+                "languages": [18, 21],  # Valid list of multiples of 3
             },
-            "options": "1",
         },
-        # Page 3
-        {
-            "contact_name3": {
-                "name": "Jane Smith",
-                "age": 27,
-                "education": {
-                    "degree": "MSc",
-                    "years": 2,
-                    "options": "2",
-                    "languages": [18, 21],  # Valid list of multiples of 3
-                },
-            },
-            "age": 24,
+        "age": 24,
+    },
+    # Page 4
+    {
+        "contact_person": {
+            "name": "Bob Wilson",
+            "age": 33,
+            "education": {"degree": "PhD", "years": 5},
         },
-        # Page 4
-        {
-            "contact_person": {
-                "name": "Bob Wilson",
-                "age": 33,
-                "education": {"degree": "PhD", "years": 5},
+    },
+    # Page 5
+    {
+        "contact_person_list": [
+            {
+                "name": "Alice Brown",
+                "age": 36,
+                "education": {"degree": "BSc", "years": 4},
             },
-        },
-        # Page 5
-        {
-            "contact_person_list": [
-                {
-                    "name": "Alice Brown",
-                    "age": 36,
-                    "education": {"degree": "BSc", "years": 4},
-                },
-                {
-                    "name": "Charlie Davis",
-                    "age": 42,
-                    "education": {"degree": "MSc", "years": 2},
-                },
-            ],
-        },
-    ]
-    response = client.post("/form", json=form_data)
+            {
+                "name": "Charlie Davis",
+                "age": 42,
+                "education": {"degree": "MSc", "years": 2},
+            },
+        ],
+    },
+]
+
+
+def test_form_complete_valid_data():
+    """Test form endpoint with valid data for all pages."""
+    response = client.post("/form", json=COMPLETE_FORM_DATA)
     assert response.status_code == 200
     assert response.json() == "OK!"
 
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+from anyio import create_task_group, sleep
+
+import form_executor
+from form_executor import run_in_executor
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def slow_validation(seconds: float) -> str:
+    time.sleep(seconds)
+    return "OK!"
+
+
+@pytest.mark.anyio
+async def test_event_loop_keeps_running_during_form_processing():
+    """Test that the event loop serves other work while a form is being processed."""
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await sleep(0.01)
+
+    async with create_task_group() as tg:
+        tg.start_soon(ticker)
+        assert await run_in_executor(slow_validation, 0.2) == "OK!"
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.15
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_bounded(monkeypatch):
+    """Test that at most FORM_MAX_CONCURRENCY posts run at the same time."""
+    monkeypatch.setattr(form_executor, "_limiter", None)
+    monkeypatch.setattr(form_executor, "FORM_MAX_CONCURRENCY", 1)
+    start = time.perf_counter()
+
+    async with create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(run_in_executor, slow_validation, 0.05)
+
+    assert time.perf_counter() - start >= 0.15
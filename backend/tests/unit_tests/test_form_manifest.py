@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from form_manifest import probe_pages
+from main import FullFormAdvanced, FullFormBasicTypes, SimpleForm, app
+
+client = TestClient(app)
+
+
+class First(BaseModel):
+    choice: str
+
+
+class Second(BaseModel):
+    name: str
+
+
+class Third(BaseModel):
+    age: int
+
+
+def static_generator(state):
+    first = yield First
+    second = yield Second
+    return first.model_dump() | second.model_dump()
+
+
+def branching_generator(state):
+    first = yield First
+    if first.choice == "third":
+        yield Third
+    yield Second
+    return {}
+
+
+def state_generator(state):
+    if state.get("customer"):
+        yield Third
+    yield First
+    return {}
+
+
+def equality_generator(state):
+    first = yield First
+    if first == First(choice="third"):
+        yield Third
+    yield Second
+    return {}
+
+
+def lookup_generator(state):
+    first = yield First
+    yield {"third": Third}.get(first, Second)
+    return {}
+
+
+def test_probe_static_pages():
+    """Test that a form whose pages don't depend on its input is static."""
+    assert probe_pages(static_generator) == [First, Second]
+
+
+def test_probe_pages_that_depend_on_input():
+    """Test that a form whose next page depends on an answer or the state is not static."""
+    assert probe_pages(branching_generator) is None
+    assert probe_pages(state_generator) is None
+
+
+def test_probe_pages_that_compare_an_answer():
+    """Test that comparing or hashing an answer counts as depending on it."""
+    assert probe_pages(equality_generator) is None
+    assert probe_pages(lookup_generator) is None
+
+
+def test_get_form_manifest():
+    """Test that the manifest has every page schema of a static form."""
+    response = client.get(
+        "/forms/form-full/manifest", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    pages = response.json()["pages"]
+    assert len(pages) == 9
+    assert pages[0]["name"] == FullFormBasicTypes.__name__
+    assert pages[-1]["name"] == FullFormAdvanced.__name__
+
+    # Same schema as the form endpoint sends for its first page
+    first_page = client.post("/form-full").json()
+    assert pages[0]["form"] == first_page["form"]
+
+    not_modified = client.get(
+        "/forms/form-full/manifest",
+        headers={
+            "Accept-Encoding": "identity",
+            "If-None-Match": response.headers["etag"],
+        },
+    )
+    assert not_modified.status_code == 304
+
+
+def test_get_form_manifest_with_bundled_defs():
+    """Test that the manifest refers to the shared definitions when asked to."""
+    response = client.get(
+        "/forms/form-simple/manifest", headers={"X-Schema-Defs": "bundle"}
+    )
+    [page] = response.json()["pages"]
+    assert page["name"] == SimpleForm.__name__
+    assert "$defs" not in page["form"]
+    assert "defsBundle" in page["form"]
+
+
+def test_get_form_manifest_unknown_form():
+    """Test that an unknown form has no manifest."""
+    assert client.get("/forms/unknown/manifest").status_code == 404
@@ -0,0 +1,73 @@
+from pydantic import ConfigDict
+
+from form_registry import FormRegistry, freeze, registry
+import main
+from main import FormPage, FullFormNested, full_form_generator
+
+
+def test_pages_are_registered_once_at_import():
+    """Test that every endpoint's pages are built at import and registered in order."""
+    assert registry.pages["form"][0] is main.TestForm0
+    assert len(registry.pages["form-full"]) == 9
+    assert registry.get_form("form-full") is full_form_generator
+
+
+def test_generator_yields_the_registered_classes():
+    """Test that replaying the generator reuses the same class objects."""
+    first = full_form_generator({}).send(None)
+    second = full_form_generator({}).send(None)
+    assert first is second is registry.pages["form-full"][0]
+    assert FullFormNested in registry.all_pages()
+
+
+def test_page_factory_caches_on_state_values():
+    """Test that a state dependent page is built once per distinct state value."""
+    local_registry = FormRegistry()
+    calls = []
+
+    @local_registry.page_factory("dynamic", "country")
+    def address_page(country):
+        calls.append(country)
+
+        class AddressPage(FormPage):
+            model_config = ConfigDict(title=f"Address in {country}")
+
+            street: str
+
+        return AddressPage
+
+    nl = address_page({"country": "NL", "other": 1})
+    assert address_page({"country": "NL", "other": 2}) is nl
+    assert address_page({"country": "BE"}) is not nl
+    assert calls == ["NL", "BE"]
+    assert nl.model_config["title"] == "Address in NL"
+    assert len(local_registry.all_pages()) == 2
+
+
+def test_page_factory_without_state_keys_builds_on_first_use():
+    """Test that a factory without state keys acts as a lazily built static page."""
+    local_registry = FormRegistry()
+    calls = []
+
+    @local_registry.page_factory("lazy")
+    def lazy_page():
+        calls.append(1)
+
+        class LazyPage(FormPage):
+            name: str
+
+        return LazyPage
+
+    assert local_registry.all_pages() == []
+    assert lazy_page() is lazy_page({"anything": True})
+    assert calls == [1]
+    assert lazy_page.is_static
+
+
+def test_freeze_keeps_kinds_of_containers_apart():
+    """Test that equal values get the same key and containers of another kind don't."""
+    assert freeze({"a": [1, {"b": 2}]}) == freeze({"a": [1, {"b": 2}]})
+    assert freeze({"a": 1, "b": 2}) == freeze({"b": 2, "a": 1})
+    assert freeze({"a": 1}) != freeze([("a", 1)])
+    assert freeze([1, 2]) != freeze((1, 2))
+    assert freeze([]) != freeze({})
@@ -0,0 +1,174 @@
+import pickle
+from typing import Annotated
+
+import pytest
+from annotated_types import Predicate
+from fastapi.testclient import TestClient
+from pydantic_forms.exceptions import FormNotCompleteError
+
+from form_engine import Checkpoint, FormSessionError
+from form_registry import registry
+from form_sessions import NEW_SESSION, SESSION_HEADER, FormSessions, form_sessions
+from main import FormPage, app
+from session_store import InMemorySessionStore
+from test_form_full import FULL_FORM_DATA
+
+client = TestClient(app)
+
+
+def test_form_full_in_session_sends_one_page_per_step():
+    """Test walking /form-full with a session, sending only the current page each step."""
+    token = NEW_SESSION
+    for page_data in FULL_FORM_DATA[:-1]:
+        response = client.post(
+            "/form-full", json=[page_data], headers={SESSION_HEADER: token}
+        )
+        assert response.status_code == 510
+        token = response.headers[SESSION_HEADER]
+
+    response = client.post(
+        "/form-full", json=[FULL_FORM_DATA[-1]], headers={SESSION_HEADER: token}
+    )
+    assert response.status_code == 200
+    assert response.json() == "OK!"
+
+
+def test_form_without_session_header_is_unchanged():
+    """Test that a request without the session header gets no token."""
+    response = client.post("/form-full", json=FULL_FORM_DATA[:2])
+    assert response.status_code == 510
+    assert SESSION_HEADER not in response.headers
+
+
+def test_validation_error_keeps_the_checkpoint():
+    """Test that an invalid page does not advance the session."""
+    first = client.post(
+        "/form",
+        json=[{"number": 21, "test": "valid"}],
+        headers={SESSION_HEADER: NEW_SESSION},
+    )
+    token = first.headers[SESSION_HEADER]
+
+    invalid = [
+        {
+            "contact_name2": {
+                "name": "John",
+                "age": 31,
+                "education": {"degree": "BSc", "years": 4},
+            },
+            "options": "1",
+        }
+    ]
+    response = client.post("/form", json=invalid, headers={SESSION_HEADER: token})
+    assert response.status_code == 400
+    assert response.headers[SESSION_HEADER] == token
+
+    # The same checkpoint can still be continued
+    invalid[0]["contact_name2"]["age"] = 30
+    response = client.post("/form", json=invalid, headers={SESSION_HEADER: token})
+    assert response.status_code == 510
+    assert response.json()["form"]["title"] == "Form Title Page 2"
+
+
+def test_unknown_or_foreign_session_is_gone():
+    """Test that an unknown token, or a token of another form, is rejected."""
+    response = client.post("/form-simple", json=[], headers={SESSION_HEADER: "unknown"})
+    assert response.status_code == 410
+
+    token = client.post(
+        "/form",
+        json=[{"number": 21, "test": "valid"}],
+        headers={SESSION_HEADER: NEW_SESSION},
+    ).headers[SESSION_HEADER]
+    response = client.post("/form-simple", json=[], headers={SESSION_HEADER: token})
+    assert response.status_code == 410
+
+
+class DictStore:
+    """Local stand-in for a Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value
+        return True
+
+    def delete(self, *names):
+        return sum(self.data.pop(name, None) is not None for name in names)
+
+
+def test_earlier_pages_are_not_validated_again(monkeypatch):
+    """Test that a checkpointed page's validators do not run again on later steps."""
+    checked = []
+
+    def expensive_check(value: int) -> bool:
+        checked.append(value)
+        return True
+
+    class CountedPage(FormPage):
+        value: Annotated[int, Predicate(expensive_check)]
+
+    class LastPage(FormPage):
+        name: str
+
+    def counting_form(state):
+        counted = yield CountedPage
+        last = yield LastPage
+        return counted.model_dump() | last.model_dump()
+
+    monkeypatch.setitem(registry.forms, "counting", counting_form)
+    sessions = FormSessions(DictStore())
+
+    with pytest.raises(FormNotCompleteError) as exc_info:
+        sessions.post_form("counting", [{"value": 1}], NEW_SESSION)
+    token = exc_info.value.session_token
+    assert len(sessions.store.data) == 1
+
+    assert sessions.post_form("counting", [{"name": "done"}], token) == {
+        "value": 1,
+        "name": "done",
+    }
+    assert checked == [1]
+    assert sessions.store.data == {}
+
+
+def test_checkpoint_signature_is_checked():
+    """Test that only checkpoints signed with the secret of the app are unpickled."""
+    store = DictStore()
+    sessions = FormSessions(store, secret=b"secret")
+    token = sessions.save(Checkpoint("form"))
+    assert sessions.load("form", token).form_key == "form"
+
+    with pytest.raises(FormSessionError):
+        FormSessions(store, secret=b"other").load("form", token)
+
+    # Even a store that can be written to can't get anything unpickled
+    key = sessions.prefix + token
+    store.data[key] = store.data[key][:32] + pickle.dumps(Checkpoint("other"))
+    with pytest.raises(FormSessionError):
+        sessions.load("other", token)
+
+
+def test_in_memory_store_expires_and_evicts(monkeypatch):
+    """Test the LRU and TTL behaviour of the default session store."""
+    now = [0.0]
+    monkeypatch.setattr("cache.monotonic", lambda: now[0])
+    store = InMemorySessionStore(maxsize=2, ttl=10)
+
+    store.set("a", b"1")
+    store.set("b", b"2", ex=100)
+    assert store.get("a") == b"1"
+    store.set("c", b"3")
+    assert store.get("b") is None  # least recently used
+    now[0] = 11
+    assert store.get("a") is None  # expired
+    assert store.get("c") is None
+    assert store.delete("a", "c") == 0
+
+
+def test_default_sessions_use_in_memory_store():
+    assert isinstance(form_sessions.store, InMemorySessionStore)
@@ -0,0 +1,110 @@
+import json
+from typing import Annotated, Any
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Json, ValidationError
+
+import json_field
+from json_field import BoundedJson, JsonLimits
+from main import app
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+
+client = TestClient(app)
+
+CONFIG = {"key1": "value1", "nested": {"key2": [1, 2]}}
+
+
+class Page(BaseModel):
+    config: BoundedJson
+
+
+class LimitedPage(BaseModel):
+    config: Annotated[Any, JsonLimits(max_size=20, max_depth=1)]
+
+
+class JsonPage(BaseModel):
+    config: Json
+
+
+def error_type(page: type[BaseModel], value: Any) -> str:
+    with pytest.raises(ValidationError) as exc_info:
+        page(config=value)
+    return exc_info.value.errors()[0]["type"]
+
+
+def test_bounded_json():
+    """Test that a string of JSON is parsed and an object or list is taken as is."""
+    assert Page(config=json.dumps(CONFIG)).config == CONFIG
+    assert Page(config=json.dumps(CONFIG).encode()).config == CONFIG
+    assert Page(config=CONFIG).config == CONFIG
+    assert Page.model_validate_json(json.dumps({"config": CONFIG})).config == CONFIG
+    assert Page(config='"text"').config == "text"
+
+
+def test_bounded_json_schema():
+    """Test that the schema is that of a `Json` field."""
+    assert (
+        Page.model_json_schema()["properties"]
+        == JsonPage.model_json_schema()["properties"]
+    )
+
+
+def test_bounded_json_limits(monkeypatch):
+    """Test that strings too large or too deep are refused before they are parsed."""
+    assert LimitedPage(config='{"a": 1}').config == {"a": 1}
+    assert error_type(LimitedPage, '{"a": "' + "x" * 20 + '"}') == "json_too_large"
+    assert error_type(LimitedPage, "é" * 15) == "json_too_large"
+    assert error_type(LimitedPage, '{"a": [1]}') == "json_too_deep"
+    assert LimitedPage(config='{"a": "[[["}').config == {"a": "[[["}
+    assert error_type(LimitedPage, "{") == "json_invalid"
+
+    monkeypatch.setattr(json_field, "JSON_FIELD_MAX_DEPTH", 2)
+    assert error_type(Page, "[[[]]]") == "json_too_deep"
+
+
+def test_bounded_json_value_limits():
+    """Test that an object or list is held to the same limits as its JSON."""
+    assert LimitedPage(config={"a": 1}).config == {"a": 1}
+    assert LimitedPage(config=[1, "[["]).config == [1, "[["]
+    assert error_type(LimitedPage, {"a": "x" * 20}) == "json_too_large"
+    assert error_type(LimitedPage, {"a": [1]}) == "json_too_deep"
+    assert error_type(LimitedPage, [{}]) == "json_too_deep"
+
+
+@pytest.mark.parametrize("value", [5, 1.5, True, None])
+def test_bounded_json_type(value):
+    """Test that other values than strings, objects and lists fail like for `Json`."""
+    assert error_type(Page, value) == error_type(JsonPage, value) == "json_type"
+
+
+def test_post_json_value():
+    """Test that a form takes the JSON of a `BoundedJson` field as a value."""
+    form_data = FULL_FORM_DATA[:-1] + [FULL_FORM_DATA[-1] | {"json_config": CONFIG}]
+    response = client.post("/form-full", json=form_data)
+    assert response.status_code == 200, response.text
+
+
+def test_post_json_too_deep():
+    """Test that a form refuses JSON that is nested too deep."""
+    config = "[" * 40 + "]" * 40
+    form_data = FULL_FORM_DATA[:-1] + [FULL_FORM_DATA[-1] | {"json_config": config}]
+    response = client.post("/form-full", json=form_data)
+    assert response.status_code == 400
+    assert response.json()["validation_errors"][0]["type"] == "json_too_deep"
+
+
+@pytest.mark.parametrize(
+    "config, error",
+    [
+        ({"key": "x" * 70_000}, "json_too_large"),
+        ([[[[[[[[[[[[[[[[[[[[[[[[[]]]]]]]]]]]]]]]]]]]]]]]]], "json_too_deep"),
+        (5, "json_type"),
+    ],
+)
+def test_post_json_value_refused(config, error):
+    """Test that a form refuses a JSON value too large, too deep or of another type."""
+    form_data = FULL_FORM_DATA[:-1] + [FULL_FORM_DATA[-1] | {"json_config": config}]
+    response = client.post("/form-full", json=form_data)
+    assert response.status_code == 400
+    assert response.json()["validation_errors"][0]["type"] == error
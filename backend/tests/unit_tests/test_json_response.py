@@ -0,0 +1,64 @@
+import asyncio
+import json
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_forms.exception_handlers.fastapi import form_error_handler
+from pydantic_forms.exceptions import FormValidationError
+
+import json_response
+from form_engine import post_form
+from form_registry import registry
+from main import FullFormNested, app
+from schema_cache import schema_cache
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+
+client = TestClient(app)
+
+INVALID_FORM_DATA = [*FULL_FORM_DATA[:7], FULL_FORM_DATA[7] | {"rating": 9}]
+
+
+@pytest.fixture
+def serializer():
+    previous = json_response.get_serializer()
+    yield json_response.set_serializer
+    json_response.set_serializer(previous)
+
+
+def invalid_page_error() -> FormValidationError:
+    with pytest.raises(FormValidationError) as exc_info:
+        post_form(registry.get_form("form-full"), {}, INVALID_FORM_DATA)
+    return exc_info.value
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_serializers_match_starlette_output(name):
+    """Test that every serializer writes the same bytes as `JSONResponse` would."""
+    content = json.loads(schema_cache.get(FullFormNested).body)
+    expected = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    assert json_response.SERIALIZERS[name](content) == expected
+    assert json_response.SERIALIZERS[name]({"ctx": Decimal("0.5")}) == b'{"ctx":"0.5"}'
+
+
+def test_validation_error_matches_pydantic_forms():
+    """Test that a 400 response has the same body as `form_error_handler` gives."""
+    exc = invalid_page_error()
+    expected = asyncio.run(form_error_handler(None, exc))  # type: ignore[arg-type]
+
+    response = client.post("/form-full", json=INVALID_FORM_DATA)
+    assert response.status_code == 400
+    assert response.json() == json.loads(expected.body)
+
+
+def test_set_serializer(serializer):
+    """Test that the serializer can be replaced at runtime."""
+    calls = []
+
+    def recording_dumps(content):
+        calls.append(content)
+        return json_response.dumps_json(content)
+
+    serializer(recording_dumps)
+    assert client.get("/").json() == {"Hello": "World"}
+    assert calls == [{"Hello": "World"}]
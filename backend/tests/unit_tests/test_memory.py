@@ -0,0 +1,47 @@
+import gc
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import main
+from main import app
+from memory import live_subclasses
+
+client = TestClient(app)
+
+
+class Base(BaseModel):
+    pass
+
+
+def test_live_subclasses():
+    """Test that classes are counted by name while alive, and not after they are freed."""
+
+    def build() -> type[Base]:
+        class Built(Base):
+            pass
+
+        return Built
+
+    pages = [build() for _ in range(3)]
+    name = f"{__name__}.test_live_subclasses.<locals>.build.<locals>.Built"
+    assert live_subclasses(Base) == {name: 3}
+
+    del pages
+    gc.collect()
+    assert live_subclasses(Base) == {}
+
+
+def test_debug_form_pages(monkeypatch):
+    """Test that the debug endpoint counts the live page classes of the worker."""
+    monkeypatch.setattr(main, "FORM_DEBUG_ENDPOINTS", True)
+    response = client.get("/debug/form-pages", params={"collect": True})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["pages"]["main.FullFormNested"] == 1
+    assert result["total"] == sum(result["pages"].values())
+
+
+def test_debug_form_pages_off_by_default():
+    """Test that the debug endpoint is not served unless enabled."""
+    assert client.get("/debug/form-pages").status_code == 404
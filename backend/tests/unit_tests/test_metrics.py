@@ -0,0 +1,147 @@
+import socket
+import urllib.request
+
+import pytest
+from fastapi.testclient import TestClient
+
+from form_sessions import NEW_SESSION, SESSION_HEADER
+from main import app
+from metrics import (
+    FORM_ERRORS,
+    PAGE_VALIDATION_DURATION,
+    REPLAYED_PAGES,
+    REQUEST_DURATION,
+    SCHEMA_GENERATION_DURATION,
+    MetricsRegistry,
+    serve_metrics,
+)
+from schema_cache import schema_cache
+from test_form_full import FULL_FORM_DATA
+from test_json_response import INVALID_FORM_DATA
+
+client = TestClient(app)
+
+
+def test_render_prometheus_text():
+    """Test the text exposition of counters and histograms."""
+    registry = MetricsRegistry()
+    errors = registry.counter("errors", "Errors", ("page",))
+    duration = registry.histogram("duration_seconds", "Duration", (), buckets=(0.1, 1))
+    errors.inc(page='Say "hi"')
+    duration.observe(0.05)
+    duration.observe(0.5)
+
+    assert registry.render().splitlines() == [
+        "# HELP errors Errors",
+        "# TYPE errors counter",
+        'errors_total{page="Say \\"hi\\""} 1',
+        "# HELP duration_seconds Duration",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{le="0.1"} 1',
+        'duration_seconds_bucket{le="1"} 2',
+        'duration_seconds_bucket{le="+Inf"} 2',
+        "duration_seconds_sum 0.55",
+        "duration_seconds_count 2",
+    ]
+    with pytest.raises(ValueError):
+        errors.inc(form="form")
+
+
+def test_form_posts_are_measured_per_page():
+    """Test that requests, page validation and schema generation are labelled by form and page."""
+    schema_cache.clear()
+    requests = REQUEST_DURATION.count(
+        endpoint="/form-full", method="POST", status="510"
+    )
+    validations = PAGE_VALIDATION_DURATION.count(
+        form="form-full", page="FullFormDateTime"
+    )
+    schemas = SCHEMA_GENERATION_DURATION.count(
+        form="form-full", page="FullFormSpecialTypes"
+    )
+
+    assert client.post("/form-full", json=FULL_FORM_DATA[:3]).status_code == 510
+
+    labels = {"form": "form-full", "page": "FullFormDateTime"}
+    assert (
+        REQUEST_DURATION.count(endpoint="/form-full", method="POST", status="510")
+        == requests + 1
+    )
+    assert PAGE_VALIDATION_DURATION.count(**labels) == validations + 1
+    # The schema of the next page is generated once, then served from the cache
+    client.post("/form-full", json=FULL_FORM_DATA[:3])
+    assert (
+        SCHEMA_GENERATION_DURATION.count(form="form-full", page="FullFormSpecialTypes")
+        == schemas + 1
+    )
+
+
+def test_errors_and_replayed_pages_are_counted():
+    """Test the error counter and the replayed pages of form sessions."""
+    labels = {
+        "form": "form-full",
+        "page": "FullFormValidation",
+        "error": "FormValidationError",
+    }
+    errors = FORM_ERRORS.value(**labels)
+    assert client.post("/form-full", json=INVALID_FORM_DATA).status_code == 400
+    assert FORM_ERRORS.value(**labels) == errors + 1
+
+    replays = REPLAYED_PAGES.count(form="form-full")
+    token = client.post(
+        "/form-full", json=FULL_FORM_DATA[:2], headers={SESSION_HEADER: NEW_SESSION}
+    ).headers[SESSION_HEADER]
+    client.post("/form-full", json=[FULL_FORM_DATA[2]], headers={SESSION_HEADER: token})
+    # Once for the empty new session, once for the two pages replayed from it
+    assert REPLAYED_PAGES.count(form="form-full") == replays + 2
+
+
+def test_replayed_pages_without_a_session():
+    """Test that a post without a session counts the earlier pages it validates again."""
+    replays = REPLAYED_PAGES.count(form="form-full")
+    assert client.post("/form-full", json=FULL_FORM_DATA[:3]).status_code == 510
+    assert REPLAYED_PAGES.count(form="form-full") == replays + 1
+    assert (
+        'form_replayed_pages_bucket{form="form-full",le="2"}'
+        in client.get("/metrics").text
+    )
+
+
+def test_metrics_endpoint():
+    """Test that /metrics serves the Prometheus text format."""
+    client.post("/form-simple", json=[])
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE form_page_validation_duration_seconds histogram" in response.text
+    assert (
+        'form_request_duration_seconds_count{endpoint="/form-simple",method="POST",status="510"}'
+        in response.text
+    )
+
+
+def test_serve_metrics_per_worker():
+    """Test that every worker gets a port of its own, from a port per worker."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        first_port = sock.getsockname()[1]
+
+    servers = [serve_metrics(first_port, 2, "127.0.0.1") for _ in range(2)]
+    try:
+        assert [server.server_address[1] for server in servers] == [
+            first_port,
+            first_port + 1,
+        ]
+        with pytest.raises(OSError):
+            serve_metrics(first_port, 2, "127.0.0.1")
+        for server in servers:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert response.headers["Content-Type"].startswith(
+                    "text/plain; version=0.0.4"
+                )
+                assert b"# TYPE form_errors counter" in response.read()
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import raw_body
+from main import app
+from raw_body import BodyScanError, BodyTooDeep, split_pages
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+
+client = TestClient(app)
+
+
+def post(body: bytes, content_type: str | None = "application/json"):
+    headers = {"Content-Type": content_type} if content_type else {}
+    return client.post("/form-full", content=body, headers=headers)
+
+
+def test_split_pages():
+    """Test that every page is split off as the bytes of its JSON object."""
+    pages = split_pages(json.dumps(FULL_FORM_DATA, indent=2).encode())
+    assert [json.loads(page) for page in pages] == FULL_FORM_DATA
+
+
+@pytest.mark.parametrize(
+    "body, pages",
+    [
+        (b"", []),
+        (b" [ ] ", []),
+        (b"\n[]\n", []),
+        (b"[{}]", [b"{}"]),
+        (b'[{"a": "]}"} ,\n{"b": [{}]}]', [b'{"a": "]}"}', b'{"b": [{}]}']),
+        (b'[{"a": "\\"}"}]', [b'{"a": "\\"}"}']),
+    ],
+)
+def test_split_pages_brackets(body, pages):
+    """Test that brackets within strings don't count."""
+    assert split_pages(body) == pages
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b" ", b"{}", b"[1]", b"[{}, 2]", b"[{},]", b"[{}] []", b'[{"a": "]', b"[{"],
+)
+def test_split_pages_not_a_list_of_objects(body):
+    """Test that anything but an array of objects is refused."""
+    with pytest.raises(BodyScanError):
+        split_pages(body)
+
+
+def test_split_pages_too_deep():
+    """Test that brackets nested deeper than the maximum are refused."""
+    body = b'[{"a": ' + b"[" * 30 + b"]" * 30 + b"}]"
+    assert len(split_pages(body, max_depth=32)) == 1
+    with pytest.raises(BodyTooDeep):
+        split_pages(body, max_depth=31)
+
+
+def test_post_parsed_pages():
+    """Test that a complete form validates from the pages parsed into dicts."""
+    response = post(json.dumps(FULL_FORM_DATA).encode())
+    assert response.status_code == 200, response.text
+
+
+def test_post_raw_body(monkeypatch):
+    """Test that pages can be validated in JSON mode from the raw body."""
+    monkeypatch.setattr(raw_body, "FORM_RAW_BODY", True)
+    assert post(json.dumps(FULL_FORM_DATA).encode()).status_code == 200
+    response = post(b'[{"full_name": }]')
+    assert response.status_code == 400
+    assert response.json()["validation_errors"][0]["type"] == "json_invalid"
+
+
+@pytest.mark.parametrize(
+    "body, errors",
+    [
+        (b'{"page": 1}', [("list_type", ["body"])]),
+        (b'[{"page": 1}, 2]', [("dict_type", ["body", 1])]),
+        (b"[1, []]", [("dict_type", ["body", 0]), ("dict_type", ["body", 1])]),
+        (b"[{", [("json_invalid", ["body", 2])]),
+        (b'[{"a": }]', [("json_invalid", ["body", 7])]),
+        (b"  ", [("json_invalid", ["body", 2])]),
+        (b'[{"a": ' * 40 + b"1" + b"}]" * 40, [("json_invalid", ["body"])]),
+    ],
+)
+def test_post_invalid_body(body, errors):
+    """Test that a body that is not a list of objects is a 422 with FastAPI's errors."""
+    response = post(body)
+    assert response.status_code == 422
+    assert [(e["type"], e["loc"]) for e in response.json()["detail"]] == errors
+
+
+@pytest.mark.parametrize("content_type", [None, "text/plain", "application/xml"])
+def test_post_not_json_content_type(content_type):
+    """Test that a body not sent as JSON is a 422, as it was for FastAPI."""
+    response = post(json.dumps(FULL_FORM_DATA).encode(), content_type)
+    assert response.status_code == 422
+    assert [(e["type"], e["loc"]) for e in response.json()["detail"]] == [
+        ("list_type", ["body"])
+    ]
+
+
+def test_post_json_content_types():
+    """Test that JSON content types with a suffix or parameters are parsed as JSON."""
+    body = json.dumps(FULL_FORM_DATA).encode()
+    assert post(body, "application/vnd.api+json").status_code == 200
+    assert post(body, "application/json; charset=utf-8").status_code == 200
+
+
+@pytest.mark.parametrize("body", [b"", b"null"])
+def test_post_no_pages(body):
+    """Test that an empty or `null` body is a post without pages, as before."""
+    assert post(body).status_code == 510
+
+
+def test_post_not_utf8():
+    """Test that a body that is not UTF-8 is a 400, as before."""
+    assert post(b'[{"a": "\xff"}]').status_code == 400
+
+
+def test_post_too_large(monkeypatch):
+    """Test that a body larger than the maximum size is refused."""
+    monkeypatch.setattr(raw_body, "FORM_MAX_BODY_SIZE", 100)
+    assert post(json.dumps(FULL_FORM_DATA).encode()).status_code == 413
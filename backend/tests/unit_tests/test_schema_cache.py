@@ -0,0 +1,66 @@
+from fastapi.testclient import TestClient
+from pydantic_forms.core.shared import GenerateFormJsonSchema
+
+import schema_cache as schema_cache_module
+from main import FullFormNested, app
+from schema_cache import schema_cache
+
+client = TestClient(app)
+
+
+def test_next_page_response_has_etag():
+    """Test that a 510 response carries the page schema and an ETag."""
+    response = client.post("/form-full")
+    assert response.status_code == 510
+    assert response.headers["etag"].startswith('"')
+    body = response.json()
+    assert body["type"] == "FormNotCompleteError"
+    assert body["title"] == "Form not complete"
+    assert body["form"]["title"] == "Basic Types - Strings and Numbers"
+    assert body["meta"] == {"hasNext": True}
+
+
+def test_etag_is_stable_across_requests():
+    """Test that the same page always gets the same ETag and body."""
+    first = client.post("/form-simple")
+    second = client.post("/form-simple")
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.content == second.content
+
+
+def test_if_none_match_returns_not_modified():
+    """Test that a client holding the current schema gets a 304 without a body."""
+    etag = client.post("/form").headers["etag"]
+    response = client.post("/form", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    stale = client.post("/form", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 510
+
+
+def test_schema_is_generated_once_per_page(monkeypatch):
+    """Test that the schema of a page is generated once and then served from the cache."""
+    schema_cache.clear()
+    calls = []
+    generate_schema = schema_cache_module.generate_schema
+
+    def counting_generate_schema(page):
+        calls.append(page)
+        return generate_schema(page)
+
+    monkeypatch.setattr(
+        schema_cache_module, "generate_schema", counting_generate_schema
+    )
+    for _ in range(3):
+        schema_cache.get(FullFormNested)
+    assert calls == [FullFormNested]
+
+
+def test_cached_schema_matches_pydantic_forms():
+    """Test that the cached schema is the one pydantic-forms would generate."""
+    cached = schema_cache.get(FullFormNested)
+    assert cached.form == FullFormNested.model_json_schema(
+        schema_generator=GenerateFormJsonSchema
+    )
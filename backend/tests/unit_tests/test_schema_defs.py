@@ -0,0 +1,104 @@
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from main import app
+from schema_cache import generate_schema
+from schema_defs import DefinitionStore
+
+client = TestClient(app)
+
+BUNDLE = {"X-Schema-Defs": "bundle", "Accept-Encoding": "identity"}
+
+
+class Inner(BaseModel):
+    name: str
+
+
+class Outer(BaseModel):
+    inner: Inner
+
+
+class PageA(BaseModel):
+    outer: Outer
+
+
+class PageB(BaseModel):
+    inner: Inner
+    other: Outer
+
+
+class Node(BaseModel):
+    child: Optional["Node"] = None
+
+
+class Tree(BaseModel):
+    root: Node
+
+
+def resolve(schema, definitions):
+    """Merge the definitions a bundled schema needs back into its `$defs`."""
+    hashes = schema["defsBundle"]["hashes"]
+    return {key: value for key, value in schema.items() if key != "defsBundle"} | {
+        "$defs": {digest: definitions[digest] for digest in hashes}
+    }
+
+
+def test_definitions_are_shared_by_content():
+    """Test that the same nested model gets the same hash on different pages."""
+    store = DefinitionStore()
+    a = store.bundle_schema(generate_schema(PageA))
+    b = store.bundle_schema(generate_schema(PageB))
+
+    assert "$defs" not in a and "$defs" not in b
+    assert len(store) == 2
+    assert a["defsBundle"]["hashes"] == b["defsBundle"]["hashes"]
+    inner = store.get(b["properties"]["inner"]["$ref"].removeprefix("#/$defs/"))
+    assert inner["title"] == "Inner"
+    outer = store.get(a["properties"]["outer"]["$ref"].removeprefix("#/$defs/"))
+    assert outer["properties"]["inner"]["$ref"] == b["properties"]["inner"]["$ref"]
+
+
+def test_recursive_definitions_are_rejected():
+    """Test that self-referencing definitions can't be bundled."""
+    with pytest.raises(ValueError):
+        DefinitionStore().bundle_schema(generate_schema(Tree))
+
+
+def test_bundled_page_schema():
+    """Test that the bundled page schema matches the inline one once its definitions are merged."""
+    inline = client.post("/form-simple", headers={"Accept-Encoding": "identity"})
+    bundled = client.post("/form-simple", headers=BUNDLE)
+    assert bundled.status_code == 510
+    assert "X-Schema-Defs" in bundled.headers["vary"]
+    assert bundled.headers["etag"] != inline.headers["etag"]
+    assert len(bundled.content) < len(inline.content)
+
+    form = bundled.json()["form"]
+    assert "$defs" not in form
+
+    definitions = client.get("/schema-defs").json()["$defs"]
+    resolved = resolve(form, definitions)
+    titles = {definition["title"] for definition in resolved["$defs"].values()}
+    assert titles == set(inline.json()["form"]["$defs"])
+
+
+def test_get_schema_defs():
+    """Test that the bundle is revalidated by ETag and single definitions are immutable."""
+    form = client.post("/form-simple", headers=BUNDLE).json()["form"]
+    digest = form["defsBundle"]["hashes"][0]
+
+    response = client.get("/schema-defs")
+    assert digest in response.json()["$defs"]
+    assert response.headers["cache-control"] == "no-cache"
+    not_modified = client.get(
+        "/schema-defs", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+
+    definition = client.get(f"/schema-defs/{digest}")
+    assert definition.json() == response.json()["$defs"][digest]
+    assert "immutable" in definition.headers["cache-control"]
+    assert client.get("/schema-defs/unknown").status_code == 404
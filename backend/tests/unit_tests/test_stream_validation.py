@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from main import FullFormCollections, FullFormNested, app
+from stream_validation import iter_lines, list_field_plan
+
+client = TestClient(app)
+
+PERSON = {"name": "Alice", "age": 36, "education": {"degree": "BSc", "years": 4}}
+
+
+def ndjson(*items) -> bytes:
+    return b"".join(json.dumps(item).encode() + b"\n" for item in items)
+
+
+def post_stream(url: str, body: bytes) -> list[dict]:
+    response = client.post(
+        url, content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_valid_list():
+    """Test that a valid list only yields the summary line."""
+    (summary,) = post_stream(
+        "/stream/form-full/FullFormCollections/scores", ndjson(85, 90, 78)
+    )
+    assert summary == {
+        "done": True,
+        "items": 3,
+        "invalid_items": 0,
+        "valid": True,
+        "validation_errors": [],
+        "skipped_validators": [],
+    }
+
+
+def test_stream_reports_item_errors_by_index():
+    """Test that invalid and duplicate items are reported with their index."""
+    body = ndjson(PERSON, PERSON | {"age": 31}, PERSON)
+    *errors, summary = post_stream("/stream/form/TestForm5/contact_person_list", body)
+
+    assert errors[0]["index"] == 1
+    assert errors[0]["validation_errors"][0]["loc"] == ["contact_person_list", 1, "age"]
+    assert errors[1]["index"] == 2
+    assert errors[1]["validation_errors"][0]["type"] == "unique_list"
+    assert errors[1]["validation_errors"][0]["ctx"] == {"duplicates": [[0, 2]]}
+    assert summary["invalid_items"] == 2
+    assert summary["valid"] is False
+    # The Predicate on the whole list needs every item at once
+    assert "example_list_validation" in summary["skipped_validators"][0]
+
+
+def test_stream_checks_list_length():
+    *_, summary = post_stream(
+        "/stream/form-full/FullFormCollections/tags", ndjson(*map(str, range(11)))
+    )
+    assert summary["validation_errors"][0]["type"] == "too_long"
+    *_, summary = post_stream("/stream/form-full/FullFormNested/education_history", b"")
+    assert summary["validation_errors"][0]["type"] == "too_short"
+
+
+def test_stream_stops_reading_past_max_length():
+    """Test that items past the maximum length are not read, like pydantic stops."""
+    body = ndjson(*map(str, range(11)), 5, *map(str, range(1000)))
+    (summary,) = post_stream("/stream/form-full/FullFormCollections/tags", body)
+    assert summary["items"] == 10
+    (error,) = summary["validation_errors"]
+    assert error["type"] == "too_long"
+    assert error["ctx"] == {
+        "field_type": "List",
+        "max_length": 10,
+        "actual_length": None,
+    }
+
+
+def test_stream_validates_off_the_event_loop(monkeypatch):
+    """Test that items are validated in a worker thread, not on the event loop."""
+    on_loop = []
+    validate_json = TypeAdapter.validate_json
+
+    def record(self, *args, **kwargs):
+        try:
+            on_loop.append(asyncio.get_running_loop() is not None)
+        except RuntimeError:
+            on_loop.append(False)
+        return validate_json(self, *args, **kwargs)
+
+    monkeypatch.setattr(TypeAdapter, "validate_json", record)
+    post_stream("/stream/form-full/FullFormCollections/scores", ndjson(85, 90))
+    assert on_loop == [False, False]
+
+
+def test_stream_rejects_non_list_fields():
+    assert (
+        client.post("/stream/form-full/FullFormNested/address", content=b"").status_code
+        == 400
+    )
+    assert (
+        client.post("/stream/form-full/FullFormNested/unknown", content=b"").status_code
+        == 404
+    )
+
+
+def test_list_field_plan():
+    plan = list_field_plan(FullFormNested, "education_history")
+    assert (plan.min_length, plan.max_length, plan.unique) == (1, 5, True)
+    assert plan.skipped_validators == []
+    assert list_field_plan(FullFormCollections, "scores").max_length is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_iter_lines_handles_split_and_oversized_lines(anyio_backend):
+    async def chunks():
+        for chunk in [b'{"a"', b": 1}\n\n", b"x" * 20, b"x\n2"]:
+            yield chunk
+
+    assert [line async for line in iter_lines(chunks(), max_line_bytes=10)] == [
+        b'{"a": 1}',
+        None,
+        b"2",
+    ]
@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from main import Education, Person, app
+from test_form_example import COMPLETE_FORM_DATA
+from unique_list import find_duplicates
+
+client = TestClient(app)
+
+
+def person(name: str, age: int = 36) -> Person:
+    return Person(name=name, age=age, education=Education(degree="BSc", years=4))
+
+
+def test_find_duplicates_groups_equal_items():
+    """Test that equal models, dicts and lists are found by their canonical value."""
+    people = [person("a"), person("b"), person("a"), person("b", age=39), person("a")]
+    assert find_duplicates(people) == [[0, 2, 4]]
+    assert find_duplicates([{"a": [1, 2]}, {"a": [1, 2]}, {"a": [2, 1]}]) == [[0, 1]]
+    assert find_duplicates([1, 2, 3]) == []
+
+
+def test_duplicate_error_reports_indexes():
+    """Test that a post with duplicates in a unique list names the duplicate items."""
+    contact = {"name": "Alice", "age": 36, "education": {"degree": "BSc", "years": 4}}
+    form_data = [*COMPLETE_FORM_DATA[:4], {"contact_person_list": [contact, contact]}]
+
+    response = client.post("/form", json=form_data)
+    assert response.status_code == 400
+    (error,) = response.json()["validation_errors"]
+    assert error["type"] == "unique_list"
+    assert error["loc"] == ["contact_person_list"]
+    assert error["ctx"] == {"duplicates": [[0, 1]]}
+    assert error["msg"] == "List must be unique, duplicate items at indexes [[0, 1]]"
+
+
+def test_large_list_of_models():
+    """Test that a long list of distinct models is checked without comparing every pair."""
+    people = [person(str(i)) for i in range(20_000)]
+    assert find_duplicates(people) == []
+    assert find_duplicates([*people, people[123]]) == [[123, 20_000]]
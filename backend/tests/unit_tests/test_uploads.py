@@ -0,0 +1,157 @@
+import json
+from tempfile import SpooledTemporaryFile
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, ValidationError
+
+import uploads
+from main import FullFormAdvanced, app
+from tests.unit_tests.test_form_full import FULL_FORM_DATA
+from uploads import Upload, UploadBytes
+
+client = TestClient(app)
+
+# Every page but the file, which is sent as a part of its own
+FORM_DATA = FULL_FORM_DATA[:-1] + [{"json_config": FULL_FORM_DATA[-1]["json_config"]}]
+FILE_PART = f"{len(FORM_DATA) - 1}.file_content"
+
+
+class Page(BaseModel):
+    content: UploadBytes
+
+
+def make_upload(content: bytes, spool_size: int) -> Upload:
+    file = SpooledTemporaryFile(max_size=spool_size)
+    file.write(content)
+    file.seek(0)
+    return Upload(file, len(content), "data.bin", "application/octet-stream")
+
+
+@pytest.mark.parametrize("spool_size", [1024, 4])
+def test_upload_buffer(spool_size):
+    """Test that the content is available in memory and on disk, for the block only."""
+    upload = make_upload(b"binary content", spool_size)
+    with upload.buffer() as view:
+        assert view == upload.read() == b"binary content"
+    with pytest.raises(ValueError):
+        view.tobytes()
+    upload.close()
+    assert upload.file.closed
+
+
+def test_upload_bytes_field():
+    """Test that an upload is kept as is and bytes are still accepted."""
+    upload = make_upload(b"binary content", 1024)
+    page = Page(content=upload)
+    assert page.content is upload
+    assert json.loads(page.model_dump_json())["content"]["size"] == 14
+    assert Page(content=b"inline").content == b"inline"
+    assert (
+        Page.model_json_schema()["properties"]["content"]["format"]
+        == FullFormAdvanced.model_json_schema()["properties"]["file_content"]["format"]
+    )
+
+
+def test_upload_bytes_errors():
+    """Test that a value that is neither gets the single error of a `bytes` field."""
+    with pytest.raises(ValidationError) as exc_info:
+        Page(content=5)
+    assert [(e["type"], e["loc"]) for e in exc_info.value.errors()] == [
+        ("bytes_type", ("content",))
+    ]
+
+
+def test_upload_form():
+    """Test a complete multipart post with the file as a part of its own."""
+    response = client.post(
+        "/upload/form-full",
+        data={"form_data": json.dumps(FORM_DATA)},
+        files={FILE_PART: ("data.bin", b"\x00\x01" * 1000, "application/octet-stream")},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == "OK!"
+
+
+def test_upload_form_not_complete():
+    """Test that a multipart post without all pages gets the next page."""
+    response = client.post(
+        "/upload/form-full", files={"form_data": (None, json.dumps(FORM_DATA[:2]))}
+    )
+    assert response.status_code == 510
+
+
+def test_upload_not_multipart():
+    """Test that only multipart bodies are accepted."""
+    response = client.post("/upload/form-full", json=FORM_DATA)
+    assert response.status_code == 415
+
+
+def test_upload_too_large(monkeypatch):
+    """Test that a body larger than the maximum size is refused."""
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_SIZE", 1000)
+    response = client.post(
+        "/upload/form-full",
+        data={"form_data": json.dumps(FORM_DATA)},
+        files={FILE_PART: ("data.bin", b"\x00" * 2000, "application/octet-stream")},
+    )
+    assert response.status_code == 413
+
+
+def test_upload_too_large_while_streaming(monkeypatch):
+    """Test that a body without a length is refused once it gets too large."""
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_SIZE", 1000)
+    request = httpx.Request(
+        "POST",
+        "http://testserver/upload/form-full",
+        data={"form_data": json.dumps(FORM_DATA)},
+        files={FILE_PART: ("data.bin", b"\x00" * 5000, "application/octet-stream")},
+    )
+    body = request.read()
+
+    def chunks():
+        for start in range(0, len(body), 512):
+            yield body[start : start + 512]
+
+    response = client.post(
+        "/upload/form-full",
+        content=chunks(),
+        headers={"Content-Type": request.headers["content-type"]},
+    )
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize(
+    "form_data, part",
+    [
+        ("not json", FILE_PART),
+        (json.dumps({"page": 1}), FILE_PART),
+        (json.dumps(FORM_DATA), "99.file_content"),
+        (json.dumps(FORM_DATA), "file_content"),
+    ],
+)
+def test_upload_invalid(form_data, part):
+    """Test that an upload with invalid form data or an unknown file part is refused."""
+    response = client.post(
+        "/upload/form-full",
+        data={"form_data": form_data},
+        files={part: ("data.bin", b"data", "application/octet-stream")},
+    )
+    assert response.status_code == 400
+
+
+def test_upload_file_for_other_field():
+    """Test that a file for a field that isn't `bytes` is a validation error."""
+    response = client.post(
+        "/upload/form-full",
+        data={"form_data": json.dumps(FORM_DATA)},
+        files={f"{len(FORM_DATA) - 1}.json_config": ("a.json", b"{}", "text/plain")},
+    )
+    assert response.status_code == 400
+    assert response.json()["type"] == "FormValidationError"
+
+
+def test_upload_unknown_form():
+    """Test that an unknown form can't be uploaded to."""
+    assert client.post("/upload/unknown").status_code == 404
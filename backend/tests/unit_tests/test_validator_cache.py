@@ -0,0 +1,167 @@
+from typing import Annotated
+
+import pytest
+from annotated_types import Predicate
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, ValidationError
+from pydantic_forms.core import FormPage
+from pydantic_forms.exceptions import FormValidationError
+
+import main
+from async_validation import AsyncPredicate
+from form_engine import post_form
+from main import app
+from metrics import VALIDATOR_CACHE_HITS, VALIDATOR_CACHE_MISSES
+from validator_cache import cached_validator, validator_caches
+
+client = TestClient(app)
+
+calls: list[object] = []
+
+
+@cached_validator
+def known_customer(value: object) -> bool:
+    calls.append(value)
+    if value == "blocked":
+        raise ValueError("Customer is blocked")
+    if value == "unavailable":
+        raise RuntimeError("Service unavailable")
+    return value != "unknown"
+
+
+@cached_validator(maxsize=1, ttl=0)
+def uncached(value: object) -> bool:
+    calls.append(value)
+    return True
+
+
+@cached_validator(maxsize=1)
+def small(value: object) -> bool:
+    calls.append(value)
+    return True
+
+
+@cached_validator
+async def known_subscription(value: str) -> bool:
+    calls.append(value)
+    return value.startswith("s")
+
+
+class Page(BaseModel):
+    customer: Annotated[object, Predicate(known_customer)]
+
+
+class SubscriptionPage(FormPage):
+    subscription: Annotated[str, AsyncPredicate(known_subscription)]
+
+
+def subscription_generator(state: dict):
+    subscription = yield SubscriptionPage
+    return subscription.model_dump()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    calls.clear()
+    for validator in (known_customer, uncached, small, known_subscription):
+        validator.cache.clear()
+
+
+def test_cached_result():
+    """Test that a validator runs once per value and hits and misses are counted."""
+    name = f"{__name__}.known_customer"
+    hits = VALIDATOR_CACHE_HITS.value(validator=name)
+    misses = VALIDATOR_CACHE_MISSES.value(validator=name)
+
+    for value in ["c1", "c1", {"a": 1, "b": 2}, {"b": 2, "a": 1}, "c1"]:
+        Page(customer=value)
+
+    assert calls == ["c1", {"a": 1, "b": 2}]
+    info = known_customer.cache.info()
+    assert (info["hits"], info["misses"], info["size"]) == (3, 2, 2)
+    assert VALIDATOR_CACHE_HITS.value(validator=name) == hits + 3
+    assert VALIDATOR_CACHE_MISSES.value(validator=name) == misses + 2
+
+
+@pytest.mark.parametrize(
+    "value, error_type, message",
+    [
+        ("unknown", "predicate_failed", "Predicate 'known_customer' failed"),
+        ("blocked", "value_error", "Value error, Customer is blocked"),
+    ],
+)
+def test_cached_failure(value, error_type, message):
+    """Test that failures and their messages are cached as well."""
+    for _ in range(2):
+        with pytest.raises(ValidationError) as exc_info:
+            Page(customer=value)
+        error = exc_info.value.errors()[0]
+        assert (error["type"], error["msg"]) == (error_type, message)
+    assert calls == [value]
+
+
+def test_cached_error_raised_anew():
+    """Test that every hit raises an error of its own, not one shared between threads."""
+    errors = []
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Customer is blocked") as exc_info:
+            known_customer("blocked")
+        errors.append(exc_info.value)
+    assert errors[0] is not errors[1]
+    assert calls == ["blocked"]
+
+
+def test_other_errors_not_cached():
+    """Test that an error that may be gone on the next call is not cached."""
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            known_customer("unavailable")
+    assert calls == ["unavailable", "unavailable"]
+
+
+def test_cache_limits():
+    """Test that results expire after the TTL and the least recently used go first."""
+    uncached(1)
+    uncached(1)
+    small(1)
+    small(2)
+    small(1)
+    assert calls == [1, 1, 1, 2, 1]
+
+
+def test_cached_async_validator():
+    """Test that a later step of a form does not look up the same value again."""
+    post_form(subscription_generator, {}, [{"subscription": "s1"}])
+    post_form(subscription_generator, {}, [{"subscription": "s1"}])
+    with pytest.raises(FormValidationError):
+        post_form(subscription_generator, {}, [{"subscription": "x1"}])
+    assert calls == ["s1", "x1"]
+    assert known_subscription.cache.info()["hits"] == 1
+
+
+def test_same_name_in_another_module():
+    """Test that same-named validators of different modules have caches of their own."""
+
+    def other(value: object) -> bool:
+        return False
+
+    other.__module__ = "other_module"
+    other.__qualname__ = "known_customer"
+    other_customer = cached_validator(other)
+    assert other_customer("c1") is False
+    assert known_customer("c1") is True
+    assert validator_caches["other_module.known_customer"] is other_customer.cache
+    assert validator_caches[f"{__name__}.known_customer"] is known_customer.cache
+
+
+def test_validator_caches_in_debug_endpoint(monkeypatch):
+    """Test that the cache of every cached validator is listed with its counters."""
+    monkeypatch.setattr(main, "FORM_DEBUG_ENDPOINTS", True)
+    caches = client.get("/debug/form-pages").json()["validator_caches"]
+    assert set(caches["main.example_backend_validation"]) == {
+        "hits",
+        "misses",
+        "size",
+        "maxsize",
+        "ttl",
+    }
@@ -0,0 +1,92 @@
+import gc
+import sys
+
+from fastapi.testclient import TestClient
+
+import warmup
+from form_registry import FormRegistry, registry
+from import_timer import ImportTimer
+from main import FormPage, app
+from schema_cache import schema_cache
+
+
+def test_lifespan_warms_up_every_page():
+    """Test that every page is built and its schema cached before the first request."""
+    schema_cache.clear()
+    with TestClient(app):
+        report = app.state.startup_report
+
+    assert set(report["warm_up_ms"]) == set(registry.forms)
+    for page in registry.all_pages():
+        assert page.__pydantic_complete__
+        assert page in schema_cache
+    assert "imports_ms" in report
+
+
+def test_lifespan_without_warm_up(monkeypatch):
+    """Test that with the warm-up disabled only the import times are reported."""
+    monkeypatch.setattr(warmup, "FORM_WARMUP", False)
+    schema_cache.clear()
+    with TestClient(app):
+        report = app.state.startup_report
+
+    assert "warm_up_ms" not in report
+    assert len(schema_cache) == 0
+
+
+def test_warm_up_builds_deferred_and_static_factory_pages():
+    """Test that deferred pages are built and static factories called, per form."""
+    local_registry = FormRegistry()
+
+    @local_registry.page("lazy")
+    class DeferredPage(FormPage):
+        name: str
+
+    @local_registry.page_factory("lazy")
+    def static_page():
+        class StaticPage(FormPage):
+            age: int
+
+        return StaticPage
+
+    @local_registry.page_factory("lazy", "country")
+    def state_page(country):
+        raise AssertionError("Pages that depend on the state can't be warmed up")
+
+    @local_registry.form("lazy")
+    def lazy_form(state):
+        yield DeferredPage
+
+    assert not DeferredPage.__pydantic_complete__
+    assert set(warmup.warm_up(local_registry)) == {"lazy"}
+    assert DeferredPage.__pydantic_complete__
+    assert static_page() in schema_cache
+
+
+def test_import_timer_records_imports_of_one_module(tmp_path, monkeypatch):
+    """Test that only the imports made by the importing module itself are timed."""
+    (tmp_path / "timed_app.py").write_text("import timed_dependency\n")
+    (tmp_path / "timed_dependency.py").write_text("import timed_nested\n")
+    (tmp_path / "timed_nested.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    timer = ImportTimer()
+    timer.install("timed_app")
+    try:
+        import timed_app  # noqa: F401
+    finally:
+        timer.uninstall()
+        for name in ("timed_app", "timed_dependency", "timed_nested"):
+            sys.modules.pop(name, None)
+
+    assert list(timer.report()) == ["timed_dependency"]
+
+
+def test_preload_freezes_the_warmed_up_forms():
+    """Test that the preload leaves the forms out of garbage collection."""
+    try:
+        warmup.preload()
+        assert gc.get_freeze_count() > 0
+        assert all(page in schema_cache for page in registry.all_pages())
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,55 @@
+"""`unique_conlist` with a uniqueness check that is linear in the length of the list.
+
+The check in pydantic-forms falls back to comparing every pair of items when they are not
+hashable, which is the case for lists of models. Here each validated item is turned into
+a hashable canonical key instead (see `form_registry.freeze`), so duplicates are found
+with one dict lookup per item. The error tells which items are duplicates.
+"""
+
+from typing import Annotated, Any, Hashable, Optional, TypeVar
+
+from annotated_types import Len
+from pydantic import AfterValidator, Field
+from pydantic_core import PydanticCustomError
+
+from form_registry import freeze
+
+T = TypeVar("T")
+
+
+def find_duplicates(values: list[Any]) -> list[list[int]]:
+    """Return the indexes of equal items, one list per group of at least two items."""
+    groups: dict[Hashable, list[int]] = {}
+    for index, value in enumerate(values):
+        groups.setdefault(freeze(value), []).append(index)
+    return [indexes for indexes in groups.values() if len(indexes) > 1]
+
+
+def duplicates_error(duplicates: list[list[int]]) -> PydanticCustomError:
+    return PydanticCustomError(
+        "unique_list",
+        "List must be unique, duplicate items at indexes {duplicates}",
+        {"duplicates": duplicates},
+    )
+
+
+def validate_unique_list(values: list[T]) -> list[T]:
+    """Return the list unchanged, raising `PydanticCustomError` if it holds duplicates."""
+    if duplicates := find_duplicates(values):
+        raise duplicates_error(duplicates)
+    return values
+
+
+def unique_conlist(
+    item_type: type[T],
+    *,
+    min_items: Optional[int] = None,
+    max_items: Optional[int] = None,
+) -> type[list[T]]:
+    """Create a list whose items must all be unique."""
+    return Annotated[  # type: ignore[return-value]
+        list[item_type],  # type: ignore[valid-type]
+        AfterValidator(validate_unique_list),
+        Len(min_items or 0, max_items),
+        Field(json_schema_extra={"uniqueItems": True}),
+    ]
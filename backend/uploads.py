@@ -0,0 +1,197 @@
+"""Multipart uploads of files for `bytes` fields, streamed to a spooled temporary file.
+
+In a JSON post a file has to be base64 encoded in `form_data`, a third larger, and is
+held in memory several times over: the body, the parsed JSON and the decoded bytes.
+`POST /upload/{form_key}` takes a multipart body instead, with the usual `form_data`
+list as a JSON part and a part per file, named `<page index>.<field name>`:
+
+    curl -F 'form_data=[{...}, ..., {"json_config": "{}"}]' \\
+         -F '8.file_content=@report.pdf' http://localhost:8000/upload/form-full
+
+The body is streamed to disk past `UPLOAD_SPOOL_SIZE` bytes and refused with a 413 as
+soon as it gets larger than `UPLOAD_MAX_SIZE`. Fields annotated with `UploadBytes` get
+the uploaded file as an `Upload`, without reading it into memory; within
+`with upload.buffer() as view:` a file on disk is memory mapped instead of copied. In a
+JSON post they take bytes as before.
+"""
+
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi import HTTPException, Request
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import CoreSchema, core_schema
+from pydantic_forms.types import State
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_SIZE = int(os.getenv("UPLOAD_SPOOL_SIZE", str(1024 * 1024)))
+
+FORM_DATA_PART = "form_data"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class Upload:
+    """A file received in a multipart post, in memory or in a temporary file."""
+
+    def __init__(
+        self,
+        file: SpooledTemporaryFile,
+        size: int,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ):
+        self.file = file
+        self.size = size
+        self.filename = filename
+        self.content_type = content_type
+
+    def __repr__(self) -> str:
+        return f"Upload({self.filename!r}, size={self.size})"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __json__(self) -> dict[str, Any]:
+        return {
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+        }
+
+    @contextmanager
+    def buffer(self) -> Iterator[memoryview]:
+        """The content within the block: a memory map of a file on disk, without a copy.
+
+        A file still spooled in memory is at most `UPLOAD_SPOOL_SIZE` bytes and is copied.
+        """
+        # A spooled file only has a name once it is rolled over to disk
+        if self.size == 0 or self.file.name is None:
+            with memoryview(self.read()) as view:
+                yield view
+            return
+        self.file.flush()
+        with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+
+    def read(self) -> bytes:
+        """Return a copy of the content."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _serialize(value: Upload | bytes, info: core_schema.SerializationInfo) -> Any:
+    # An upload is kept as is in Python, without warnings about it not being bytes
+    if isinstance(value, Upload) and info.mode_is_json():
+        return value.__json__()
+    return value
+
+
+def _validate(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> Any:
+    # Anything but an upload is validated as bytes, with the errors of bytes
+    return value if isinstance(value, Upload) else handler(value)
+
+
+class UploadBytes:
+    """`bytes` that also accepts an `Upload` as is; the JSON schema is that of `bytes`."""
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source_type: Any, handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        return core_schema.no_info_wrap_validator_function(
+            _validate,
+            core_schema.bytes_schema(),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _serialize, info_arg=True
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict[str, Any]:
+        return handler(core_schema.bytes_schema())
+
+
+async def _limited(request: Request, max_size: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_size:
+            raise UploadTooLarge
+        yield chunk
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload larger than {max_size} bytes")
+
+
+async def receive_upload(
+    request: Request, max_size: int | None = None
+) -> tuple[list[State], list[Upload]]:
+    """Parse a multipart form post; return `form_data` with the files put in, and the files.
+
+    Raises `HTTPException` with 415 when the body is not multipart, 413 when it is too large
+    and 400 when it is not a valid upload. The caller closes the files.
+    """
+    max_size = UPLOAD_MAX_SIZE if max_size is None else max_size
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+    if int(request.headers.get("content-length") or 0) > max_size:
+        raise _too_large(max_size)
+
+    parser = MultiPartParser(request.headers, _limited(request, max_size))
+    parser.spool_max_size = UPLOAD_SPOOL_SIZE
+    parser.max_part_size = max_size
+    try:
+        form = await parser.parse()
+    except UploadTooLarge:
+        # The parser closed the files it had opened so far
+        raise _too_large(max_size)
+    except MultiPartException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+    uploads: list[Upload] = []
+    try:
+        raw = form.get(FORM_DATA_PART) or "[]"
+        if not isinstance(raw, str):
+            raise ValueError(f"{FORM_DATA_PART} should be a field, not a file")
+        form_data = json.loads(raw)
+        if not isinstance(form_data, list) or not all(
+            isinstance(page, dict) for page in form_data
+        ):
+            raise ValueError(f"{FORM_DATA_PART} should be a list of objects")
+        for name, value in form.multi_items():
+            if not isinstance(value, UploadFile):
+                continue
+            index, _, field = name.partition(".")
+            if not (index.isdigit() and field and int(index) < len(form_data)):
+                raise ValueError(f"Unknown page for file {name}")
+            upload = Upload(
+                value.file,  # type: ignore[arg-type]
+                value.size or 0,
+                value.filename,
+                value.content_type,
+            )
+            uploads.append(upload)
+            form_data[int(index)][field] = upload
+    except ValueError as e:
+        for _, value in form.multi_items():
+            if isinstance(value, UploadFile):
+                value.file.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    return form_data, uploads
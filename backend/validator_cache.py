@@ -0,0 +1,107 @@
+"""Cache the results of expensive validators, per value, for a while.
+
+Every post validates the pages of earlier steps again, so a `Predicate` that looks up a
+customer sees the same value on every step of the form. Marking it as cacheable keeps
+its results in an LRU of `VALIDATOR_CACHE_MAXSIZE` entries (default 10,000) per validator
+for `VALIDATOR_CACHE_TTL` seconds (default 300):
+
+    @cached_validator
+    def customer_exists(customer_id: str) -> bool: ...
+
+    @cached_validator(ttl=60)
+    async def subscription_active(subscription_id: str) -> bool: ...
+
+Results are keyed by the canonical JSON of the value, so equal dicts or models share an
+entry. Both outcomes are cached: the returned bool, and a `ValueError` the validator
+raised, which is raised again with the same message. Any other exception, like a
+timeout of the service, is not cached. Hits and misses are counted per validator in the
+`form_validator_cache_hits_total` and `form_validator_cache_misses_total` metrics.
+"""
+
+import inspect
+import os
+from functools import wraps
+from typing import Any, Callable, TypeVar
+
+from async_validation import canonical_value
+from cache import LRUCache
+from metrics import VALIDATOR_CACHE_HITS, VALIDATOR_CACHE_MISSES
+
+VALIDATOR_CACHE_MAXSIZE = int(os.getenv("VALIDATOR_CACHE_MAXSIZE", "10000"))
+VALIDATOR_CACHE_TTL = float(os.getenv("VALIDATOR_CACHE_TTL", "300"))
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The result of a validator: what it returned, or the message of the `ValueError` it raised
+Result = bool | str
+
+_MISSING = object()
+
+# The caches of all cached validators by module and name, e.g. for `/debug/form-pages`
+validator_caches: dict[str, LRUCache[str, Result]] = {}
+
+
+def _cached(cache: LRUCache[str, Result], name: str, key: str) -> Any:
+    result = cache.get(key, _MISSING)
+    if result is _MISSING:
+        VALIDATOR_CACHE_MISSES.inc(validator=name)
+    else:
+        VALIDATOR_CACHE_HITS.inc(validator=name)
+    return result
+
+
+def _unwrap(result: Result) -> bool:
+    if isinstance(result, str):
+        # A new error every time, as the cache is shared between threads
+        raise ValueError(result)
+    return result
+
+
+def cached_validator(
+    func: F | None = None,
+    *,
+    maxsize: int | None = None,
+    ttl: float | None = None,
+) -> Any:
+    """Mark a validator, a function or coroutine function of one value, as cacheable."""
+
+    def decorate(func: F) -> F:
+        # Qualified by its module, as validators of the same name may live in several
+        name = f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
+        cache: LRUCache[str, Result] = LRUCache(
+            VALIDATOR_CACHE_MAXSIZE if maxsize is None else maxsize,
+            VALIDATOR_CACHE_TTL if ttl is None else ttl,
+        )
+        validator_caches[name] = cache
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(value: Any) -> bool:
+                key = canonical_value(value)
+                if (result := _cached(cache, name, key)) is _MISSING:
+                    try:
+                        result = bool(await func(value))
+                    except ValueError as e:
+                        result = str(e)
+                    cache.set(key, result)
+                return _unwrap(result)
+
+            async_wrapper.cache = cache  # type: ignore[attr-defined]
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def wrapper(value: Any) -> bool:
+            key = canonical_value(value)
+            if (result := _cached(cache, name, key)) is _MISSING:
+                try:
+                    result = bool(func(value))
+                except ValueError as e:
+                    result = str(e)
+                cache.set(key, result)
+            return _unwrap(result)
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorate if func is None else decorate(func)
@@ -0,0 +1,85 @@
+"""Build and serialize every form page at startup, before the worker reports ready.
+
+Page classes are defined with `defer_build`: importing the app only declares them, and
+pydantic builds their validators, like the one of `EmailStr`, on first use. The warm-up
+does that for every registered page and fills the schema cache, so the first requests
+after a deploy are as fast as the rest. With `FORM_WARMUP=false` pages are built lazily
+instead, which makes the startup faster, e.g. for scripts and tests.
+
+With several workers, `preload` does the warm-up once in the master process instead, see
+`gunicorn.conf.py`.
+"""
+
+import gc
+import os
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import AsyncIterator
+
+import structlog
+from fastapi import FastAPI
+
+from constraints import constraint_cache
+from form_manifest import manifest_cache
+from form_registry import FormRegistry, registry
+from import_timer import import_timer
+from metrics import current_form
+from schema_cache import schema_cache
+
+logger = structlog.get_logger(__name__)
+
+FORM_WARMUP = os.getenv("FORM_WARMUP", "true").lower() not in ("0", "false", "no")
+
+
+def warm_up(form_registry: FormRegistry) -> dict[str, float]:
+    """Build and cache the schema of every page; return the time per form in milliseconds.
+
+    Pages built by a factory that depends on the form state can't be built in advance;
+    factories without state keys are. The constraint tables of the pages and the manifest
+    of each static form are built too.
+    """
+    times = {}
+    for form_key in form_registry.forms:
+        start = perf_counter()
+        token = current_form.set(form_key)
+        try:
+            pages = list(form_registry.pages.get(form_key, []))
+            pages += [
+                factory()
+                for factory in form_registry.factories.get(form_key, [])
+                if factory.is_static
+            ]
+            for page in pages:
+                page.model_rebuild()
+                schema_cache.get(page)
+                constraint_cache.get(page)
+            manifest_cache.get(form_key, form_registry.get_form(form_key))
+        finally:
+            current_form.reset(token)
+        times[form_key] = round((perf_counter() - start) * 1000, 1)
+    return times
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the forms and log a startup report of the import and warm-up times."""
+    report: dict[str, dict[str, float]] = {"imports_ms": import_timer.report()}
+    if FORM_WARMUP:
+        report["warm_up_ms"] = warm_up(registry)
+    app.state.startup_report = report
+    logger.info("Startup report", **report)
+    yield
+
+
+def preload() -> None:
+    """Warm up in the master process and freeze the result, before workers are forked.
+
+    Frozen objects are left alone by the garbage collector, so its passes in the workers
+    don't touch them, and the memory pages holding the page classes, their validators
+    and the schema cache stay shared copy-on-write. The collector should be disabled
+    from the start (`gc.disable()`) so the freed gaps it would leave between the objects
+    don't get reused, and re-enabled in each worker after the fork.
+    """
+    warm_up(registry)
+    gc.freeze()
+    logger.info("Preloaded forms", frozen_objects=gc.get_freeze_count())